@@ -1,58 +1,169 @@
 from lle import Action
-from mdp import MDP, S, A
+from mdp import MDP, ReversibleMDP, S, A
 from world_mdp import MY_AGENT, override
+from transposition_table import TranspositionTable, Bound
+from move_ordering import MoveOrdering
+from evaluator import Evaluator, ValueEvaluator
+from instrumentation import SearchStats
 from queue import Queue as LifoQueue
 from typing import Optional, Generic, TypeVar
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+import functools
+import math
+import time
 
 
 def checker(func):
     """ Decorator that checks the arguments of the decorated function """
-    def wrapper(mdp: MDP[A, S], state: S, max_depth: int):
+    @functools.wraps(func)
+    def wrapper(mdp: MDP[A, S], state: S, max_depth: int, *args, **kwargs):
         if state.current_agent != MY_AGENT:  raise ValueError("The current agent must be 0.")
         if max_depth < 1: raise ValueError("The maximum depth must be at least 1.")
-        return func(mdp, state, max_depth)
+        return func(mdp, state, max_depth, *args, **kwargs)
     return wrapper
 
 @checker
-def minimax(mdp: MDP[A, S], state: S, max_depth: int) -> A:
-    return MinimaxSearch(mdp).search(state, max_depth)[1]
+def minimax(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+            move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return MinimaxSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
 
 @checker
-def alpha_beta(mdp: MDP[A, S], state: S, max_depth: int) -> A:
-    return AlphaBetaSearch(mdp).search(state, max_depth)[1]
+def alpha_beta(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+               move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return AlphaBetaSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
 
 @checker
-def expectimax(mdp: MDP[A, S], state: S, max_depth: int) -> A:
-    return ExpectimaxSearch(mdp).search(state, max_depth)[1]
+def best_reply(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+               move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return BestReplySearch(mdp, transposition_table=transposition_table, move_ordering=move_ordering).search(state, max_depth)[1]
+
+@checker
+def expectimax(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+               move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return ExpectimaxSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def star1_expectimax(mdp: MDP[A, S], state: S, max_depth: int, bounds: Optional[tuple[float, float]] = None,
+                     transposition_table: Optional[TranspositionTable[A, S]] = None, move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return StarExpectimaxSearch(mdp, bounds, False, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def star2_expectimax(mdp: MDP[A, S], state: S, max_depth: int, bounds: Optional[tuple[float, float]] = None,
+                     transposition_table: Optional[TranspositionTable[A, S]] = None, move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return StarExpectimaxSearch(mdp, bounds, True, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def pvs(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+        move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return PrincipalVariationSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def in_place_minimax(mdp: ReversibleMDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                     move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return InPlaceMinimaxSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def in_place_alpha_beta(mdp: ReversibleMDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                        move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return InPlaceAlphaBetaSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def in_place_expectimax(mdp: ReversibleMDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                        move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return InPlaceExpectimaxSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def iterative_deepening(mdp: MDP[A, S], state: S, max_depth: int, time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+                        transposition_table: Optional[TranspositionTable[A, S]] = None, move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    """ Alpha-beta search of depth 1, 2, ..., max_depth that stops when the time (in seconds) or node budget is spent """
+    return IterativeDeepeningSearch(mdp, time_budget, node_budget, transposition_table, move_ordering).run(state, max_depth)[1]
+
+@checker
+def stack_minimax(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                  move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return StackSearch(mdp, transposition_table, move_ordering, pruning=False).search(state, max_depth)[1]
+
+@checker
+def stack_alpha_beta(mdp: MDP[A, S], state: S, max_depth: int, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                     move_ordering: Optional[MoveOrdering[A, S]] = None) -> A:
+    return StackSearch(mdp, transposition_table, move_ordering).search(state, max_depth)[1]
+
+@checker
+def batched_minimax(mdp: MDP[A, S], state: S, max_depth: int, evaluator: Optional[Evaluator[S]] = None, batch_size: int = 1024) -> A:
+    return BatchedSearch(mdp, evaluator, batch_size).search(state, max_depth)[1]
+
+@checker
+def batched_expectimax(mdp: MDP[A, S], state: S, max_depth: int, evaluator: Optional[Evaluator[S]] = None, batch_size: int = 1024) -> A:
+    return BatchedSearch(mdp, evaluator, batch_size, chance=True).search(state, max_depth)[1]
 
 
 class AdversarialSearch(ABC, Generic[A, S]):
-    def __init__(self, mdp: MDP[A, S]):
+    def __init__(self, mdp: MDP[A, S], transposition_table: Optional[TranspositionTable[A, S]] = None,
+                 move_ordering: Optional[MoveOrdering[A, S]] = None, evaluator: Optional[Evaluator[S]] = None):
         self.mdp = mdp
-        self.visited_states = dict()
+        self.transposition_table = transposition_table
+        self.move_ordering = move_ordering
+        self.evaluator = evaluator
+        # Counters of the search, only updated when they are set (see `instrumentation.profile`)
+        self.stats: Optional[SearchStats] = None
 
     def _is_done(func):
+        def search(self, state: S, depth: int, *args):
+            if depth == 0: return (state.value if self.evaluator is None else self._leaf_value(state),)
+            if self.mdp.is_final(state): return (state.value,)
+            return func(self, state, depth, *args)
+
         def wrapper(self, state: S, depth: int, *args):
-            if depth == 0 or self.mdp.is_final(state): return (state.value,)
+            # Same as `search`, which is only called when the search is instrumented, so as not to slow it down otherwise
+            if self.stats is not None: return self.stats.visit(depth == 0, search, self, state, depth, *args)
+            if depth == 0: return (state.value if self.evaluator is None else self._leaf_value(state),)
+            if self.mdp.is_final(state): return (state.value,)
             return func(self, state, depth, *args)
         return wrapper
 
+    def _leaf_value(self, state: S) -> float:
+        """ Value of a leaf at the depth limit: its value, or its evaluation by the evaluator if it is not final """
+        if self.evaluator is None or self.mdp.is_final(state): return state.value
+        if self.stats is not None: self.stats.evaluation()
+        return self.evaluator.evaluate(state)
+
     def _eval_scores(self, maximize: bool, best_value: float, value: float, best_action: A, action: A, *_) -> (float, A, bool):
         return (value, action, False) if (maximize and value > best_value) or (not maximize and value < best_value) else (best_value, best_action, False)
 
+    def _ordered_actions(self, state: S, depth: int, counted: bool = True) -> list[A]:
+        actions = self.mdp.available_actions(state)
+        if self.move_ordering is not None: actions = self.move_ordering.order(state, depth, actions, self.transposition_table)
+        if self.stats is not None and counted: self.stats.expand(actions)
+        return actions
+
     def _get_successors(self, state: S, maximize: bool, depth: int) -> [S]:
-        for action in self.mdp.available_actions(state):
+        for action in self._ordered_actions(state, depth):
             new_state = self.mdp.transition(state, action)
-            #if self._is_visited(new_state, depth + 1): continue
             yield new_state, action
 
-    def _is_visited(self, state: S, depth: int) -> bool:
-        if state not in self.visited_states:
-            self.visited_states[state] = depth
-            return False
-        return depth < self.visited_states[state]
+    def _get_moves(self, state: S, maximize: bool, depth: int) -> [S]:
+        """ Same as `_get_successors`, with the state in which each action is played, which the cutoffs are recorded in """
+        for new_state, action in self._get_successors(state, maximize, depth):
+            yield state, new_state, action
+
+    def _cutoff(self, state: S, depth: int, action: A, maximize: bool):
+        if self.move_ordering is not None: self.move_ordering.cutoff(state, depth, action)
+        if self.stats is not None: self.stats.cutoff(action, maximize)
+
+    def _probe(self, state: S, depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> Optional[tuple[float, A]]:
+        """ Returns the (value, action) stored for the state if it answers the search with the (alpha, beta) window """
+        if self.transposition_table is None: return None
+        entry = self.transposition_table.probe(state, depth)
+        cached = (entry.value, entry.action) if entry is not None and entry.cuts(alpha, beta) else None
+        if self.stats is not None: self.stats.probe(cached is not None)
+        return cached
+
+    def _store(self, state: S, depth: int, value: float, action: A, alpha: float=float('-inf'), beta: float=float('inf')):
+        """ Stores the result of a search that started with the (alpha, beta) window """
+        if self.transposition_table is None: return
+        bound = Bound.UPPER if value <= alpha else Bound.LOWER if value >= beta else Bound.EXACT
+        self.transposition_table.store(state, depth, value, action, bound)
 
     @abstractmethod
     def search(self, state: S, max_depth: int, *_) -> (float, A):
@@ -64,12 +175,14 @@ class MinimaxSearch(AdversarialSearch):
     @AdversarialSearch._is_done
     @override(AdversarialSearch)
     def search(self, state: S, depth: int) -> (float, A):
+        if (cached := self._probe(state, depth)) is not None: return cached
         maximize = True if state.current_agent == MY_AGENT else False
         best_value = float('-inf') if maximize else float('inf')
         best_action = None
         for new_state, action in self._get_successors(state, maximize, depth):
             value = self.search(new_state, depth - 1 if maximize or new_state.current_agent == MY_AGENT else depth)[0]
             best_value, best_action, _ = self._eval_scores(maximize, best_value, value, best_action, action)
+        self._store(state, depth, best_value, best_action)
         return best_value, best_action
 
 
@@ -83,32 +196,525 @@ class AlphaBetaSearch(AdversarialSearch):
     @AdversarialSearch._is_done
     @override(AdversarialSearch)
     def search(self, state: S, depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> (float, A):
+        if (cached := self._probe(state, depth, alpha, beta)) is not None: return cached
+        window = alpha, beta
         maximize = True if state.current_agent == MY_AGENT else False
         best_value = float('-inf') if maximize else float('inf')
         best_action = None
-        for new_state, action in self._get_successors(state, maximize, depth):
+        for mover, new_state, action in self._get_moves(state, maximize, depth):
             value = self.search(new_state, depth - 1 if maximize or new_state.current_agent == MY_AGENT else depth, alpha, beta)[0]
             best_value, best_action, stop = self._eval_scores(maximize, best_value, value, best_action, action, alpha, beta)
-            if stop: break
+            if stop:
+                self._cutoff(mover, depth, action, maximize)
+                break
+            if maximize: alpha = max(alpha, value)
+            else: beta = min(beta, value)
+        self._store(state, depth, best_value, best_action, *window)
+        return best_value, best_action
+
+
+class PrincipalVariationSearch(AlphaBetaSearch):
+    """
+    Alpha-beta variant that searches the first child with the full window and the other ones with a null window,
+    which only tells whether they improve on the current best. Children that do are searched again with the full window.
+    """
+
+    @AdversarialSearch._is_done
+    @override(AdversarialSearch)
+    def search(self, state: S, depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> (float, A):
+        if (cached := self._probe(state, depth, alpha, beta)) is not None: return cached
+        window = alpha, beta
+        maximize = True if state.current_agent == MY_AGENT else False
+        best_value = float('-inf') if maximize else float('inf')
+        best_action = None
+        for mover, new_state, action in self._get_moves(state, maximize, depth):
+            new_depth = depth - 1 if maximize or new_state.current_agent == MY_AGENT else depth
+            if best_action is None:
+                value = self.search(new_state, new_depth, alpha, beta)[0]
+            elif maximize:
+                value = self.search(new_state, new_depth, alpha, math.nextafter(alpha, float('inf')))[0]
+                if alpha < value < beta: value = self.search(new_state, new_depth, alpha, beta)[0]
+            else:
+                value = self.search(new_state, new_depth, math.nextafter(beta, float('-inf')), beta)[0]
+                if alpha < value < beta: value = self.search(new_state, new_depth, alpha, beta)[0]
+            best_value, best_action, stop = self._eval_scores(maximize, best_value, value, best_action, action, alpha, beta)
+            if stop:
+                self._cutoff(mover, depth, action, maximize)
+                break
             if maximize: alpha = max(alpha, value)
             else: beta = min(beta, value)
+        self._store(state, depth, best_value, best_action, *window)
         return best_value, best_action
 
 
+class BestReplySearch(AlphaBetaSearch):
+    """
+    Best-Reply Search: alpha-beta search where the opponents play as one MIN player. After each move of my agent, the
+    replies of all the opponents are searched (each one moving while the others stay, see `MDP.with_agent`), and only the
+    strongest reply is kept, after which it is my agent's turn again. A round is then two plies whatever the number of
+    agents, instead of `n_agents` in the paranoid search of `AlphaBetaSearch`, which it is the same as with two agents.
+    The opponents never play two moves in a row, so that the value is an approximation with more than two agents.
+    """
+
+    def __init__(self, mdp: MDP[A, S], n_agents: Optional[int] = None, transposition_table: Optional[TranspositionTable[A, S]] = None,
+                 move_ordering: Optional[MoveOrdering[A, S]] = None, evaluator: Optional[Evaluator[S]] = None):
+        super().__init__(mdp, transposition_table, move_ordering, evaluator)
+        self.n_agents = n_agents if n_agents is not None else mdp.world.n_agents
+
+    def _replies(self, state: S, depth: int) -> [S]:
+        """ The (opponent state, next state, action) of the replies of every opponent, ordered per opponent """
+        # The actions of every opponent are listed before any of them is simulated, which may change the world
+        replies = [(opponent, action)
+                   for opponent in (self.mdp.with_agent(state, agent) for agent in range(self.n_agents) if agent != MY_AGENT)
+                   for action in self._ordered_actions(opponent, depth, counted=False)]
+        # The replies are the moves of a single node, whose cutoffs are counted by (agent, action)
+        if self.stats is not None: self.stats.expand([(opponent.current_agent, action) for opponent, action in replies])
+        for opponent, action in replies:
+            new_state = self.mdp.transition(opponent, action)
+            yield opponent, new_state if new_state.current_agent == MY_AGENT else self.mdp.with_agent(new_state, MY_AGENT), action
+
+    @override(AdversarialSearch)
+    def _get_successors(self, state: S, maximize: bool, depth: int) -> [S]:
+        if maximize:
+            yield from super()._get_successors(state, maximize, depth)
+            return
+        for _, new_state, action in self._replies(state, depth):
+            yield new_state, action
+
+    @override(AdversarialSearch)
+    def _get_moves(self, state: S, maximize: bool, depth: int) -> [S]:
+        if maximize:
+            yield from super()._get_moves(state, maximize, depth)
+            return
+        yield from self._replies(state, depth)
+
+    @override(AdversarialSearch)
+    def _cutoff(self, state: S, depth: int, action: A, maximize: bool):
+        if maximize: return super()._cutoff(state, depth, action, maximize)
+        if self.move_ordering is not None: self.move_ordering.cutoff(state, depth, action)
+        if self.stats is not None: self.stats.cutoff((state.current_agent, action), maximize)
+
+
 class ExpectimaxSearch(MinimaxSearch):
 
     @AdversarialSearch._is_done
     @override(AdversarialSearch)
     def search(self, state: S, depth: int) -> (float, A):
+        if (cached := self._probe(state, depth)) is not None: return cached
         maximize = True if state.current_agent == MY_AGENT else False
         if not maximize:
             successors = list(self._get_successors(state, maximize, depth))
             # Calculate the expected value for chance nodes
             expected_value = sum(self.search(new_state, depth - 1)[0] for new_state, _ in successors) / len(successors) if len(successors) > 0 else 0
+            self._store(state, depth, expected_value, None)
             return expected_value, None
         best_value = float('-inf') if maximize else float('inf')
         best_action = None
         for new_state, action in self._get_successors(state, maximize, depth):
             value = self.search(new_state, depth - 1)[0]
             best_value, best_action, stop = self._eval_scores(maximize, best_value, value, best_action, action)
+        self._store(state, depth, best_value, best_action)
+        return best_value, best_action
+
+
+class StarExpectimaxSearch(ExpectimaxSearch):
+    """
+    Expectimax with Star1 pruning, and Star2 probing if `probing`. The values of the states below a node must lie within
+    `bounds` if they are given, and otherwise within the bounds given by `mdp.value_bounds` for the node.
+    Max nodes are alpha-beta nodes, and a chance node stops as soon as its average, with the remaining children at the
+    lower or upper bound, is outside the (alpha, beta) window of its parent (Star1).
+    With probing, the first action of each child max node is searched first: the probes are lower bounds on the children,
+    which may already put the average above beta, and otherwise tighten the windows of the children (Star2).
+    A chance node is only cut when its bound is `tolerance` away from the window, so that it returns the same
+    (value, action) as `ExpectimaxSearch` at the root, whose values are computed the same way.
+    """
+
+    def __init__(self, mdp: MDP[A, S], bounds: Optional[tuple[float, float]] = None, probing: bool = False,
+                 transposition_table: Optional[TranspositionTable[A, S]] = None, move_ordering: Optional[MoveOrdering[A, S]] = None,
+                 tolerance: float = 1e-9):
+        if bounds is not None and bounds[0] > bounds[1]: raise ValueError("The lower bound must not be greater than the upper bound.")
+        super().__init__(mdp, transposition_table, move_ordering)
+        self.bounds = bounds
+        self.probing = probing
+        self.tolerance = tolerance
+
+    def _probe_child(self, child: S, depth: int, lower: float, beta: float) -> float:
+        """ Returns a lower bound on the value of the child of a chance node, by only searching its first action if it is a max node """
+        if depth == 0 or self.mdp.is_final(child): return self.search(child, depth)[0]
+        if child.current_agent != MY_AGENT: return lower
+        action = self._ordered_actions(child, depth)[0]
+        return max(self.search(self.mdp.transition(child, action), depth - 1, lower, beta)[0], lower)
+
+    def _chance(self, state: S, depth: int, alpha: float, beta: float) -> float:
+        lower, upper = self.bounds if self.bounds is not None else self.mdp.value_bounds(state, depth)
+        actions = self._ordered_actions(state, depth)
+        n = len(actions)
+        if n == 0: return 0
+        # The children are only created when they are searched, or all of them when they are probed
+        children = []
+        lower_bounds = [lower] * n
+        if self.probing and beta < float('inf') and lower > float('-inf'):
+            probed = 0.0
+            for i, action in enumerate(actions):
+                children.append(self.mdp.transition(state, action))
+                needed = n * beta - probed - (n - i - 1) * lower + self.tolerance
+                lower_bounds[i] = self._probe_child(children[i], depth - 1, lower, needed)
+                if lower_bounds[i] >= needed: return max((probed + lower_bounds[i] + (n - i - 1) * lower) / n, beta)
+                probed += lower_bounds[i]
+        # Sum of the lower bounds of the children after each one
+        rest_lower = [0.0] * n
+        for i in range(n - 2, -1, -1): rest_lower[i] = rest_lower[i + 1] + lower_bounds[i + 1]
+        total = 0
+        for i, action in enumerate(actions):
+            child = children[i] if i < len(children) else self.mdp.transition(state, action)
+            rest_upper = (n - i - 1) * upper if i < n - 1 else 0.0
+            child_alpha = n * alpha - total - rest_upper - self.tolerance
+            child_beta = n * beta - total - rest_lower[i] + self.tolerance
+            value = self.search(child, depth - 1, child_alpha, child_beta)[0]
+            total += value
+            if value <= child_alpha: return min((total + rest_upper) / n, alpha)
+            if value >= child_beta: return max((total + rest_lower[i]) / n, beta)
+        return total / n
+
+    @AdversarialSearch._is_done
+    @override(AdversarialSearch)
+    def search(self, state: S, depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> (float, A):
+        if (cached := self._probe(state, depth, alpha, beta)) is not None: return cached
+        if state.current_agent != MY_AGENT:
+            value = self._chance(state, depth, alpha, beta)
+            self._store(state, depth, value, None, alpha, beta)
+            return value, None
+        window = alpha, beta
+        best_value = float('-inf')
+        best_action = None
+        for new_state, action in self._get_successors(state, True, depth):
+            value = self.search(new_state, depth - 1, alpha, beta)[0]
+            if value > best_value: best_value, best_action = value, action
+            if best_value >= beta:
+                self._cutoff(state, depth, action, True)
+                break
+            alpha = max(alpha, value)
+        self._store(state, depth, best_value, best_action, *window)
+        return best_value, best_action
+
+
+class InPlaceSearch(AdversarialSearch):
+    """
+    Search that walks the tree with the `apply`/`undo` interface of a `ReversibleMDP` instead of creating every state.
+    It expands the same states in the same order as the search it is derived from, and only builds the current state
+    when the transposition table or the move ordering needs it.
+    """
+
+    def __init__(self, mdp: ReversibleMDP[A, S], transposition_table: Optional[TranspositionTable[A, S]] = None,
+                 move_ordering: Optional[MoveOrdering[A, S]] = None, evaluator: Optional[Evaluator[S]] = None):
+        if not isinstance(mdp, ReversibleMDP): raise TypeError("An in-place search needs a ReversibleMDP.")
+        super().__init__(mdp, transposition_table, move_ordering, evaluator)
+
+    def _is_done(func):
+        def search(self, depth: int, *args):
+            if depth == 0:
+                if self.evaluator is None or self.mdp.current_is_final(): return (self.mdp.current_value(),)
+                if self.stats is not None: self.stats.evaluation()
+                return (self.evaluator.evaluate(self.mdp.current_state()),)
+            if self.mdp.current_is_final(): return (self.mdp.current_value(),)
+            return func(self, depth, *args)
+
+        def wrapper(self, depth: int, *args):
+            if self.stats is not None: return self.stats.visit(depth == 0, search, self, depth, *args)
+            if depth == 0:
+                if self.evaluator is None or self.mdp.current_is_final(): return (self.mdp.current_value(),)
+                return (self.evaluator.evaluate(self.mdp.current_state()),)
+            if self.mdp.current_is_final(): return (self.mdp.current_value(),)
+            return func(self, depth, *args)
+        return wrapper
+
+    def _state(self) -> Optional[S]:
+        return self.mdp.current_state() if self.transposition_table is not None or self.move_ordering is not None else None
+
+    @override(AdversarialSearch)
+    def _ordered_actions(self, state: Optional[S], depth: int) -> list[A]:
+        actions = self.mdp.current_actions()
+        if self.move_ordering is not None: actions = self.move_ordering.order(state, depth, actions, self.transposition_table)
+        if self.stats is not None: self.stats.expand(actions)
+        return actions
+
+    def _child_depth(self, maximize: bool, depth: int) -> int:
+        return depth - 1 if maximize or self.mdp.current_agent() == MY_AGENT else depth
+
+    @override(AdversarialSearch)
+    def search(self, state: S, max_depth: int) -> (float, A):
+        self.mdp.load(state)
+        return self._search(max_depth)
+
+    @abstractmethod
+    def _search(self, depth: int, *_) -> (float, A):
+        """ Searches from the current state of the MDP, which is the same when it returns """
+
+
+class InPlaceMinimaxSearch(InPlaceSearch, MinimaxSearch):
+
+    @InPlaceSearch._is_done
+    @override(InPlaceSearch)
+    def _search(self, depth: int) -> (float, A):
+        state = self._state()
+        if (cached := self._probe(state, depth)) is not None: return cached
+        maximize = True if self.mdp.current_agent() == MY_AGENT else False
+        best_value = float('-inf') if maximize else float('inf')
+        best_action = None
+        for action in self._ordered_actions(state, depth):
+            self.mdp.apply(action)
+            value = self._search(self._child_depth(maximize, depth))[0]
+            self.mdp.undo()
+            best_value, best_action, _ = self._eval_scores(maximize, best_value, value, best_action, action)
+        self._store(state, depth, best_value, best_action)
+        return best_value, best_action
+
+
+class InPlaceAlphaBetaSearch(InPlaceSearch, AlphaBetaSearch):
+
+    @InPlaceSearch._is_done
+    @override(InPlaceSearch)
+    def _search(self, depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> (float, A):
+        state = self._state()
+        if (cached := self._probe(state, depth, alpha, beta)) is not None: return cached
+        window = alpha, beta
+        maximize = True if self.mdp.current_agent() == MY_AGENT else False
+        best_value = float('-inf') if maximize else float('inf')
+        best_action = None
+        for action in self._ordered_actions(state, depth):
+            self.mdp.apply(action)
+            value = self._search(self._child_depth(maximize, depth), alpha, beta)[0]
+            self.mdp.undo()
+            best_value, best_action, stop = self._eval_scores(maximize, best_value, value, best_action, action, alpha, beta)
+            if stop:
+                self._cutoff(state, depth, action, maximize)
+                break
+            if maximize: alpha = max(alpha, value)
+            else: beta = min(beta, value)
+        self._store(state, depth, best_value, best_action, *window)
+        return best_value, best_action
+
+
+class InPlaceExpectimaxSearch(InPlaceSearch, ExpectimaxSearch):
+
+    @InPlaceSearch._is_done
+    @override(InPlaceSearch)
+    def _search(self, depth: int) -> (float, A):
+        state = self._state()
+        if (cached := self._probe(state, depth)) is not None: return cached
+        maximize = True if self.mdp.current_agent() == MY_AGENT else False
+        values = []
+        best_value, best_action = float('-inf'), None
+        for action in self._ordered_actions(state, depth):
+            self.mdp.apply(action)
+            values.append(self._search(depth - 1)[0])
+            self.mdp.undo()
+            if maximize: best_value, best_action, _ = self._eval_scores(maximize, best_value, values[-1], best_action, action)
+        if not maximize:
+            # Calculate the expected value for chance nodes
+            best_value = sum(values) / len(values) if len(values) > 0 else 0
+        self._store(state, depth, best_value, best_action)
         return best_value, best_action
+
+
+class _Frame:
+    """ Node of the stack of a `StackSearch`, reused by all the nodes searched at its ply """
+    __slots__ = ("state", "depth", "maximize", "actions", "next", "best_value", "best_action", "alpha", "beta", "window_alpha", "window_beta")
+
+
+class StackSearch(AdversarialSearch):
+    """
+    Minimax search, or alpha-beta search if `pruning`, that walks the tree with a loop over an explicit stack of frames
+    instead of recursive calls. There is one frame per ply, allocated the first time the search reaches that ply and then
+    reused, so that a node only allocates its list of actions. It has no recursion limit, and it expands the same states
+    in the same order and returns the same (value, action) as `MinimaxSearch` or `AlphaBetaSearch`.
+    """
+
+    def __init__(self, mdp: MDP[A, S], transposition_table: Optional[TranspositionTable[A, S]] = None,
+                 move_ordering: Optional[MoveOrdering[A, S]] = None, evaluator: Optional[Evaluator[S]] = None, pruning: bool = True):
+        super().__init__(mdp, transposition_table, move_ordering, evaluator)
+        self.pruning = pruning
+        self.stack: list[_Frame] = []
+
+    @override(AdversarialSearch)
+    def search(self, state: S, max_depth: int, alpha: float=float('-inf'), beta: float=float('inf')) -> (float, A):
+        mdp, stack, stats, pruning = self.mdp, self.stack, self.stats, self.pruning
+        ply, depth = 0, max_depth
+        while True:
+            # Enters the node of `state` at `ply`: either its value is known, or its frame is pushed
+            if stats is not None: stats.node(ply, depth == 0)
+            if depth == 0:
+                value, action = state.value if self.evaluator is None else self._leaf_value(state), None
+            elif mdp.is_final(state):
+                value, action = state.value, None
+            elif (cached := self._probe(state, depth, alpha, beta)) is not None:
+                value, action = cached
+            else:
+                if ply == len(stack): stack.append(_Frame())
+                frame = stack[ply]
+                frame.state, frame.depth, frame.maximize = state, depth, state.current_agent == MY_AGENT
+                frame.best_value, frame.best_action = float('-inf') if frame.maximize else float('inf'), None
+                frame.alpha, frame.beta, frame.window_alpha, frame.window_beta = alpha, beta, alpha, beta
+                actions = self._ordered_actions(state, depth)
+                frame.actions, frame.next = actions if isinstance(actions, list) else list(actions), 0
+                ply += 1
+                value = None
+            # Backs the value up to the parents until one of them has a child left to search, which is then entered
+            while ply > 0:
+                frame = stack[ply - 1]
+                if stats is not None: stats.ply = ply - 1
+                if value is not None:
+                    if (value > frame.best_value) if frame.maximize else (value < frame.best_value):
+                        frame.best_value, frame.best_action = value, frame.actions[frame.next - 1]
+                    if pruning:
+                        if (frame.best_value >= frame.beta) if frame.maximize else (frame.best_value <= frame.alpha):
+                            self._cutoff(frame.state, frame.depth, frame.actions[frame.next - 1], frame.maximize)
+                            frame.next = len(frame.actions)
+                        elif frame.maximize: frame.alpha = max(frame.alpha, value)
+                        else: frame.beta = min(frame.beta, value)
+                if frame.next < len(frame.actions):
+                    state = mdp.transition(frame.state, frame.actions[frame.next])
+                    frame.next += 1
+                    depth = frame.depth - 1 if frame.maximize or state.current_agent == MY_AGENT else frame.depth
+                    alpha, beta = frame.alpha, frame.beta
+                    break
+                self._store(frame.state, frame.depth, frame.best_value, frame.best_action, frame.window_alpha, frame.window_beta)
+                value, action = frame.best_value, frame.best_action
+                # The state is not kept alive by the stack
+                frame.state = frame.actions = None
+                ply -= 1
+            else:
+                return value, action
+
+
+class BatchedSearch(AdversarialSearch):
+    """
+    Minimax (or expectimax if `chance`) search that evaluates its leaves in batches: the tree is expanded down to the depth
+    limit, the non-final leaves are evaluated by `evaluator.evaluate_batch` each time `batch_size` of them are waiting,
+    and the values are then backed up. Without pruning, it expands the same states and returns the same (value, action)
+    as `MinimaxSearch` (or `ExpectimaxSearch`) with the same evaluator, but keeps the whole tree in memory.
+    """
+
+    def __init__(self, mdp: MDP[A, S], evaluator: Optional[Evaluator[S]] = None, batch_size: int = 1024, chance: bool = False):
+        if batch_size < 1: raise ValueError("The batch size must be at least 1.")
+        super().__init__(mdp, evaluator=evaluator if evaluator is not None else ValueEvaluator())
+        self.batch_size = batch_size
+        self.chance = chance
+
+    def _flush(self):
+        """ Evaluates the waiting leaves """
+        if len(self.pending) == 0: return
+        indices, states = zip(*self.pending)
+        for index, value in zip(indices, self.evaluator.evaluate_batch(list(states)).tolist()): self.values[index] = value
+        self.pending.clear()
+
+    def _leaf(self, value: Optional[float], state: Optional[S] = None) -> int:
+        """ Adds a leaf whose value is known, or waits for the evaluation of `state`, and returns its index in `values` """
+        self.values.append(value)
+        if state is not None:
+            self.pending.append((len(self.values) - 1, state))
+            if len(self.pending) >= self.batch_size: self._flush()
+        return len(self.values) - 1
+
+    def _expand(self, state: S, depth: int):
+        """ Returns the tree of the state: the index of a leaf, or (maximize, [(action, subtree)]) """
+        if depth == 0: return self._leaf(None, state) if not self.mdp.is_final(state) else self._leaf(state.value)
+        if self.mdp.is_final(state): return self._leaf(state.value)
+        maximize = True if state.current_agent == MY_AGENT else False
+        children = []
+        for new_state, action in self._get_successors(state, maximize, depth):
+            if self.chance: new_depth = depth - 1
+            else: new_depth = depth - 1 if maximize or new_state.current_agent == MY_AGENT else depth
+            children.append((action, self._expand(new_state, new_depth)))
+        return maximize, children
+
+    def _back_up(self, tree) -> (float, A):
+        if isinstance(tree, int): return self.values[tree], None
+        maximize, children = tree
+        if self.chance and not maximize:
+            return sum(self._back_up(subtree)[0] for _, subtree in children) / len(children) if len(children) > 0 else 0, None
+        best_value = float('-inf') if maximize else float('inf')
+        best_action = None
+        for action, subtree in children:
+            best_value, best_action, _ = self._eval_scores(maximize, best_value, self._back_up(subtree)[0], best_action, action)
+        return best_value, best_action
+
+    @override(AdversarialSearch)
+    def search(self, state: S, max_depth: int) -> (float, A):
+        self.values: list[Optional[float]] = []
+        self.pending: list[tuple[int, S]] = []
+        tree = self._expand(state, max_depth)
+        self._flush()
+        return self._back_up(tree)
+
+
+class SearchInterrupted(Exception):
+    """ Raised inside a search when its budget is spent """
+
+
+@dataclass
+class IterationReport:
+    depth: int
+    value: float
+    action: A
+    n_expanded_states: int
+    elapsed: float
+    completed: bool
+
+
+class IterativeDeepeningSearch(AlphaBetaSearch):
+    """
+    Anytime alpha-beta search. Each iteration searches one level deeper than the previous one, with the root
+    actions sorted by the values of the previous iteration, until `max_depth` is reached or the budget is spent.
+    The best action of the last completed iteration is always available, and `reports` describes every iteration.
+    """
+
+    def __init__(self, mdp: MDP[A, S], time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+                 transposition_table: Optional[TranspositionTable[A, S]] = None, move_ordering: Optional[MoveOrdering[A, S]] = None):
+        super().__init__(mdp, transposition_table, move_ordering)
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.reports: list[IterationReport] = []
+
+    def _check_budget(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline: raise SearchInterrupted()
+        if self.node_limit is not None and self.mdp.n_expanded_states >= self.node_limit: raise SearchInterrupted()
+
+    @override(AdversarialSearch)
+    def _get_successors(self, state: S, maximize: bool, depth: int) -> [S]:
+        for action in self._ordered_actions(state, depth):
+            self._check_budget()
+            yield self.mdp.transition(state, action), action
+
+    def _search_root(self, state: S, depth: int, actions: list[A], order: list[int], scores: list[float]):
+        for i in order:
+            self._check_budget()
+            alpha = self.best[0] if self.best is not None else float('-inf')
+            # Searching just below alpha gives tied actions an exact value, so that ties are broken as in AlphaBetaSearch
+            value = self.search(self.mdp.transition(state, actions[i]), depth - 1, math.nextafter(alpha, float('-inf')), float('inf'))[0]
+            scores[i] = value
+            if self.best is None or value > self.best[0] or (value == self.best[0] and i < self.best_index):
+                self.best, self.best_index = (value, actions[i]), i
+
+    def run(self, state: S, max_depth: int) -> (float, A):
+        self.deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self.node_limit = self.mdp.n_expanded_states + self.node_budget if self.node_budget is not None else None
+        self.reports = []
+        if self.mdp.is_final(state): return state.value, None
+        actions = list(self.mdp.available_actions(state))
+        result = (float('-inf'), actions[0] if len(actions) > 0 else None)
+        scores = [float('-inf')] * len(actions)
+        for depth in range(1, max_depth + 1):
+            iteration_start, iteration_states = time.perf_counter(), self.mdp.n_expanded_states
+            order = sorted(range(len(actions)), key=lambda i: (-scores[i], i))
+            scores, self.best = [float('-inf')] * len(actions), None
+            try:
+                self._search_root(state, depth, actions, order, scores)
+                completed = True
+            except SearchInterrupted:
+                completed = False
+            # A partial iteration still improves on the previous one: its first action was the previous best
+            if self.best is not None: result = self.best
+            self.reports.append(IterationReport(depth, *result, self.mdp.n_expanded_states - iteration_states, time.perf_counter() - iteration_start, completed))
+            if not completed: break
+        return result
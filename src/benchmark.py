@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the searches: every cell of a grid of worlds, depths, MDP classes and algorithms is run `warmup` times,
+then timed `repeats` times, and once more under tracemalloc, and its costs are written as CSV or JSON lines.
+"""
+import argparse
+import csv
+import functools
+import json
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, fields, asdict
+from typing import Callable, Iterator, Optional
+from lle import World
+from world_mdp import WorldMDP, BetterValueFunction
+from adversarial_search import minimax, alpha_beta, expectimax, pvs
+
+
+Algorithm = Callable[[WorldMDP, object, int], object]
+
+
+def run_all(cell: "BenchmarkCell") -> bool:
+    return False
+
+
+@dataclass(frozen=True)
+class BenchmarkCell:
+    world: str
+    depth: int
+    mdp: str
+    algorithm: str
+
+
+@dataclass
+class BenchmarkGrid:
+    """
+    Cartesian product of named worlds (world strings), depths, MDP classes and named algorithms, minus the cells that `skip`.
+    The algorithms must be picklable (i.e. module-level functions) to run the grid in other processes.
+    """
+    worlds: dict[str, str]
+    depths: list[int]
+    mdp_classes: list[type[WorldMDP]]
+    algorithms: dict[str, Algorithm]
+    skip: Callable[[BenchmarkCell], bool] = run_all
+
+    def cells(self) -> Iterator[BenchmarkCell]:
+        for world in self.worlds:
+            for depth in self.depths:
+                for mdp_class in self.mdp_classes:
+                    for algorithm in self.algorithms:
+                        cell = BenchmarkCell(world, depth, mdp_class.__name__, algorithm)
+                        if not self.skip(cell): yield cell
+
+    def mdp_class(self, name: str) -> type[WorldMDP]:
+        return next(mdp_class for mdp_class in self.mdp_classes if mdp_class.__name__ == name)
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Costs of a cell. Times are in seconds: `wall_time` and `cpu_time` are medians over the repeats, and `nodes_per_second`
+    is `n_expanded_states / wall_time`. Memory is in bytes: `peak_rss` is the peak resident set size of the process so far,
+    which never decreases, and `tracemalloc_peak` the peak of the memory allocated by Python during the traced run.
+    """
+    world: str
+    depth: int
+    mdp: str
+    algorithm: str
+    action: str
+    n_expanded_states: int
+    repeats: int
+    wall_time: float
+    wall_time_min: float
+    cpu_time: float
+    nodes_per_second: float
+    peak_rss: int
+    tracemalloc_peak: int
+
+    @property
+    def cell(self) -> BenchmarkCell:
+        return BenchmarkCell(self.world, self.depth, self.mdp, self.algorithm)
+
+
+def _peak_rss() -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Benchmark:
+    def __init__(self, grid: BenchmarkGrid, repeats: int = 3, warmup: int = 1, trace_memory: bool = True):
+        if repeats < 1: raise ValueError("A benchmark needs at least 1 repeat.")
+        self.grid = grid
+        self.repeats = repeats
+        self.warmup = warmup
+        self.trace_memory = trace_memory
+
+    def _run_once(self, cell: BenchmarkCell) -> tuple[object, int, float, float]:
+        """ Runs the algorithm of the cell on a new MDP, and returns the action, the number of expanded states, and the wall and CPU times """
+        mdp = self.grid.mdp_class(cell.mdp)(World(self.grid.worlds[cell.world]))
+        state = mdp.reset()
+        algorithm = self.grid.algorithms[cell.algorithm]
+        wall, cpu = time.perf_counter(), time.process_time()
+        action = algorithm(mdp, state, cell.depth)
+        return action, mdp.n_expanded_states, time.perf_counter() - wall, time.process_time() - cpu
+
+    def _traced_peak(self, cell: BenchmarkCell) -> int:
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            self._run_once(cell)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def run_cell(self, cell: BenchmarkCell) -> BenchmarkResult:
+        for _ in range(self.warmup): self._run_once(cell)
+        runs = [self._run_once(cell) for _ in range(self.repeats)]
+        action, n_expanded_states = runs[0][:2]
+        wall_times = [run[2] for run in runs]
+        wall_time = statistics.median(wall_times)
+        tracemalloc_peak = self._traced_peak(cell) if self.trace_memory else 0
+        return BenchmarkResult(cell.world, cell.depth, cell.mdp, cell.algorithm, getattr(action, "name", str(action)), n_expanded_states,
+                               self.repeats, wall_time, min(wall_times), statistics.median(run[3] for run in runs),
+                               n_expanded_states / wall_time if wall_time > 0 else float('inf'), _peak_rss(), tracemalloc_peak)
+
+    def run(self, on_result: Optional[Callable[[BenchmarkResult], None]] = None) -> list[BenchmarkResult]:
+        results = []
+        for cell in self.grid.cells():
+            results.append(self.run_cell(cell))
+            if on_result is not None: on_result(results[-1])
+        return results
+
+
+FIELDNAMES = [f.name for f in fields(BenchmarkResult)]
+
+
+def write_csv(results: list[BenchmarkResult], filename: str):
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for result in results: writer.writerow(asdict(result))
+
+
+def write_json(results: list[BenchmarkResult], filename: str):
+    """ Writes one JSON object per line """
+    with open(filename, 'w') as f:
+        for result in results: f.write(json.dumps(asdict(result)) + "\n")
+
+
+def read_csv(filename: str) -> list[BenchmarkResult]:
+    types = {f.name: f.type for f in fields(BenchmarkResult)}
+    with open(filename, newline='') as csvfile:
+        return [BenchmarkResult(**{name: types[name](value) for name, value in row.items()}) for row in csv.DictReader(csvfile)]
+
+
+def read_json(filename: str) -> list[BenchmarkResult]:
+    with open(filename) as f:
+        return [BenchmarkResult(**json.loads(line)) for line in f if line.strip()]
+
+
+def random_states(mdp: WorldMDP, n: int, seed: int = 0, final: bool = True) -> list:
+    """ n states visited by random walks from the initial state, which start again after the final states (left out if not `final`) """
+    rng = random.Random(seed)
+    state = mdp.reset()
+    states = [state]
+    while len(states) < n:
+        if mdp.is_final(state): state = mdp.reset()
+        state = mdp.transition(state, rng.choice(mdp.available_actions(state)))
+        if final or not mdp.is_final(state): states.append(state)
+    return states
+
+
+def default_grid(max_depth: int) -> BenchmarkGrid:
+    """ The worlds of `generateGraphics` with the algorithms of the report, without minimax on `BetterValueFunction` as there """
+    from generateGraphics import WORLD1, WORLD2, WORLD3
+    return BenchmarkGrid(
+        worlds={"1": WORLD1.world_string, "2": WORLD2.world_string, "3": WORLD3.world_string},
+        depths=[*range(1, max_depth + 1)],
+        mdp_classes=[WorldMDP, BetterValueFunction],
+        algorithms={"minimax": minimax, "alpha_beta": alpha_beta, "pvs": pvs, "expectimax": expectimax},
+        skip=lambda cell: cell.algorithm == "minimax" and cell.mdp == BetterValueFunction.__name__,
+    )
+
+
+def persistent_algorithms(directory: str) -> dict[str, Algorithm]:
+    """
+    `alpha_beta` with its persistent transposition table: empty at every run (cold), or kept in `directory` for the whole
+    sweep (warm), so that a deeper depth, a repeat or a later benchmark in the same directory starts with the entries of
+    the runs before it.
+    """
+    from persistent_transposition_table import persistent_alpha_beta, cold_persistent_alpha_beta
+    return {"persistent_alpha_beta_cold": cold_persistent_alpha_beta,
+            "persistent_alpha_beta_warm": functools.partial(persistent_alpha_beta, directory=directory)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip the traced run of each cell")
+    parser.add_argument("--persistent-tt", action="store_true",
+                        help="also run alpha_beta with its persistent transposition table, cold (empty at every run) and warm")
+    parser.add_argument("--tt-directory", default=None, help="directory of the warm persistent tables (default: a new temporary one)")
+    parser.add_argument("--output", default="benchmark.csv", help="output file, written as JSON lines if it ends with .jsonl")
+    args = parser.parse_args()
+    grid = default_grid(args.max_depth)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.persistent_tt: grid.algorithms.update(persistent_algorithms(args.tt_directory or directory))
+        benchmark = Benchmark(grid, args.repeats, args.warmup, not args.no_tracemalloc)
+        results = benchmark.run(lambda r: print(f"world {r.world} depth {r.depth:>2} {r.mdp:<19} {r.algorithm:<10} {r.action:<5} "
+                                                f"{r.n_expanded_states:>8} states {r.wall_time:>8.4f}s {r.nodes_per_second:>9.0f} states/s "
+                                                f"{r.tracemalloc_peak / 1024:>8.0f} KiB"))
+    (write_json if args.output.endswith(".jsonl") else write_csv)(results, args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+""" Compares Best-Reply Search with the paranoid alpha-beta search on the worlds of `matiass`, which have three agents """
+import argparse
+from benchmark import Benchmark, BenchmarkGrid, write_csv
+from adversarial_search import alpha_beta, best_reply
+from world_mdp import WorldMDP, BetterValueFunction
+from matiass import WORLDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-depth", type=int, default=9)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", default=None, help="CSV file to write the results to")
+    args = parser.parse_args()
+    grid = BenchmarkGrid(
+        worlds={str(i): world.world_string for i, world in enumerate(WORLDS)},
+        depths=[*range(1, args.max_depth + 1)],
+        mdp_classes=[WorldMDP, BetterValueFunction],
+        algorithms={"alpha_beta": alpha_beta, "best_reply": best_reply},
+    )
+    paranoid = {}
+
+    def show(r):
+        if r.algorithm == "alpha_beta": paranoid[(r.world, r.depth, r.mdp)] = r
+        other = paranoid.get((r.world, r.depth, r.mdp))
+        speedup = f"{other.wall_time / r.wall_time:>6.1f}x" if r.algorithm == "best_reply" and other is not None and r.wall_time > 0 else ""
+        print(f"world {r.world} depth {r.depth:>2} {r.mdp:<19} {r.algorithm:<10} {r.action:<5} {r.n_expanded_states:>9} states "
+              f"{r.wall_time:>8.3f}s {speedup}")
+    results = Benchmark(grid, args.repeats, warmup=0, trace_memory=False).run(show)
+    if args.output is not None: write_csv(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+""" Compares the leaves evaluated per second by the scalar path (one `evaluate` per leaf) and by `evaluate_batch` """
+import time
+from lle import World
+from benchmark import random_states
+from world_mdp import WorldMDP, BetterValueFunction
+from evaluator import Evaluator, ValueEvaluator, DistanceEvaluator, PathDistanceEvaluator
+from adversarial_search import MinimaxSearch, BatchedSearch
+from generateGraphics import WORLD1, WORLD2, WORLD3
+
+N_LEAVES = 100_000
+BATCH_SIZE = 1024
+SEARCH_DEPTH = 5
+
+
+def leaves_per_second(evaluator: Evaluator, leaves: list, batch_size: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    for state in leaves: evaluator.evaluate(state)
+    scalar = len(leaves) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(0, len(leaves), batch_size): evaluator.evaluate_batch(leaves[i:i + batch_size])
+    batched = len(leaves) / (time.perf_counter() - start)
+    return scalar, batched
+
+
+def search_time(search, state) -> float:
+    start = time.perf_counter()
+    search.search(state, SEARCH_DEPTH)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for i, world in enumerate((WORLD1, WORLD2, WORLD3), start=1):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            mdp = mdp_class(World(world.world_string))
+            leaves = random_states(mdp, N_LEAVES, final=False)
+            for evaluator in (ValueEvaluator(), DistanceEvaluator(mdp.world), PathDistanceEvaluator(mdp.world)):
+                scalar, batched = leaves_per_second(evaluator, leaves, BATCH_SIZE)
+                scalar_search = search_time(MinimaxSearch(mdp, evaluator=evaluator), mdp.reset())
+                batched_search = search_time(BatchedSearch(mdp, evaluator, BATCH_SIZE), mdp.reset())
+                print(f"World {i} {mdp_class.__name__:<19} {type(evaluator).__name__:<21} "
+                      f"leaves/s: scalar {scalar:>10.0f} batched {batched:>10.0f} ({batched / scalar:.1f}x)   "
+                      f"minimax depth {SEARCH_DEPTH}: scalar {scalar_search:.3f}s batched {batched_search:.3f}s")
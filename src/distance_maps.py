@@ -0,0 +1,73 @@
+from typing import Optional
+import numpy as np
+from lle import World
+from world_mdp import DELTAS
+
+# Distance of the tiles from which a target cannot be reached
+UNREACHABLE = -1
+
+
+def _bfs(sources: list[tuple[int, int]], passable: np.ndarray) -> np.ndarray:
+    """ Number of moves from each tile to the nearest source over the passable tiles (`UNREACHABLE` if there is no path) """
+    distances = np.full(passable.shape, UNREACHABLE, dtype=np.int64)
+    frontier = [source for source in sources if passable[source]]
+    for source in frontier: distances[source] = 0
+    distance = 0
+    while len(frontier) > 0:
+        distance += 1
+        next_frontier = []
+        for i, j in frontier:
+            for di, dj in DELTAS.values():
+                k, l = i + di, j + dj
+                if 0 <= k < passable.shape[0] and 0 <= l < passable.shape[1] and passable[k, l] and distances[k, l] == UNREACHABLE:
+                    distances[k, l] = distance
+                    next_frontier.append((k, l))
+        frontier = next_frontier
+    return distances
+
+
+class DistanceMaps:
+    """
+    Shortest paths of an agent to every gem and to the nearest exit, by breadth-first search over the tiles it can walk on
+    safely: not the walls, laser sources and voids, nor the beams of the lasers of the other agents, even those that could
+    be blocked. `gems[g, i, j]` and `exits[i, j]` are the number of moves from (i, j), or `UNREACHABLE`. The maps are also
+    kept in dicts by the 16-bit word of the position in a packed state (i | j << 8), for single reads by the search.
+    """
+
+    def __init__(self, world: World, agent: int):
+        shape = (world.height, world.width)
+        sources = [position for position, _ in world.laser_sources]
+        passable = np.ones(shape, dtype=bool)
+        for position in [*world.wall_pos, *world.void_pos, *sources]: passable[position] = False
+        blocking = set(world.wall_pos) | set(sources)
+        for (i, j), source in world.laser_sources:
+            if source.agent_id == agent: continue
+            di, dj = DELTAS[source.direction.name]
+            i, j = i + di, j + dj
+            while 0 <= i < shape[0] and 0 <= j < shape[1] and (i, j) not in blocking:
+                passable[i, j] = False
+                i, j = i + di, j + dj
+        self.agent = agent
+        self.exits = _bfs(list(world.exit_pos), passable)
+        self.gems = np.stack([_bfs([position], passable) for position, _ in world.gems]) if world.n_gems > 0 \
+            else np.zeros((0, *shape), dtype=np.int64)
+        word = lambda i, j: int(i) | int(j) << 8
+        self.exit_words = {word(i, j): int(self.exits[i, j]) for i in range(shape[0]) for j in range(shape[1])}
+        self.gem_words = [{word(i, j): int(gem[i, j]) for i in range(shape[0]) for j in range(shape[1])} for gem in self.gems]
+
+    @property
+    def max_distance(self) -> int:
+        """ Longest finite distance of the maps """
+        return int(max(self.exits.max(initial=0), self.gems.max(initial=0)))
+
+
+# Distance maps by world string and agent, computed once per world
+_cache: dict[tuple[str, int], DistanceMaps] = {}
+
+
+def distance_maps(world: World, agent: int = 0) -> DistanceMaps:
+    key = (world.world_string, agent)
+    maps: Optional[DistanceMaps] = _cache.get(key)
+    if maps is None:
+        maps = _cache[key] = DistanceMaps(world, agent)
+    return maps
@@ -0,0 +1,137 @@
+from abc import ABC, abstractmethod
+from typing import Generic
+import numpy as np
+from lle import World
+from mdp import S
+from world_mdp import MY_AGENT, MyWorldState
+from distance_maps import UNREACHABLE, distance_maps
+
+
+class Evaluator(ABC, Generic[S]):
+    """
+    Value of the non-final leaves of a depth-limited search. `evaluate_batch` evaluates many leaves with one
+    vectorized call, and `evaluate` a single leaf, which is what the search calls when it does not batch its leaves.
+    """
+
+    @abstractmethod
+    def evaluate_batch(self, states: list[S]) -> np.ndarray:
+        ...
+
+    def evaluate(self, state: S) -> float:
+        return float(self.evaluate_batch([state])[0])
+
+
+class ValueEvaluator(Evaluator[S]):
+    """ Running score of the state, i.e. the value computed by the MDP (`WorldMDP` or `BetterValueFunction`) """
+
+    def evaluate_batch(self, states: list[S]) -> np.ndarray:
+        return np.fromiter((state.value for state in states), dtype=np.float64, count=len(states))
+
+    def evaluate(self, state: S) -> float:
+        return state.value
+
+
+class DistanceEvaluator(ValueEvaluator[MyWorldState]):
+    """
+    Running score of the state minus penalties for the Manhattan distance from my agent to the nearest exit and to the
+    nearest gem left. Distances are divided by the height + width of the world, so that the penalties stay below
+    `exit_weight + gem_weight` and never outweigh a reward when both weights sum to less than 1.
+    """
+
+    def __init__(self, world: World, exit_weight: float = 0.5, gem_weight: float = 0.25):
+        self.exit_weight = exit_weight
+        self.gem_weight = gem_weight
+        self.scale = world.height + world.width
+        self.exits = np.array(world.exit_pos, dtype=np.int64).reshape(-1, 2)
+        self.gems = np.array([position for position, _ in world.gems], dtype=np.int64).reshape(-1, 2)
+        self._exits, self._gems = self.exits.tolist(), self.gems.tolist()
+        # Bit of each gem in the collected gems of a packed state, once shifted (see `pack_world_state`)
+        self.gem_shift = 16 + 16 * world.n_agents
+        self.gem_bits = np.left_shift(np.uint64(1), np.arange(len(self.gems), dtype=np.uint64))
+
+    def evaluate_batch(self, states: list[MyWorldState]) -> np.ndarray:
+        n = len(states)
+        shift, gem_shift = 16 + 16 * MY_AGENT, self.gem_shift
+        words = np.fromiter((state.packed >> shift & 0xFFFF for state in states), dtype=np.int64, count=n)
+        positions = np.stack((words & 0xFF, words >> 8), axis=1)
+        values = super().evaluate_batch(states)
+        if len(self.exits) > 0:
+            exit_distances = np.abs(positions[:, None, :] - self.exits[None, :, :]).sum(axis=2).min(axis=1)
+            values -= self.exit_weight * exit_distances / self.scale
+        if len(self.gems) > 0:
+            collected = np.fromiter((state.packed >> gem_shift for state in states), dtype=np.uint64, count=n)
+            left = (collected[:, None] & self.gem_bits[None, :]) == 0
+            gem_distances = np.abs(positions[:, None, :] - self.gems[None, :, :]).sum(axis=2)
+            nearest = np.where(left, gem_distances, np.iinfo(np.int64).max).min(axis=1)
+            values -= np.where(left.any(axis=1), self.gem_weight * nearest / self.scale, 0.0)
+        return values
+
+    def evaluate(self, state: MyWorldState) -> float:
+        i, j = state.agent_position(MY_AGENT)
+        value = state.value
+        if len(self.exits) > 0:
+            value -= self.exit_weight * min(abs(i - ei) + abs(j - ej) for ei, ej in self._exits) / self.scale
+        collected = state.packed >> self.gem_shift
+        gems_left = [(gi, gj) for g, (gi, gj) in enumerate(self._gems) if not collected >> g & 1]
+        if len(gems_left) > 0:
+            value -= self.gem_weight * min(abs(i - gi) + abs(j - gj) for gi, gj in gems_left) / self.scale
+        return value
+
+
+class PathDistanceEvaluator(ValueEvaluator[MyWorldState]):
+    """
+    `DistanceEvaluator` with the lengths of the shortest safe paths of my agent (see `DistanceMaps`) instead of Manhattan
+    distances, so that walls and laser beams count. Distances are divided by the longest path of the world + 1, which
+    is also the distance of the targets that cannot be reached. The distance to the nearest gem left is read from one
+    map per set of collected gems, built the first time that set is seen.
+    """
+
+    def __init__(self, world: World, exit_weight: float = 0.5, gem_weight: float = 0.25):
+        self.exit_weight = exit_weight
+        self.gem_weight = gem_weight
+        self.maps = distance_maps(world, MY_AGENT)
+        self.scale = self.maps.max_distance + 1
+        self.gem_shift = 16 + 16 * world.n_agents
+        self.all_gems = (1 << world.n_gems) - 1
+        self._exits = {word: (distance if distance != UNREACHABLE else self.scale) / self.scale
+                       for word, distance in self.maps.exit_words.items()}
+        # Distance to the nearest gem left by word, by mask of the collected gems
+        self._nearest_gem: dict[int, dict[int, float]] = {}
+
+    def _nearest_gems(self, collected: int) -> dict[int, float]:
+        nearest = {}
+        for g, gem in enumerate(self.maps.gem_words):
+            if collected >> g & 1: continue
+            for word, distance in gem.items():
+                distance = (distance if distance != UNREACHABLE else self.scale) / self.scale
+                if distance < nearest.get(word, 2.0): nearest[word] = distance
+        self._nearest_gem[collected] = nearest
+        return nearest
+
+    def evaluate_batch(self, states: list[MyWorldState]) -> np.ndarray:
+        n = len(states)
+        shift = 16 + 16 * MY_AGENT
+        words = np.fromiter((state.packed >> shift & 0xFFFF for state in states), dtype=np.int64, count=n)
+        rows, columns = words & 0xFF, words >> 8
+        values = super().evaluate_batch(states)
+        exits = self.maps.exits[rows, columns]
+        values -= self.exit_weight * np.where(exits == UNREACHABLE, self.scale, exits) / self.scale
+        if len(self.maps.gems) > 0:
+            collected = np.fromiter((state.packed >> self.gem_shift for state in states), dtype=np.uint64, count=n)
+            bits = np.left_shift(np.uint64(1), np.arange(len(self.maps.gems), dtype=np.uint64))
+            left = (collected[:, None] & bits[None, :]) == 0
+            gems = self.maps.gems[:, rows, columns].T
+            gems = np.where(gems == UNREACHABLE, self.scale, gems)
+            nearest = np.where(left, gems, self.scale).min(axis=1)
+            values -= np.where(left.any(axis=1), self.gem_weight * nearest / self.scale, 0.0)
+        return values
+
+    def evaluate(self, state: MyWorldState) -> float:
+        word = state.packed >> (16 + 16 * MY_AGENT) & 0xFFFF
+        value = state.value - self.exit_weight * self._exits[word]
+        collected = state.packed >> self.gem_shift
+        if collected != self.all_gems:
+            nearest = self._nearest_gem.get(collected)
+            if nearest is None: nearest = self._nearest_gems(collected)
+            value -= self.gem_weight * nearest[word]
+        return value
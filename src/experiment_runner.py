@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Runs the cells of a benchmark grid (by default the depth sweeps of `generateGraphics`) over a process pool,
+and resumes where it stopped if it is started again with the same output file.
+"""
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+from typing import Callable, Optional
+from benchmark import Benchmark, BenchmarkCell, BenchmarkResult, FIELDNAMES, default_grid, read_csv, run_all
+
+
+# Benchmark of a worker process, set by `_init_worker`
+_benchmark: Optional[Benchmark] = None
+
+
+def _init_worker(benchmark: Benchmark):
+    global _benchmark
+    _benchmark = benchmark
+
+
+def _run_cell(cell: BenchmarkCell) -> BenchmarkResult:
+    return _benchmark.run_cell(cell)
+
+
+def _sync(file):
+    """ Only returns once what was written to the file is on the disk """
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _drop_partial_line(filename: str):
+    """ Removes what follows the last newline of the file, i.e. a line that was being written when the runner stopped """
+    if not os.path.exists(filename): return
+    with open(filename, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data): f.truncate(end)
+
+
+class ExperimentRunner:
+    """
+    Runs the cells of a benchmark over `n_workers` processes and writes their results to a CSV file, in the order of the
+    grid whatever the order in which they finish:
+        - each result is appended to a journal (`<filename>.journal`, JSON lines) as soon as it is received,
+        - the results are then appended to the CSV file once all the cells before them are in it (reorder buffer).
+    Every append is fsync'd, so a crash or an interruption loses at most the cells that were running. When the runner is
+    started again with the same grid and file, the cells found in the CSV file or in the journal are not run again.
+    The journal is removed once the CSV file is complete.
+    """
+
+    def __init__(self, benchmark: Benchmark, filename: str, n_workers: Optional[int] = None):
+        self.benchmark = benchmark
+        self.filename = str(filename)
+        self.journal_filename = self.filename + ".journal"
+        self.n_workers = n_workers
+        self.n_run = 0
+
+    def _load(self, cells: list[BenchmarkCell]) -> tuple[int, dict[BenchmarkCell, BenchmarkResult]]:
+        """ Returns the number of rows of the CSV file and the results that are already known """
+        _drop_partial_line(self.filename)
+        _drop_partial_line(self.journal_filename)
+        written = read_csv(self.filename) if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0 else []
+        if [result.cell for result in written] != cells[:len(written)]:
+            raise ValueError(f"{self.filename} does not hold the results of the grid of this runner.")
+        done = {result.cell: result for result in written}
+        if os.path.exists(self.journal_filename):
+            with open(self.journal_filename) as journal:
+                for line in journal:
+                    result = BenchmarkResult(**json.loads(line))
+                    done.setdefault(result.cell, result)
+        return len(written), done
+
+    def run(self, on_result: Optional[Callable[[BenchmarkResult], None]] = None) -> list[BenchmarkResult]:
+        """ Runs the cells that are not done yet, calls `on_result` with each new result, and returns all the results in order """
+        cells = list(self.benchmark.grid.cells())
+        n_written, done = self._load(cells)
+        indices = {cell: i for i, cell in enumerate(cells)}
+        # Results that are not in the CSV file yet, by index in the grid
+        pending = {indices[cell]: result for cell, result in done.items() if indices.get(cell, -1) >= n_written}
+        todo = [cell for cell in cells if cell not in done]
+        self.n_run = 0
+        with open(self.filename, 'a', newline='') as csvfile, open(self.journal_filename, 'a') as journal:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            if n_written == 0 and csvfile.tell() == 0:
+                writer.writeheader()
+                _sync(csvfile)
+
+            def flush():
+                nonlocal n_written
+                while n_written in pending:
+                    writer.writerow(asdict(pending.pop(n_written)))
+                    _sync(csvfile)
+                    n_written += 1
+
+            flush()
+            if len(todo) > 0:
+                # The workers do not need `skip`, which may not be picklable
+                benchmark = Benchmark(replace(self.benchmark.grid, skip=run_all), self.benchmark.repeats, self.benchmark.warmup,
+                                      self.benchmark.trace_memory)
+                with ProcessPoolExecutor(self.n_workers, initializer=_init_worker, initargs=(benchmark,)) as pool:
+                    futures = {pool.submit(_run_cell, cell): indices[cell] for cell in todo}
+                    try:
+                        for future in as_completed(futures):
+                            result = future.result()
+                            journal.write(json.dumps(asdict(result)) + "\n")
+                            _sync(journal)
+                            self.n_run += 1
+                            pending[futures[future]] = result
+                            flush()
+                            if on_result is not None: on_result(result)
+                    except BaseException:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        raise
+        if n_written == len(cells): os.remove(self.journal_filename)
+        return read_csv(self.filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-depth", type=int, default=15)
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also run each cell under tracemalloc")
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+    benchmark = Benchmark(default_grid(args.max_depth), args.repeats, args.warmup, args.tracemalloc)
+    runner = ExperimentRunner(benchmark, args.output, args.workers)
+    runner.run(lambda r: print(f"world {r.world} depth {r.depth:>2} {r.mdp:<19} {r.algorithm:<10} {r.n_expanded_states:>10} states {r.wall_time:>9.3f}s"))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import numpy as np
+import lle
+from lle import World, Action
+from mdp import MDP, ReversibleMDP
+from world_mdp import WorldMDP, BetterValueFunction, MyWorldState, override, DELTAS
+
+
+# Actions in the order of `World.available_actions`
+MOVES = (Action.NORTH, Action.EAST, Action.SOUTH, Action.WEST)
+
+
+def _mask(positions: list[tuple[int, int]], shape: tuple[int, int]) -> np.ndarray:
+    mask = np.zeros(shape, dtype=bool)
+    if len(positions) > 0: mask[tuple(np.array(positions).T)] = True
+    return mask
+
+
+class FastWorldMDP(WorldMDP):
+    """
+    `WorldMDP` that only uses lle to build the world and its initial state: the walls, exits, voids, gems and laser
+    beams are precomputed into NumPy arrays, and the moves of the agents are simulated on the packed states directly.
+    The search reads them through dicts and sets built from the arrays, which are faster than NumPy for single reads.
+    States, values and actions are the same as those of `WorldMDP`, whose value function (`_compute_value`) is
+    used, so that `FastBetterValueFunction` scores states like `BetterValueFunction`:
+        - like `World.step`, a move collects the gem and kills the agent if it enters a void or an active laser beam
+          of another agent, and only the agent that moves can die during a step;
+        - like `World.set_state`, a state is final if all agents are on exits or if any agent is in a void
+          or in a laser beam of another agent that is not blocked before it by the agent of the laser.
+    The in-place interface keeps the path of states, since a transition no longer needs the world.
+    """
+
+    def __init__(self, world: World):
+        super().__init__(world)
+        shape = (world.height, world.width)
+        sources = [position for position, _ in world.laser_sources]
+        self.walkable = ~(_mask(world.wall_pos, shape) | _mask(sources, shape))
+        self.exits = _mask(world.exit_pos, shape)
+        self.voids = _mask(world.void_pos, shape)
+        # Laser beams: the agent of each beam, and the index along the beam of every tile that it goes through (or -1)
+        self.beam_agents = np.array([source.agent_id for _, source in world.laser_sources], dtype=np.int64)
+        self.beam_indices = np.full((len(sources), *shape), -1, dtype=np.int64)
+        for beam, (position, source) in enumerate(world.laser_sources):
+            (i, j), (di, dj) = position, DELTAS[source.direction.name]
+            index = 0
+            while 0 <= i + di < shape[0] and 0 <= j + dj < shape[1] and self.walkable[i + di, j + dj]:
+                i, j = i + di, j + dj
+                self.beam_indices[beam, i, j] = index
+                index += 1
+        # Tables for the search, indexed by the 16-bit word of a position in a packed state (i | j << 8), since single
+        # reads in dicts and sets are faster than in NumPy arrays: the exits and voids, the tile reached by each move
+        # from a tile (in the order of `World.available_actions`), the gem bit of each tile, and the beams through each tile
+        word = lambda i, j: int(i) | int(j) << 8
+        self._exit_words = {word(i, j) for i, j in zip(*np.nonzero(self.exits))}
+        self._void_words = {word(i, j) for i, j in zip(*np.nonzero(self.voids))}
+        self._moves = {word(i, j): [(action, word(i + action.delta[0], j + action.delta[1])) for action in MOVES
+                                    if 0 <= i + action.delta[0] < shape[0] and 0 <= j + action.delta[1] < shape[1]
+                                    and self.walkable[i + action.delta[0], j + action.delta[1]]]
+                       for i, j in zip(*np.nonzero(self.walkable))}
+        self._targets = {tile: {action.value: target for action, target in moves} for tile, moves in self._moves.items()}
+        self._gem_bits = {word(i, j): bit for (i, j), bit in self.gem_bits.items()}
+        beam_words = [{word(i, j): int(indices[i, j]) for i, j in zip(*np.nonzero(indices >= 0))} for indices in self.beam_indices]
+        self._beams: dict[int, list[tuple[int, dict[int, int], int]]] = {}
+        for beam, words in enumerate(beam_words):
+            for tile, index in words.items():
+                self._beams.setdefault(tile, []).append((int(self.beam_agents[beam]), words, index))
+        self._path: list[MyWorldState] = []
+
+    @staticmethod
+    def _words(packed: int) -> list[int]:
+        return [packed >> (16 + 16 * agent) & 0xFFFF for agent in range(packed & 0xFF)]
+
+    def _is_dead(self, agent: int, words: list[int]) -> bool:
+        """ Whether the agent dies where it is: in a void, or in a beam of another agent that is not blocked before it """
+        tile = words[agent]
+        if tile in self._void_words: return True
+        for beam_agent, beam, index in self._beams.get(tile, ()):
+            if beam_agent == agent: continue
+            if beam_agent < len(words) and 0 <= beam.get(words[beam_agent], -1) < index: continue
+            return True
+        return False
+
+    @override(MDP)
+    def available_actions(self, state: MyWorldState) -> list[Action]:
+        if state.current_agent in self.stay_agents: return [Action.STAY]
+        words = self._words(state.packed)
+        tile = words[state.current_agent]
+        if tile in self._exit_words: return [Action.STAY]
+        return [Action.STAY] + [action for action, target in self._moves[tile] if target not in words]
+
+    @override(MDP)
+    def is_final(self, state: MyWorldState) -> bool:
+        words = self._words(state.packed)
+        if all(tile in self._exit_words for tile in words): return True
+        return any(self._is_dead(agent, words) for agent in range(len(words)))
+
+    @override(MDP)
+    def transition(self, state: MyWorldState, action: Action) -> MyWorldState:
+        self.n_expanded_states += 1
+        self.n_simulator_steps += 1
+        agent = state.current_agent
+        packed = state.packed
+        next_agent = (agent + 1) % (packed & 0xFF)
+        if action.value == Action.STAY.value: return MyWorldState.from_packed(self._compute_value(state, 0.0, False), next_agent, packed)
+        shift = 16 + 16 * agent
+        target = self._targets[packed >> shift & 0xFFFF][action.value]
+        gem_bit = self._gem_bits.get(target, 0)
+        step_reward = lle.REWARD_GEM_COLLECTED if gem_bit & ~packed else 0.0
+        next_packed = packed & ~(0xFFFF << shift) | target << shift | gem_bit
+        words = self._words(next_packed)
+        agent_died = self._is_dead(agent, words)
+        if agent_died:
+            step_reward = lle.REWARD_AGENT_DIED
+        elif target in self._exit_words:
+            step_reward += lle.REWARD_AGENT_JUST_ARRIVED
+            if all(tile in self._exit_words for tile in words): step_reward += lle.REWARD_END_GAME
+        return MyWorldState.from_packed(self._compute_value(state, step_reward, agent_died), next_agent, next_packed)
+
+    @override(ReversibleMDP)
+    def load(self, state: MyWorldState):
+        self._path = [state]
+
+    @override(ReversibleMDP)
+    def apply(self, action: Action):
+        self._path.append(self.transition(self._path[-1], action))
+
+    @override(ReversibleMDP)
+    def undo(self):
+        self._path.pop()
+
+    @override(ReversibleMDP)
+    def current_state(self) -> MyWorldState:
+        return self._path[-1]
+
+    @override(ReversibleMDP)
+    def current_value(self) -> float:
+        return self._path[-1].value
+
+    @override(ReversibleMDP)
+    def current_agent(self) -> int:
+        return self._path[-1].current_agent
+
+    @override(ReversibleMDP)
+    def current_is_final(self) -> bool:
+        return self.is_final(self._path[-1])
+
+    @override(ReversibleMDP)
+    def current_actions(self) -> list[Action]:
+        return self.available_actions(self._path[-1])
+
+    def __repr__(self):
+        return f"<FastWorldMDP(world={self.world.world_string})>"
+
+
+class FastBetterValueFunction(FastWorldMDP, BetterValueFunction):
+    """ `BetterValueFunction` simulated by `FastWorldMDP` """
@@ -2,7 +2,9 @@
 import matplotlib.pyplot as plt
 from lle import World, Action
 from world_mdp import WorldMDP, BetterValueFunction
-from adversarial_search import minimax, alpha_beta, expectimax
+from adversarial_search import minimax, alpha_beta, expectimax, pvs
+from result_cache import ResultCache
+from results_store import ResultsStore
 import csv
 import cv2
 
@@ -20,6 +22,11 @@ DATA_FILENAME = 'temp.csv'
 DEPTH_MAX = 15
 # DEPTH_MAX = 6
 
+# Cells whose world, depth, MDP, algorithm and search code did not change are read from CACHE_DIRECTORY
+USE_CACHE = True
+# USE_CACHE = False
+CACHE_DIRECTORY = '.cache/results'
+
 GENERATE_GRAPHICS = True
 #GENERATE_GRAPHICS = False
 
@@ -59,7 +66,7 @@ G G . S0 S1 . G .
 
 WORLDS, WMDPS = [WORLD1, WORLD2, WORLD3], (WorldMDP, BetterValueFunction)
 
-ALGOS = ((minimax, "minimax"), (alpha_beta, "alpha_beta"))
+ALGOS = ((minimax, "minimax"), (alpha_beta, "alpha_beta"), (pvs, "pvs"))
 # ALGOS = ((minimax, "minimax"), (alpha_beta, "alpha_beta"), (expectimax, "expectimax"))
 
 def generateImages():
@@ -73,6 +80,7 @@ def generateImages():
 def generateData():
     d_max = DEPTH_MAX
     DEPTHS = [*range(1, d_max + 1)]
+    cache = ResultCache(CACHE_DIRECTORY)
     with open(DATA_FILENAME, 'w', newline='') as csvfile:
         fieldnames = ['World', 'Depth', 'WMDP', 'Algorithm', 'Algorithm Name', 'Expanded States']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -85,22 +93,20 @@ def generateData():
                             continue
                         if VERBOSE:
                             print('calculating world {}, depth {}, WMDP {}, algo {}'.format(i, depth, WMDP.__name__, name))
-                        world = WMDP(WORLDS[i])
-                        action = algo(world, world.reset(), depth)
-                        n_states = world.n_expanded_states
+                        if USE_CACHE:
+                            n_states = cache.run(WORLDS[i].world_string, depth, WMDP, algo, name)["n_expanded_states"]
+                        else:
+                            world = WMDP(WORLDS[i])
+                            action = algo(world, world.reset(), depth)
+                            n_states = world.n_expanded_states
                         writer.writerow({'World': str(i), 'Depth': depth, 'WMDP': WMDP.__name__, 'Algorithm': name, 'Expanded States': n_states})
                         scores.append((name, n_states))
+    if USE_CACHE and VERBOSE:
+        print(f"{cache.hits} cells read from the cache, {cache.misses} computed")
     print (f"Les résultats ont été enregistrés dans le fichier {DATA_FILENAME}")
 
-def extractData(world, name, algo):
-    filename = DATA_FILENAME
-    data = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.split(',')
-            if line[0] == world and line[2] == name and line[3] == algo:
-                data.append(int(line[5]))
-    return data
+def extractData(store, world, name, algo):
+    return store.series(world, name, algo)[1].tolist()
 
 def generateTripleBarChart(filename, barename1, barename2, barename3, color1, color2, color3, data1, data2, data3):
     if VERBOSE:
@@ -121,15 +127,16 @@ def generateTripleBarChart(filename, barename1, barename2, barename3, color1, co
     plt.close()
 
 def generateGraphics():
-    dataset = [ ['Minimax', 'blue', extractData('0', 'WorldMDP', 'minimax')],
-                ['AlphaBeta', 'red', extractData('0', 'WorldMDP', 'alpha_beta')],
-                ['BetterValue AlphaBeta', 'green', extractData('0', 'BetterValueFunction', 'alpha_beta')],
-                ['MiniMax', 'blue', extractData('1', 'WorldMDP', 'minimax')],
-                ['AlphaBeta', 'red', extractData('1', 'WorldMDP', 'alpha_beta')],
-                ['BetterValue AlphaBeta', 'green', extractData('1', 'BetterValueFunction', 'alpha_beta')],
-                ['MiniMax', 'blue', extractData('2', 'WorldMDP', 'minimax')],
-                ['AlphaBeta', 'red', extractData('2', 'WorldMDP', 'alpha_beta')],
-                ['BetterValue AlphaBeta', 'green', extractData('2', 'BetterValueFunction', 'alpha_beta')] ]
+    store = ResultsStore.load(DATA_FILENAME)
+    dataset = [ ['Minimax', 'blue', extractData(store, '0', 'WorldMDP', 'minimax')],
+                ['AlphaBeta', 'red', extractData(store, '0', 'WorldMDP', 'alpha_beta')],
+                ['BetterValue AlphaBeta', 'green', extractData(store, '0', 'BetterValueFunction', 'alpha_beta')],
+                ['MiniMax', 'blue', extractData(store, '1', 'WorldMDP', 'minimax')],
+                ['AlphaBeta', 'red', extractData(store, '1', 'WorldMDP', 'alpha_beta')],
+                ['BetterValue AlphaBeta', 'green', extractData(store, '1', 'BetterValueFunction', 'alpha_beta')],
+                ['MiniMax', 'blue', extractData(store, '2', 'WorldMDP', 'minimax')],
+                ['AlphaBeta', 'red', extractData(store, '2', 'WorldMDP', 'alpha_beta')],
+                ['BetterValue AlphaBeta', 'green', extractData(store, '2', 'BetterValueFunction', 'alpha_beta')] ]
 
     if GENERATE_GRAPHICS:
         generateTripleBarChart(W1_FILENAME, dataset[0][0], dataset[1][0], dataset[2][0], dataset[0][1], dataset[1][1], dataset[2][1], dataset[0][2], dataset[1][2], dataset[2][2])
@@ -1,25 +1,25 @@
 import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
+from results_store import ResultsStore
 
 # Lire les données CSV
-data = pd.read_csv('results_newworld1.csv')
+data = ResultsStore.load('results_newworld1.csv')
+world = next(iter(data.groups))[0]
 
 # Filtrer les données par algorithme et type (WMDP ou BetterValueFunction)
-minimax_data = data[(data['Algorithm'] == 'minimax') & (data['WMDP'] == 'WorldMDP')]
-alpha_beta_data_wmdp = data[(data['Algorithm'] == 'alpha_beta') & (data['WMDP'] == 'WorldMDP')]
-alpha_beta_data_better_value = data[(data['Algorithm'] == 'alpha_beta') & (data['WMDP'] == 'BetterValueFunction')]
+minimax_depths, minimax_states = data.series(world, 'WorldMDP', 'minimax')
+alpha_beta_depths_wmdp, alpha_beta_states_wmdp = data.series(world, 'WorldMDP', 'alpha_beta')
+alpha_beta_depths_better_value, alpha_beta_states_better_value = data.series(world, 'BetterValueFunction', 'alpha_beta')
 
 # Ajouter un petit décalage aux valeurs de l'axe y pour les rendre positives
 offset = 1e-6
-minimax_y = minimax_data['Expanded States'] + offset
-alpha_beta_y_wmdp = alpha_beta_data_wmdp['Expanded States'] + offset
-alpha_beta_y_better_value = alpha_beta_data_better_value['Expanded States'] + offset
+minimax_y = minimax_states + offset
+alpha_beta_y_wmdp = alpha_beta_states_wmdp + offset
+alpha_beta_y_better_value = alpha_beta_states_better_value + offset
 
 # Créer les courbes
-plt.plot(minimax_data['Depth'], minimax_y, label='Minimax (WMDP)')
-plt.plot(alpha_beta_data_wmdp['Depth'], alpha_beta_y_wmdp, label='Alpha-Beta (WMDP)')
-plt.plot(alpha_beta_data_better_value['Depth'], alpha_beta_y_better_value, label='Alpha-Beta (BetterValueFunction)')
+plt.plot(minimax_depths, minimax_y, label='Minimax (WMDP)')
+plt.plot(alpha_beta_depths_wmdp, alpha_beta_y_wmdp, label='Alpha-Beta (WMDP)')
+plt.plot(alpha_beta_depths_better_value, alpha_beta_y_better_value, label='Alpha-Beta (BetterValueFunction)')
 
 # Mettre l'axe des ordonnées (y) en échelle logarithmique
 plt.yscale('log')
@@ -0,0 +1,217 @@
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Optional
+
+
+@dataclass
+class PlyStats:
+    """
+    Counters of the nodes at one ply (number of moves from the root). `nodes` counts every call of the search on a state,
+    `leaves` those at the depth limit, and `expanded` the nodes whose `moves` were generated. `cutoffs` are either beta cutoffs
+    (fail-high at a MAX node, value >= beta) or alpha cutoffs (fail-low at a MIN node, value <= alpha). `cutoff_moves[i]` is the
+    number of cutoffs caused by the i-th move of a node, and `tt_hits` the probes of the transposition table that answered the search.
+    """
+    nodes: int = 0
+    leaves: int = 0
+    expanded: int = 0
+    moves: int = 0
+    cutoffs: int = 0
+    beta_cutoffs: int = 0
+    alpha_cutoffs: int = 0
+    cutoff_moves: list[int] = field(default_factory=list)
+    evaluations: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+
+    @property
+    def branching_factor(self) -> float:
+        """ Average number of moves available in the expanded nodes """
+        return self.moves / self.expanded if self.expanded > 0 else 0.0
+
+    @property
+    def cutoff_rate(self) -> float:
+        return self.cutoffs / self.expanded if self.expanded > 0 else 0.0
+
+
+class SearchStats:
+    """ Counters that an `AdversarialSearch` updates while it searches, when its `stats` are set """
+
+    def __init__(self):
+        self.plies: list[PlyStats] = []
+        # Ply of the node being searched, -1 outside of the search
+        self.ply = -1
+        # Ordered moves of the node being expanded at each ply, to find the index of the move that causes a cutoff
+        self._moves: list[list] = []
+
+    def at(self, ply: int) -> PlyStats:
+        while len(self.plies) <= ply:
+            self.plies.append(PlyStats())
+            self._moves.append([])
+        return self.plies[ply]
+
+    def node(self, ply: int, leaf: bool):
+        """ Counts a node at the ply, which becomes the current one """
+        self.ply = ply
+        stats = self.at(ply)
+        stats.nodes += 1
+        if leaf: stats.leaves += 1
+
+    def visit(self, leaf: bool, search: Callable, *args):
+        """ Returns `search(*args)`, which searches a node one ply below the current one, at the depth limit if `leaf` """
+        self.node(self.ply + 1, leaf)
+        try:
+            return search(*args)
+        finally:
+            self.ply -= 1
+
+    def expand(self, moves: list):
+        ply = max(self.ply, 0)
+        stats = self.at(ply)
+        stats.expanded += 1
+        stats.moves += len(moves)
+        self._moves[ply] = moves
+
+    def cutoff(self, move, maximize: bool):
+        ply = max(self.ply, 0)
+        stats = self.at(ply)
+        stats.cutoffs += 1
+        if maximize: stats.beta_cutoffs += 1
+        else: stats.alpha_cutoffs += 1
+        index = next(i for i, other in enumerate(self._moves[ply]) if other == move)
+        if len(stats.cutoff_moves) <= index: stats.cutoff_moves.extend([0] * (index + 1 - len(stats.cutoff_moves)))
+        stats.cutoff_moves[index] += 1
+
+    def evaluation(self):
+        self.at(max(self.ply, 0)).evaluations += 1
+
+    def probe(self, hit: bool):
+        stats = self.at(max(self.ply, 0))
+        stats.tt_probes += 1
+        if hit: stats.tt_hits += 1
+
+
+class Timer:
+    def __init__(self):
+        self.time = 0.0
+        self.calls = 0
+
+    def wrap(self, method: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.time += time.perf_counter() - start
+                self.calls += 1
+        return timed
+
+
+class _Timed:
+    """ Proxy of an object whose given methods add their time to the timer, and that forwards everything else to the object """
+
+    def __init__(self, obj, methods: tuple[str, ...], timer: Timer):
+        self._obj = obj
+        for name in methods:
+            if hasattr(obj, name): setattr(self, name, timer.wrap(getattr(obj, name)))
+
+    def __getattr__(self, name: str):
+        return getattr(self._obj, name)
+
+
+MDP_METHODS = ("reset", "available_actions", "transition", "is_final", "value_bounds", "load", "apply", "undo", "current_state",
+               "current_value", "current_agent", "current_is_final", "current_actions")
+WORLD_METHODS = ("step", "set_state", "get_state", "reset")
+EVALUATOR_METHODS = ("evaluate", "evaluate_batch")
+
+
+@dataclass
+class SearchReport:
+    """
+    What a search did and where its time went. Times are in seconds: `mdp_time` is spent in the methods of the MDP,
+    `simulator_time` in `step`, `set_state`, `get_state` and `reset` of its lle world (None if it has none) during those
+    calls, `evaluator_time` in the evaluator, and `search_time` everywhere else, i.e. in the search itself.
+    The cache counters are those of the successor and node caches of a `WorldMDP` (None without caches).
+    """
+    algorithm: str
+    max_depth: int
+    value: float
+    action: str
+    n_expanded_states: int
+    total_time: float
+    search_time: float
+    mdp_time: float
+    mdp_calls: int
+    simulator_time: Optional[float]
+    simulator_calls: Optional[int]
+    evaluator_time: float
+    successor_cache_hits: Optional[int]
+    successor_cache_misses: Optional[int]
+    node_cache_hits: Optional[int]
+    node_cache_misses: Optional[int]
+    plies: list[PlyStats]
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        for ply, (stats, row) in enumerate(zip(self.plies, report["plies"])):
+            row["branching_factor"] = stats.branching_factor
+            # Children searched per expanded node, re-searches included
+            row["effective_branching_factor"] = self.plies[ply + 1].nodes / stats.expanded if ply + 1 < len(self.plies) and stats.expanded > 0 else 0.0
+            row["cutoff_rate"] = stats.cutoff_rate
+        return report
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def __str__(self):
+        lines = [f"{self.algorithm} depth {self.max_depth}: value {self.value} action {self.action}, {self.n_expanded_states} expanded states",
+                 f"time {self.total_time:.4f}s: search {self.search_time:.4f}s, MDP {self.mdp_time:.4f}s ({self.mdp_calls} calls)"
+                 + (f" of which simulator {self.simulator_time:.4f}s ({self.simulator_calls} calls)" if self.simulator_time is not None else "")
+                 + f", evaluator {self.evaluator_time:.4f}s",
+                 f"{'ply':>3} {'nodes':>9} {'leaves':>9} {'expanded':>9} {'branching':>9} {'effective':>9} {'cutoffs':>8} {'beta':>8} {'alpha':>8} {'rate':>5} "
+                 f"{'evals':>8} {'tt hits':>15}  cutoff moves"]
+        if self.successor_cache_hits is not None:
+            lines.insert(2, f"successor cache {self.successor_cache_hits} hits {self.successor_cache_misses} misses, "
+                            f"node cache {self.node_cache_hits} hits {self.node_cache_misses} misses")
+        for ply, row in enumerate(self.to_dict()["plies"]):
+            lines.append(f"{ply:>3} {row['nodes']:>9} {row['leaves']:>9} {row['expanded']:>9} {row['branching_factor']:>9.2f} "
+                         f"{row['effective_branching_factor']:>9.2f} {row['cutoffs']:>8} {row['beta_cutoffs']:>8} {row['alpha_cutoffs']:>8} {row['cutoff_rate']:>5.2f} {row['evaluations']:>8} "
+                         f"{row['tt_hits']:>7}/{row['tt_probes']:<7}  {row['cutoff_moves']}")
+        return "\n".join(lines)
+
+
+def _cache_counters(mdp, name: str) -> tuple[Optional[int], Optional[int]]:
+    cache = getattr(mdp, name, None)
+    return (cache.hits, cache.misses) if cache is not None else (None, None)
+
+
+def profile(search, state, max_depth: int, *args) -> tuple[tuple[float, object], SearchReport]:
+    """
+    Runs `search.search(state, max_depth, *args)` (or `search.run` for an `IterativeDeepeningSearch`) with its stats set and
+    its MDP, world and evaluator timed, and returns its (value, action) and its report. The search is left as it was.
+    """
+    mdp, evaluator = search.mdp, search.evaluator
+    world = getattr(mdp, "world", None)
+    mdp_timer, world_timer, evaluator_timer = Timer(), Timer(), Timer()
+    caches = _cache_counters(mdp, "successor_cache") + _cache_counters(mdp, "node_cache")
+    n_expanded_states = mdp.n_expanded_states
+    search.stats = SearchStats()
+    search.mdp = _Timed(mdp, MDP_METHODS, mdp_timer)
+    if evaluator is not None: search.evaluator = _Timed(evaluator, EVALUATOR_METHODS, evaluator_timer)
+    if world is not None: mdp.world = _Timed(world, WORLD_METHODS, world_timer)
+    try:
+        start = time.perf_counter()
+        result = (search.run if hasattr(search, "run") else search.search)(state, max_depth, *args)
+        total_time = time.perf_counter() - start
+    finally:
+        stats = search.stats
+        search.stats, search.mdp, search.evaluator = None, mdp, evaluator
+        if world is not None: mdp.world = world
+    counters = [now - before if before is not None else None
+                for now, before in zip(_cache_counters(mdp, "successor_cache") + _cache_counters(mdp, "node_cache"), caches)]
+    value, action = result
+    report = SearchReport(type(search).__name__, max_depth, value, getattr(action, "name", str(action)), mdp.n_expanded_states - n_expanded_states,
+                          total_time, total_time - mdp_timer.time - evaluator_timer.time, mdp_timer.time, mdp_timer.calls,
+                          world_timer.time if world is not None else None, world_timer.calls if world is not None else None,
+                          evaluator_timer.time, *counters, stats.plies)
+    return result, report
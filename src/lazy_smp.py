@@ -0,0 +1,101 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from lle import World, Action
+from adversarial_search import checker, AdversarialSearch, MinimaxSearch, AlphaBetaSearch, ExpectimaxSearch, SearchInterrupted
+from move_ordering import MoveOrdering
+from shared_transposition_table import SharedTranspositionTable
+from transposition_table import TranspositionTable, Bound
+from world_mdp import WorldMDP, MyWorldState, override
+
+
+# Per-process globals, set by `_init_helper`
+_mdp: Optional[WorldMDP] = None
+_stop = None
+
+
+class HelperOrdering(MoveOrdering):
+    """ Move ordering of a helper: the usual ordering, shuffled so that each helper explores the tree differently """
+
+    def __init__(self, mdp: WorldMDP, seed: int, stop):
+        super().__init__(mdp)
+        self.rng = random.Random(seed)
+        self.stop = stop
+
+    @override(MoveOrdering)
+    def order(self, state: MyWorldState, depth: int, actions: list[Action], transposition_table: Optional[TranspositionTable] = None) -> list[Action]:
+        if self.stop.value: raise SearchInterrupted()
+        actions = super().order(state, depth, actions, transposition_table)
+        self.rng.shuffle(actions)
+        return actions
+
+
+class HelperTable:
+    """
+    Shared transposition table as a helper uses it: everything but the root is stored. An entry of the root would hold the
+    best action of the helper's move order, which may be another one of the tied best actions, and would answer the main search.
+    """
+
+    def __init__(self, table: SharedTranspositionTable, root: MyWorldState):
+        self.table = table
+        self.root = root
+
+    def store(self, state: MyWorldState, depth: int, value: float, action: Optional[Action], bound: Bound = Bound.EXACT):
+        if state != self.root: self.table.store(state, depth, value, action, bound)
+
+    def __getattr__(self, name: str):
+        return getattr(self.table, name)
+
+
+def _init_helper(mdp_class: type[WorldMDP], world_string: str, stop):
+    global _mdp, _stop
+    _mdp = mdp_class(World(world_string))
+    _mdp.reset()
+    _stop = stop
+
+
+def _help(search_class: type[AdversarialSearch], state: MyWorldState, max_depth: int, table: SharedTranspositionTable, seed: int) -> int:
+    """ Searches the root with a shuffled move ordering until the main search is over, and returns the number of states expanded """
+    table.mdp = _mdp
+    _mdp.n_expanded_states = 0
+    try:
+        search_class(_mdp, HelperTable(table, state), HelperOrdering(_mdp, seed, _stop)).search(state, max_depth)
+    except SearchInterrupted:
+        pass
+    return _mdp.n_expanded_states
+
+
+def lazy_smp_search(search_class: type[AdversarialSearch], mdp: WorldMDP, state: MyWorldState, max_depth: int, n_helpers: int = 3,
+                    max_entries: int = 1 << 20) -> tuple[float, Action]:
+    """
+    Lazy SMP: `n_helpers` processes search the same root as the main search, each with a differently shuffled move ordering,
+    and they only communicate through a shared transposition table. The main search runs in this process with the usual
+    move order, so it returns the same (value, action) as the sequential search, only faster when the helpers fill the table first.
+    The states expanded by the helpers are added to `mdp.n_expanded_states`.
+    """
+    if mdp.is_final(state): return state.value, None
+    stop = multiprocessing.Value('b', False)
+    with SharedTranspositionTable(mdp, max_entries) as table:
+        with ProcessPoolExecutor(n_helpers, initializer=_init_helper, initargs=(type(mdp), mdp.world.world_string, stop)) as pool:
+            helpers = [pool.submit(_help, search_class, state, max_depth, table, seed) for seed in range(1, n_helpers + 1)]
+            try:
+                result = search_class(mdp, table).search(state, max_depth)
+            finally:
+                stop.value = True
+            n_expanded = sum(helper.result() for helper in helpers)
+    mdp.n_expanded_states += n_expanded
+    return result[0], result[1]
+
+
+@checker
+def lazy_smp_minimax(mdp: WorldMDP, state: MyWorldState, max_depth: int, n_helpers: int = 3) -> Action:
+    return lazy_smp_search(MinimaxSearch, mdp, state, max_depth, n_helpers)[1]
+
+@checker
+def lazy_smp_alpha_beta(mdp: WorldMDP, state: MyWorldState, max_depth: int, n_helpers: int = 3) -> Action:
+    return lazy_smp_search(AlphaBetaSearch, mdp, state, max_depth, n_helpers)[1]
+
+@checker
+def lazy_smp_expectimax(mdp: WorldMDP, state: MyWorldState, max_depth: int, n_helpers: int = 3) -> Action:
+    return lazy_smp_search(ExpectimaxSearch, mdp, state, max_depth, n_helpers)[1]
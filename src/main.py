@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 from lle import World, Action
 from world_mdp import WorldMDP, BetterValueFunction
-from adversarial_search import minimax, alpha_beta, expectimax
+from adversarial_search import minimax, alpha_beta, expectimax, pvs
 import csv
 import cv2
 
@@ -30,7 +30,7 @@ DEPTHS = [*range(1, 14, 2)]
 
 WMDPS = (WorldMDP,BetterValueFunction)
 
-ALGOS = ((minimax, "minimax"), (alpha_beta, "alpha_beta"))
+ALGOS = ((minimax, "minimax"), (alpha_beta, "alpha_beta"), (pvs, "pvs"))
 
 
 def main():
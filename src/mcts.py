@@ -0,0 +1,137 @@
+import math
+import random
+import time
+from typing import Callable, Generic, Optional
+from mdp import MDP, S, A
+from world_mdp import MY_AGENT
+
+
+RolloutPolicy = Callable[[MDP, S, random.Random], A]
+
+
+def random_rollout(mdp: MDP[A, S], state: S, rng: random.Random) -> A:
+    return rng.choice(list(mdp.available_actions(state)))
+
+
+def mcts(mdp: MDP[A, S], state: S, budget: int, time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+         rollout_policy: RolloutPolicy = random_rollout, opponents: str = "min", seed: Optional[int] = None) -> A:
+    """ UCT search of `budget` iterations, which stops earlier when the time (in seconds) or node budget is spent """
+    if state.current_agent != MY_AGENT: raise ValueError("The current agent must be 0.")
+    if budget < 1: raise ValueError("The budget must be at least 1 iteration.")
+    return MCTSSearch(mdp, time_budget, node_budget, rollout_policy, opponents, seed=seed).search(state, budget)[1]
+
+
+class MCTSNode(Generic[A, S]):
+    __slots__ = ("state", "parent", "action", "children", "untried", "visits", "total")
+
+    def __init__(self, state: S, parent: Optional["MCTSNode[A, S]"], action: Optional[A], actions: list[A]):
+        self.state = state
+        self.parent = parent
+        # Action that leads from the parent to the node
+        self.action = action
+        self.children: list[MCTSNode[A, S]] = []
+        self.untried = actions
+        self.visits = 0
+        # Sum of the values of the simulations through the node, for my agent
+        self.total = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.visits if self.visits > 0 else 0.0
+
+    def __repr__(self):
+        return f"<MCTSNode(visits={self.visits},mean={self.mean:.3f},children={len(self.children)})>"
+
+
+class MCTSSearch(Generic[A, S]):
+    """
+    Monte-Carlo Tree Search with UCT selection. Each iteration walks down the tree, expands one action, plays the
+    `rollout_policy` for at most `rollout_depth` moves and backs the final value up. My agent picks the child with
+    the best mean plus an exploration bonus of `exploration * sqrt(ln N / n)`, and the other agents either the child with
+    the lowest mean minus that bonus (`opponents="min"`) or a random action (`opponents="random"`).
+    The search stops after `n_iterations`, or earlier when the time or node budget is spent, and plays the most visited action.
+    The tree is kept between searches: if the new root is in the tree, at most one round of moves below the previous
+    root (i.e. before my agent plays again), its subtree and statistics are reused.
+    """
+
+    def __init__(self, mdp: MDP[A, S], time_budget: Optional[float] = None, node_budget: Optional[int] = None,
+                 rollout_policy: RolloutPolicy = random_rollout, opponents: str = "min", exploration: float = math.sqrt(2),
+                 rollout_depth: int = 50, seed: Optional[int] = None):
+        if opponents not in ("min", "random"): raise ValueError("The opponents must be 'min' or 'random'.")
+        self.mdp = mdp
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.rollout_policy = rollout_policy
+        self.opponents = opponents
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self.root: Optional[MCTSNode[A, S]] = None
+        self.n_iterations = 0
+
+    def _new_node(self, state: S, parent: Optional[MCTSNode[A, S]] = None, action: Optional[A] = None) -> MCTSNode[A, S]:
+        actions = [] if self.mdp.is_final(state) else list(self.mdp.available_actions(state))
+        self.rng.shuffle(actions)
+        return MCTSNode(state, parent, action, actions)
+
+    def _uct(self, node: MCTSNode[A, S]) -> MCTSNode[A, S]:
+        sign = 1 if node.state.current_agent == MY_AGENT else -1
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: sign * child.mean + self.exploration * math.sqrt(log_visits / child.visits))
+
+    def _select(self, node: MCTSNode[A, S]) -> MCTSNode[A, S]:
+        """ Walks down the tree and returns the expanded node, or a final node """
+        while True:
+            if self.opponents == "random" and node.state.current_agent != MY_AGENT and (node.untried or node.children):
+                i = self.rng.randrange(len(node.untried) + len(node.children))
+                if i >= len(node.untried):
+                    node = node.children[i - len(node.untried)]
+                    continue
+                action = node.untried.pop(i)
+            elif node.untried:
+                action = node.untried.pop()
+            elif node.children:
+                node = self._uct(node)
+                continue
+            else:
+                return node
+            child = self._new_node(self.mdp.transition(node.state, action), node, action)
+            node.children.append(child)
+            return child
+
+    def _rollout(self, state: S) -> float:
+        for _ in range(self.rollout_depth):
+            if self.mdp.is_final(state): break
+            state = self.mdp.transition(state, self.rollout_policy(self.mdp, state, self.rng))
+        return state.value
+
+    def _reuse(self, state: S) -> Optional[MCTSNode[A, S]]:
+        """ Returns the node of the state if it is in the tree, at most one round of moves below the root """
+        if self.root is None: return None
+        layer = [self.root]
+        while len(layer) > 0:
+            for node in layer:
+                if node.state == state: return node
+            layer = [child for node in layer if node is self.root or node.state.current_agent != MY_AGENT for child in node.children]
+        return None
+
+    def search(self, state: S, n_iterations: int) -> (float, A):
+        root = self._reuse(state)
+        self.root = root if root is not None else self._new_node(state)
+        self.root.parent = None
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        node_limit = self.mdp.n_expanded_states + self.node_budget if self.node_budget is not None else None
+        self.n_iterations = 0
+        while self.n_iterations < n_iterations:
+            if deadline is not None and time.perf_counter() >= deadline: break
+            if node_limit is not None and self.mdp.n_expanded_states >= node_limit: break
+            node = self._select(self.root)
+            value = self._rollout(node.state)
+            while node is not None:
+                node.visits += 1
+                node.total += value
+                node = node.parent
+            self.n_iterations += 1
+        if not self.root.children: return self.root.state.value, None
+        best = max(self.root.children, key=lambda child: (child.visits, child.mean))
+        return best.mean, best.action
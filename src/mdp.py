@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Hashable
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
 
@@ -10,6 +10,8 @@ class State(ABC):
     It must somehow know whose agent's turn it is.
     """
 
+    __slots__ = ("value", "current_agent")
+
     value: float
     current_agent: int
 
@@ -40,3 +42,62 @@ class MDP(ABC, Generic[A, S]):
     @abstractmethod
     def is_final(self, state: S) -> bool:
         """Returns whether the given state is final."""
+
+    def move_key(self, state: S, action: A) -> Hashable:
+        """Returns a hashable key that identifies the move of the current agent, used to order moves."""
+        return state.current_agent, action
+
+    def encode_action(self, state: S, action: A) -> int:
+        """Returns a small non-negative integer that identifies the action among those available in the given state."""
+        return list(self.available_actions(state)).index(action)
+
+    def decode_action(self, state: S, code: int) -> A:
+        """Inverse of `encode_action`."""
+        return list(self.available_actions(state))[code]
+
+    def with_agent(self, state: S, agent: int) -> S:
+        """Returns the same state, but where it is the turn of the given agent."""
+        raise NotImplementedError(f"{type(self).__name__} cannot change the agent whose turn it is.")
+
+    def value_bounds(self, state: S, depth: int) -> tuple[float, float]:
+        """Returns bounds (lower, upper) on the values of the states reached from the given state in at most `depth` moves, used to prune chance nodes."""
+        return float('-inf'), float('inf')
+
+
+class ReversibleMDP(MDP[A, S]):
+    """
+    MDP that can also be walked in place: `apply` performs an action from the current state and `undo` reverts it,
+    so that a depth-first search does not have to create every state that it visits.
+    """
+
+    @abstractmethod
+    def load(self, state: S):
+        """Makes the given state the current state and forgets the actions applied so far."""
+
+    @abstractmethod
+    def apply(self, action: A):
+        """Performs the action of the current agent from the current state, which becomes the next state."""
+
+    @abstractmethod
+    def undo(self):
+        """Reverts the last applied action."""
+
+    @abstractmethod
+    def current_state(self) -> S:
+        """Returns the current state."""
+
+    def current_value(self) -> float:
+        """Returns the value of the current state."""
+        return self.current_state().value
+
+    def current_agent(self) -> int:
+        """Returns the agent whose turn it is in the current state."""
+        return self.current_state().current_agent
+
+    def current_is_final(self) -> bool:
+        """Returns whether the current state is final."""
+        return self.is_final(self.current_state())
+
+    def current_actions(self) -> list[A]:
+        """Returns the list of available actions for the current agent from the current state."""
+        return self.available_actions(self.current_state())
@@ -0,0 +1,52 @@
+from typing import Generic, Hashable, Optional
+from mdp import MDP, S, A
+from transposition_table import TranspositionTable
+
+
+class MoveOrdering(Generic[A, S]):
+    """
+    Sorts the actions of a node so that the moves most likely to cause a cutoff are searched first:
+        1. the best action stored in the transposition table (`tt_move`),
+        2. the killer moves of the ply, i.e. the last moves that caused a cutoff at the same ply (`killers`),
+        3. the other moves by decreasing history score, i.e. how often and how deep they caused cutoffs (`history`).
+    Moves are identified by `MDP.move_key`, and a ply by the remaining depth and the current agent.
+    """
+
+    def __init__(self, mdp: MDP[A, S], tt_move: bool = True, killers: bool = True, history: bool = True, n_killers: int = 2):
+        self.mdp = mdp
+        self.tt_move = tt_move
+        self.killers = killers
+        self.history = history
+        self.n_killers = n_killers
+        self.clear()
+
+    def clear(self):
+        self.killer_moves: dict[tuple[int, int], list[Hashable]] = dict()
+        self.history_scores: dict[Hashable, int] = dict()
+
+    def order(self, state: S, depth: int, actions: list[A], transposition_table: Optional[TranspositionTable[A, S]] = None) -> list[A]:
+        tt_action = transposition_table.best_action(state) if self.tt_move and transposition_table is not None else None
+        killers = self.killer_moves.get((depth, state.current_agent), ()) if self.killers else ()
+        scored = []
+        for i, action in enumerate(actions):
+            key = self.mdp.move_key(state, action)
+            if tt_action is not None and action == tt_action: score = (0, 0)
+            elif key in killers: score = (1, killers.index(key))
+            else: score = (2, -self.history_scores.get(key, 0) if self.history else 0)
+            scored.append((score, i, action))
+        scored.sort(key=lambda x: x[:2])
+        return [action for _, _, action in scored]
+
+    def cutoff(self, state: S, depth: int, action: A):
+        """ Records that `action` caused a cutoff in `state` with `depth` remaining """
+        key = self.mdp.move_key(state, action)
+        if self.killers:
+            killers = self.killer_moves.setdefault((depth, state.current_agent), [])
+            if key in killers: killers.remove(key)
+            killers.insert(0, key)
+            del killers[self.n_killers:]
+        if self.history:
+            self.history_scores[key] = self.history_scores.get(key, 0) + depth * depth
+
+    def __repr__(self):
+        return f"<MoveOrdering(tt_move={self.tt_move},killers={self.killers},history={self.history})>"
@@ -0,0 +1,76 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from lle import World, Action
+from adversarial_search import checker, AdversarialSearch, MinimaxSearch, AlphaBetaSearch, ExpectimaxSearch
+from world_mdp import WorldMDP, MyWorldState
+
+
+# Per-process globals, set by `_init_worker`
+_mdp: Optional[WorldMDP] = None
+_best = None
+
+
+def _init_worker(mdp_class: type[WorldMDP], world_string: str, best):
+    """ Each worker builds its own world, since `WorldMDP` mutates the world it simulates """
+    global _mdp, _best
+    _mdp = mdp_class(World(world_string))
+    _mdp.reset()
+    _best = best
+
+
+def _search_action(search_class: type[AdversarialSearch], state: MyWorldState, action_index: int, max_depth: int) -> tuple[float, int]:
+    """ Searches the subtree of one root action and returns its value with the number of states expanded """
+    _mdp.n_expanded_states = 0
+    # The available actions are those of the state the world is in
+    _mdp._set_world(state)
+    new_state = _mdp.transition(state, _mdp.available_actions(state)[action_index])
+    if not issubclass(search_class, AlphaBetaSearch):
+        return search_class(_mdp).search(new_state, max_depth - 1)[0], _mdp.n_expanded_states
+    with _best.get_lock(): best_value, best_index = _best[0], _best[1]
+    # Ties are won by the first action, as in the sequential search. Against a later action, searching just below
+    # its value gives a tie an exact value.
+    alpha = best_value if best_index < action_index else math.nextafter(best_value, float('-inf'))
+    value = search_class(_mdp).search(new_state, max_depth - 1, alpha, float('inf'))[0]
+    with _best.get_lock():
+        if value > _best[0] or (value == _best[0] and action_index < _best[1]): _best[0], _best[1] = value, action_index
+    return value, _mdp.n_expanded_states
+
+
+def parallel_search(search_class: type[AdversarialSearch], mdp: WorldMDP, state: MyWorldState, max_depth: int,
+                    max_workers: Optional[int] = None) -> tuple[float, Action]:
+    """
+    Searches every root action in its own process and returns the same (value, action) as the sequential search.
+    With alpha-beta, the workers share the best root value found so far so that the later subtrees are still pruned.
+    `mdp` must be a `WorldMDP` (or a subclass) since every worker rebuilds it from the world string.
+    The states expanded by the workers are added to `mdp.n_expanded_states`.
+    """
+    if mdp.is_final(state): return state.value, None
+    actions = mdp.available_actions(state)
+    # Best root value found so far and the index of its action
+    best = multiprocessing.Array('d', [float('-inf'), len(actions)])
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(type(mdp), mdp.world.world_string, best)) as pool:
+        futures = [pool.submit(_search_action, search_class, state, 0, max_depth)]
+        # Young brothers wait: the first action is searched alone so that the other ones start with its value as alpha
+        if issubclass(search_class, AlphaBetaSearch): futures[0].result()
+        futures += [pool.submit(_search_action, search_class, state, i, max_depth) for i in range(1, len(actions))]
+        results = [future.result() for future in futures]
+    mdp.n_expanded_states += sum(n for _, n in results)
+    best_value, best_action = float('-inf'), None
+    for (value, _), action in zip(results, actions):
+        if value > best_value: best_value, best_action = value, action
+    return best_value, best_action
+
+
+@checker
+def parallel_minimax(mdp: WorldMDP, state: MyWorldState, max_depth: int, max_workers: Optional[int] = None) -> Action:
+    return parallel_search(MinimaxSearch, mdp, state, max_depth, max_workers)[1]
+
+@checker
+def parallel_alpha_beta(mdp: WorldMDP, state: MyWorldState, max_depth: int, max_workers: Optional[int] = None) -> Action:
+    return parallel_search(AlphaBetaSearch, mdp, state, max_depth, max_workers)[1]
+
+@checker
+def parallel_expectimax(mdp: WorldMDP, state: MyWorldState, max_depth: int, max_workers: Optional[int] = None) -> Action:
+    return parallel_search(ExpectimaxSearch, mdp, state, max_depth, max_workers)[1]
@@ -0,0 +1,142 @@
+import hashlib
+import inspect
+import os
+import struct
+import sys
+import tempfile
+from importlib import metadata
+import numpy as np
+import lle
+from lle import Action
+from adversarial_search import checker, AlphaBetaSearch
+import result_cache
+from mdp import S, A
+from shared_transposition_table import SharedTranspositionTable
+from world_mdp import WorldMDP, MyWorldState
+
+DEFAULT_DIRECTORY = ".cache/tt"
+FORMAT_VERSION = 1
+MAGIC = b"IAPTT\0\0\0"
+# Magic, format version, number of buckets and fingerprint, padded to 64 bytes
+HEADER = struct.Struct("<8sIQ32s")
+HEADER_SIZE = 64
+
+# Modules that the values of the entries depend on, next to this file: those of the searches and the layout of the table
+SOURCES = result_cache.SOURCES + ("shared_transposition_table.py",)
+
+
+def _lle_version() -> str:
+    """ Version of lle, whose distribution is named laser-learning-environment """
+    try:
+        return metadata.version("laser-learning-environment")
+    except metadata.PackageNotFoundError:
+        return getattr(lle, "__version__", "")
+
+
+def fingerprint(mdp: WorldMDP, namespace: str = "") -> bytes:
+    """
+    Hash of everything the entries of a table depend on: the format, the world, the MDP class and the sources of the
+    `SOURCES` and of its classes (its value function), the version of lle (its simulation), the hash function of Python
+    (the keys are hashes of states), and the namespace, which tells apart the tables of searches whose values differ,
+    e.g. with another evaluator.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    files = {os.path.join(here, source) for source in SOURCES}
+    files.update(inspect.getsourcefile(cls) for cls in type(mdp).__mro__ if cls.__module__ not in ("builtins", "abc", "typing"))
+    digest = hashlib.sha256()
+    for part in (str(FORMAT_VERSION), mdp.world.world_string, type(mdp).__name__, namespace, _lle_version(),
+                 f"{sys.hash_info.algorithm}{sys.version_info[:2]}"):
+        digest.update(part.encode() + b"\0")
+    for path in sorted(os.path.abspath(path) for path in files):
+        digest.update(os.path.basename(path).encode() + b"\0")
+        with open(path, 'rb') as f: digest.update(f.read())
+    return digest.digest()
+
+
+class PersistentTranspositionTable(SharedTranspositionTable[A, S]):
+    """
+    `SharedTranspositionTable` whose entries are kept in a memory-mapped file, so that they outlive the process: a later run
+    on the same world, or a deeper search of the same sweep, starts with the entries of the previous ones. The file of a
+    world is named after the hash of its world string, of the MDP class and of the namespace, in `directory`, and starts
+    with a header that holds the format version, the number of buckets and the `fingerprint` of the code. A file whose
+    header does not match, e.g. after a change of the value function in `world_mdp.py`, is replaced by an empty one
+    (`invalidated` is then True). Several processes can use the same file, with the same lockless entries as in shared memory.
+    """
+
+    def __init__(self, mdp: WorldMDP, directory: str = DEFAULT_DIRECTORY, max_entries: int = 1 << 20,
+                 deeper_hits: bool = False, namespace: str = ""):
+        if max_entries < 2: raise ValueError("A transposition table needs room for at least 2 entries.")
+        self.mdp = mdp
+        self.n_buckets = max_entries // 2
+        self.deeper_hits = deeper_hits
+        self.fingerprint = fingerprint(mdp, namespace)
+        name = hashlib.sha256(f"{mdp.world.world_string}\0{type(mdp).__name__}\0{namespace}".encode()).hexdigest()[:32]
+        self.filename = os.path.join(str(directory), name + ".tt")
+        self.invalidated = not self._valid()
+        if self.invalidated: self._create()
+        self._map()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _header(self) -> bytes:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, self.n_buckets, self.fingerprint).ljust(HEADER_SIZE, b"\0")
+
+    def _valid(self) -> bool:
+        """ Whether the file exists with the header of this table and the size of its slots """
+        try:
+            with open(self.filename, 'rb') as f: header = f.read(HEADER_SIZE)
+            size = os.path.getsize(self.filename)
+        except FileNotFoundError:
+            return False
+        return header == self._header() and size == HEADER_SIZE + self.n_buckets * 2 * 3 * 8
+
+    def _create(self):
+        """ Writes an empty table to a temporary file that is then renamed, so that the file of a table is always complete """
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.filename) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._header())
+                f.truncate(HEADER_SIZE + self.n_buckets * 2 * 3 * 8)
+            os.replace(tmp, self.filename)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _map(self):
+        self.slots = np.memmap(self.filename, dtype=np.uint64, mode='r+', offset=HEADER_SIZE, shape=(self.n_buckets * 2, 3))
+
+    def __getstate__(self):
+        return self.filename, self.n_buckets, self.deeper_hits, self.fingerprint
+
+    def __setstate__(self, state):
+        """ Maps the same file, whose header was checked by the process that created the table """
+        self.filename, self.n_buckets, self.deeper_hits, self.fingerprint = state
+        self.mdp, self.invalidated = None, False
+        self._map()
+        self.hits = self.misses = self.evictions = 0
+
+    def flush(self):
+        """ Writes the entries to the file """
+        self.slots.flush()
+
+    def close(self):
+        self.flush()
+        del self.slots
+
+    def __repr__(self):
+        return f"<PersistentTranspositionTable(file={self.filename},entries={len(self)}/{2 * self.n_buckets})>"
+
+
+@checker
+def persistent_alpha_beta(mdp: WorldMDP, state: MyWorldState, max_depth: int, directory: str = DEFAULT_DIRECTORY) -> Action:
+    """ `alpha_beta` with the persistent transposition table of the world in `directory` """
+    with PersistentTranspositionTable(mdp, directory) as table:
+        return AlphaBetaSearch(mdp, table).search(state, max_depth)[1]
+
+
+def cold_persistent_alpha_beta(mdp: WorldMDP, state: MyWorldState, max_depth: int) -> Action:
+    """ `persistent_alpha_beta` with an empty table in a new temporary directory, so that every run searches all the states """
+    with tempfile.TemporaryDirectory() as directory:
+        return persistent_alpha_beta(mdp, state, max_depth, directory)
@@ -0,0 +1,79 @@
+import functools
+from typing import Callable
+from lle import World
+from world_mdp import MY_AGENT, MyWorldState, WorldMDP, DELTAS
+
+Position = tuple[int, int]
+
+
+def _walkable(world: World) -> set[Position]:
+    blocked = set(world.wall_pos) | {position for position, _ in world.laser_sources}
+    return {(i, j) for i in range(world.height) for j in range(world.width) if (i, j) not in blocked}
+
+
+def _hazards(world: World, walkable: set[Position]) -> set[Position]:
+    """
+    Tiles where a move of any agent may change the value of a state or end the game: the gems, exits and voids, and every
+    tile of the laser beams, whether they are blocked or not (an agent that enters or leaves a beam may kill, or save,
+    another agent further along it).
+    """
+    hazards = {position for position, _ in world.gems} | set(world.exit_pos) | set(world.void_pos)
+    for (i, j), source in world.laser_sources:
+        di, dj = DELTAS[source.direction.name]
+        i, j = i + di, j + dj
+        while (i, j) in walkable:
+            hazards.add((i, j))
+            i, j = i + di, j + dj
+    return hazards
+
+
+def _zone(start: Position, radius: int, walkable: set[Position]) -> set[Position]:
+    """ Tiles that an agent can reach from the start in at most `radius` moves, regardless of the other agents """
+    zone, frontier = {start}, [start]
+    for _ in range(radius):
+        frontier = [(i + di, j + dj) for i, j in frontier for di, dj in DELTAS.values()
+                    if (i + di, j + dj) in walkable and (i + di, j + dj) not in zone]
+        zone.update(frontier)
+        if len(frontier) == 0: break
+    return zone
+
+
+def irrelevant_opponents(mdp: WorldMDP, state: MyWorldState, depth: int) -> frozenset[int]:
+    """
+    Opponents whose moves cannot change the result of a search of the given depth from the state, so that they can be
+    collapsed to STAY. No agent moves more than `depth` times in such a search, so each one stays in its zone: the tiles
+    it can reach in `depth` moves. An opponent is relevant if its zone meets a hazard (see `_hazards`) or the zone of a
+    relevant agent, where it may block it, starting from my agent until no other opponent becomes relevant. The other
+    opponents can neither score, die, end the game nor get in the way of a relevant agent, so that all their moves lead
+    to the same value as staying. Every later state of the search is in the same zones, so one analysis at the root holds
+    for the whole search.
+    """
+    world = mdp.world
+    walkable = _walkable(world)
+    zones = {agent: _zone(state.agent_position(agent), depth, walkable) for agent in range(state.n_agents)}
+    reached = zones[MY_AGENT] | _hazards(world, walkable)
+    relevant = {MY_AGENT}
+    changed = True
+    while changed:
+        changed = False
+        for agent, zone in zones.items():
+            if agent not in relevant and not zone.isdisjoint(reached):
+                relevant.add(agent)
+                reached |= zone
+                changed = True
+    return frozenset(zones) - relevant
+
+
+def relevance_pruning(algorithm: Callable) -> Callable:
+    """
+    Decorator of a search function (e.g. `alpha_beta`) that collapses the irrelevant opponents of the root state to STAY
+    for the duration of the search. The result is the same, with a smaller tree.
+    """
+    @functools.wraps(algorithm)
+    def search(mdp: WorldMDP, state: MyWorldState, max_depth: int, *args, **kwargs):
+        mdp.stay_agents = irrelevant_opponents(mdp, state, max_depth)
+        try:
+            return algorithm(mdp, state, max_depth, *args, **kwargs)
+        finally:
+            mdp.stay_agents = frozenset()
+    return search
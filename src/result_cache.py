@@ -0,0 +1,82 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from typing import Callable, Optional
+from lle import World
+from world_mdp import WorldMDP
+
+DEFAULT_DIRECTORY = ".cache/results"
+
+# Modules the results of the searches depend on, next to this file
+SOURCES = ("adversarial_search.py", "world_mdp.py", "mdp.py", "transposition_table.py", "move_ordering.py", "evaluator.py",
+           "successor_cache.py", "instrumentation.py", "distance_maps.py")
+
+
+class ResultCache:
+    """
+    Results of `algorithm(mdp_class(World(world)), s0, depth)` on disk, one JSON file per cell, named after a hash of the
+    world string, the depth, the MDP class, the algorithm and a fingerprint of the code of the searches: the `SOURCES`
+    and the modules of the MDP class and of the algorithm. Any change to that code changes the keys, so the results
+    computed with the old code are never returned again.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, sources: tuple[str, ...] = SOURCES):
+        self.directory = str(directory)
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.sources = [os.path.join(here, source) for source in sources]
+        # Fingerprints by set of files, computed once per cache
+        self._fingerprints: dict[tuple[str, ...], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, *objects) -> str:
+        """ Hash of the content of the `SOURCES` and of the source files of the given classes or functions """
+        files = tuple(sorted({os.path.abspath(path) for path in self.sources + [inspect.getsourcefile(obj) for obj in objects]}))
+        if files not in self._fingerprints:
+            digest = hashlib.sha256()
+            for path in files:
+                digest.update(os.path.basename(path).encode() + b"\0")
+                with open(path, 'rb') as f: digest.update(f.read())
+            self._fingerprints[files] = digest.hexdigest()
+        return self._fingerprints[files]
+
+    def key(self, world: str, depth: int, mdp_class: type[WorldMDP], algorithm: Callable, name: Optional[str] = None) -> str:
+        cell = [world, depth, mdp_class.__name__, name or algorithm.__name__, self.fingerprint(mdp_class, algorithm)]
+        return hashlib.sha256(json.dumps(cell).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key)) as f: return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, result: dict):
+        """ Writes the result to a temporary file that is then renamed, so that a result on disk is always complete """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f: json.dump(result, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def run(self, world: str, depth: int, mdp_class: type[WorldMDP], algorithm: Callable, name: Optional[str] = None) -> dict:
+        """ Returns the action (by name) and the number of expanded states of the cell, and only runs it if it is not cached """
+        key = self.key(world, depth, mdp_class, algorithm, name)
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        mdp = mdp_class(World(world))
+        action = algorithm(mdp, mdp.reset(), depth)
+        result = {"action": getattr(action, "name", str(action)), "n_expanded_states": mdp.n_expanded_states}
+        self.put(key, result)
+        return result
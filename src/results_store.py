@@ -0,0 +1,99 @@
+import csv
+import hashlib
+import os
+from typing import Callable, Optional
+import numpy as np
+
+# Names of the columns of `generateGraphics` (whose CSV files have no header) and of `graphics`
+LEGACY_FIELDNAMES = ["World", "Depth", "WMDP", "Algorithm", "Algorithm Name", "Expanded States"]
+LEGACY_NAMES = {"World": "world", "Depth": "depth", "WMDP": "mdp", "Algorithm": "algorithm", "Algorithm Name": "algorithm_name",
+                "Expanded States": "n_expanded_states"}
+
+# Columns that are always kept as strings, even when they hold numbers (e.g. the worlds of `generateGraphics`)
+STRING_COLUMNS = ("world", "mdp", "algorithm", "algorithm_name", "action")
+GROUP_COLUMNS = ("world", "mdp", "algorithm")
+# Array of the `.npz` copy of a CSV file that holds the SHA-256 of the CSV file it was made from
+DIGEST = "csv_sha256"
+
+
+def _column(name: str, values: list[str]) -> np.ndarray:
+    if name not in STRING_COLUMNS:
+        for dtype in (np.int64, np.float64):
+            try:
+                return np.array(values, dtype=dtype)
+            except ValueError:
+                pass
+    return np.array(values, dtype=str)
+
+
+class ResultsStore:
+    """
+    Results of a sweep as one NumPy array per column, sorted by world, MDP, algorithm and depth, with the slice of the rows
+    of each (world, MDP, algorithm) group, so that every series is a view of the columns. Reads the CSV files of
+    `generateGraphics` (without header), of `graphics` and of `benchmark` (with headers).
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        order = np.lexsort(tuple(columns[name] for name in ("depth", *reversed(GROUP_COLUMNS))))
+        self.columns = {name: column[order] for name, column in columns.items()}
+        self.groups: dict[tuple[str, str, str], slice] = {}
+        keys = list(zip(*(self.columns[name].tolist() for name in GROUP_COLUMNS)))
+        start = 0
+        for i in range(1, len(keys) + 1):
+            if i == len(keys) or keys[i] != keys[start]:
+                self.groups[keys[start]] = slice(start, i)
+                start = i
+
+    def __len__(self) -> int:
+        return len(self.columns["depth"])
+
+    @staticmethod
+    def from_csv(filename: str) -> "ResultsStore":
+        with open(filename, newline='') as csvfile:
+            rows = list(csv.reader(csvfile))
+        header = rows[0] if len(rows) > 0 and "depth" in (name.lower() for name in rows[0]) else None
+        if header is not None:
+            rows = rows[1:]
+        else:
+            header = LEGACY_FIELDNAMES
+        names = [LEGACY_NAMES.get(name, name) for name in header]
+        values = list(zip(*rows)) if len(rows) > 0 else [()] * len(names)
+        return ResultsStore({name: _column(name, list(column)) for name, column in zip(names, values)})
+
+    @staticmethod
+    def from_npz(filename: str) -> "ResultsStore":
+        with np.load(filename, allow_pickle=False) as data:
+            return ResultsStore({name: data[name] for name in data.files if name != DIGEST})
+
+    def save_npz(self, filename: str, digest: str = ""):
+        np.savez(filename, **self.columns, **({DIGEST: np.array(digest)} if digest else {}))
+
+    @staticmethod
+    def load(filename: str, cache: bool = False) -> "ResultsStore":
+        """
+        Reads the CSV file. With `cache`, the columns are also kept in a `.npz` file next to it, which is read instead as
+        long as it holds the SHA-256 of the CSV file, and (re)written otherwise.
+        """
+        if not cache: return ResultsStore.from_csv(filename)
+        with open(filename, 'rb') as f: digest = hashlib.sha256(f.read()).hexdigest()
+        npz = os.path.splitext(filename)[0] + ".npz"
+        if os.path.exists(npz):
+            with np.load(npz, allow_pickle=False) as data:
+                valid = DIGEST in data.files and str(data[DIGEST]) == digest
+            if valid: return ResultsStore.from_npz(npz)
+        store = ResultsStore.from_csv(filename)
+        store.save_npz(npz, digest)
+        return store
+
+    def series(self, world: str, mdp: str, algorithm: str, column: str = "n_expanded_states",
+               reduce: Optional[Callable[[np.ndarray], float]] = np.median) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Depths and values of the column for the group, in increasing depth. The values of the repeated runs of a depth
+        are reduced to one with `reduce`, or all returned if `reduce` is None.
+        """
+        rows = self.groups.get((world, mdp, algorithm), slice(0, 0))
+        depths, values = self.columns["depth"][rows], self.columns[column][rows]
+        if reduce is None or len(depths) == 0 or np.all(depths[1:] != depths[:-1]):
+            return depths, values
+        unique, starts = np.unique(depths, return_index=True)
+        return unique, np.array([reduce(chunk) for chunk in np.split(values, starts[1:])])
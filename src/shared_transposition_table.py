@@ -0,0 +1,127 @@
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+import numpy as np
+from mdp import MDP, S, A
+from transposition_table import TranspositionTable, TTEntry, Bound
+
+
+KEY_MASK = (1 << 64) - 1
+VALID = 1 << 26
+NO_ACTION = 0xFF
+
+
+def _value_bits(value: float) -> int:
+    return struct.unpack("<Q", struct.pack("<d", value))[0]
+
+
+def _bits_value(bits: int) -> float:
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+
+class SharedTranspositionTable(TranspositionTable[A, S]):
+    """
+    Transposition table stored in `multiprocessing.shared_memory` so that several processes can search with it.
+    It has the same interface and replacement policy as `TranspositionTable`, but an entry is packed into three
+    64-bit words:
+        - check: state key ^ data ^ value bits
+        - data:  depth (16 bits) | bound (2 bits) | encoded action (8 bits) | valid bit
+        - value: bits of the float64 value
+    Writes take no lock: an entry torn by two concurrent writes fails the check and is read as a miss.
+    State keys are `hash(state)`, which must be the same in every process (true for `MyWorldState`).
+    Pickling the table (e.g. to send it to a worker) attaches the worker to the same shared memory. Since an MDP
+    cannot always be pickled, the worker must then set `mdp` to its own copy, used to encode and decode actions.
+    """
+
+    def __init__(self, mdp: Optional[MDP[A, S]], max_entries: int = 1 << 20, deeper_hits: bool = False, name: Optional[str] = None):
+        if max_entries < 2: raise ValueError("A transposition table needs room for at least 2 entries.")
+        self.mdp = mdp
+        self.n_buckets = max_entries // 2
+        self.deeper_hits = deeper_hits
+        self.owner = name is None
+        if self.owner:
+            self.shm = SharedMemory(create=True, size=self.n_buckets * 2 * 3 * 8)
+        else:
+            self.shm = SharedMemory(name=name)
+        self.slots = np.ndarray((self.n_buckets * 2, 3), dtype=np.uint64, buffer=self.shm.buf)
+        if self.owner: self.slots.fill(0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self):
+        return 2 * self.n_buckets, self.deeper_hits, self.shm.name
+
+    def __setstate__(self, state):
+        self.__init__(None, *state)
+
+    def close(self):
+        """ Detaches from the shared memory, which is also freed if this process created it """
+        del self.slots
+        self.shm.close()
+        if self.owner: self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @staticmethod
+    def _key(state: S) -> int:
+        return hash(state) & KEY_MASK
+
+    def _read(self, slot: int, key: int) -> Optional[tuple[int, int, float]]:
+        """ Returns the (depth, data, value) of the slot if it holds a valid entry for `key` """
+        check, data, bits = (int(word) for word in self.slots[slot])
+        if not data & VALID or check ^ data ^ bits != key: return None
+        return data & 0xFFFF, data, _bits_value(bits)
+
+    def _entry(self, state: S, data: int, value: float) -> TTEntry[A, S]:
+        code = (data >> 18) & 0xFF
+        action = None if code == NO_ACTION else self.mdp.decode_action(state, code)
+        return TTEntry(state, data & 0xFFFF, value, action, Bound((data >> 16) & 0b11))
+
+    def _usable_depth(self, entry_depth: int, depth: int) -> bool:
+        return entry_depth >= depth if self.deeper_hits else entry_depth == depth
+
+    def clear(self):
+        if hasattr(self, "slots"): self.slots.fill(0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def probe(self, state: S, depth: int) -> Optional[TTEntry[A, S]]:
+        key = self._key(state)
+        bucket = key % self.n_buckets
+        for slot in (2 * bucket, 2 * bucket + 1):
+            if (read := self._read(slot, key)) is not None and self._usable_depth(read[0], depth):
+                self.hits += 1
+                return self._entry(state, *read[1:])
+        self.misses += 1
+        return None
+
+    def best_action(self, state: S) -> Optional[A]:
+        key = self._key(state)
+        bucket = key % self.n_buckets
+        for slot in (2 * bucket, 2 * bucket + 1):
+            if (read := self._read(slot, key)) is not None and (read[1] >> 18) & 0xFF != NO_ACTION:
+                return self._entry(state, *read[1:]).action
+        return None
+
+    def store(self, state: S, depth: int, value: float, action: Optional[A], bound: Bound = Bound.EXACT):
+        key = self._key(state)
+        bucket = key % self.n_buckets
+        code = NO_ACTION if action is None else self.mdp.encode_action(state, action)
+        data = min(depth, 0xFFFF) | int(bound) << 16 | code << 18 | VALID
+        bits = _value_bits(value)
+        current_data = int(self.slots[2 * bucket, 1])
+        slot = 2 * bucket if not current_data & VALID or depth >= current_data & 0xFFFF else 2 * bucket + 1
+        if int(self.slots[slot, 1]) & VALID and self._read(slot, key) is None: self.evictions += 1
+        self.slots[slot] = (key ^ data ^ bits, data, bits)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.slots[:, 1] & np.uint64(VALID)))
+
+    def __repr__(self):
+        return f"<SharedTranspositionTable(name={self.shm.name},entries={len(self)}/{2 * self.n_buckets})>"
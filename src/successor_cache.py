@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """ Bounded mapping that evicts the least recently used entry when full, and counts its hits and misses """
+
+    def __init__(self, max_size: int):
+        if max_size < 1: raise ValueError("The cache size must be at least 1.")
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: V):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size: self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses > 0 else 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"<LRUCache(size={len(self)}/{self.max_size},hits={self.hits},misses={self.misses})>"
@@ -0,0 +1,155 @@
+from typing import Callable, Generic, Optional
+from lle import World, Action
+from mdp import A, S
+from transposition_table import TranspositionTable, TTEntry, Bound
+from world_mdp import MyWorldState, DELTAS
+
+# Transformations of the (i, j) coordinates of a grid of the given height and width, and whether they need a square grid
+TRANSFORMATIONS: dict[str, tuple[Callable[[int, int, int, int], tuple[int, int]], bool]] = {
+    "horizontal": (lambda i, j, h, w: (i, w - 1 - j), False),
+    "vertical": (lambda i, j, h, w: (h - 1 - i, j), False),
+    "rotation_180": (lambda i, j, h, w: (h - 1 - i, w - 1 - j), False),
+    "transpose": (lambda i, j, h, w: (j, i), True),
+    "anti_transpose": (lambda i, j, h, w: (w - 1 - j, h - 1 - i), True),
+    "rotation_90": (lambda i, j, h, w: (j, h - 1 - i), True),
+    "rotation_270": (lambda i, j, h, w: (w - 1 - j, i), True),
+}
+
+
+def _layout(world: World) -> dict[tuple[int, int], object]:
+    """ The tiles of the world that are not floor (the start tiles are floor once the game has started) """
+    layout = {position: "@" for position in world.wall_pos}
+    layout.update({position: "X" for position in world.exit_pos})
+    layout.update({position: "V" for position in world.void_pos})
+    layout.update({position: "G" for position, _ in world.gems})
+    layout.update({position: ("L", source.agent_id, DELTAS[source.direction.name]) for position, source in world.laser_sources})
+    return layout
+
+
+class Symmetry:
+    """
+    Transformation of the grid that leaves the layout of a world unchanged, so that a state and its image have the same
+    value and the image of an action is available in the image of the state. Its `cells` and `gem_bits` map the position
+    words and the gem bits of packed states (see `pack_world_state`), and its `actions` the actions, by `Action.value`.
+    """
+
+    def __init__(self, name: str, world: World, transform: Callable[[int, int], tuple[int, int]]):
+        self.name = name
+        self.cells = {i | j << 8: (lambda p: p[0] | p[1] << 8)(transform(i, j)) for i in range(world.height) for j in range(world.width)}
+        origin = transform(0, 0)
+
+        def delta(di: int, dj: int) -> tuple[int, int]:
+            i, j = transform(di, dj)
+            return i - origin[0], j - origin[1]
+        by_delta = {action.delta: action for action in Action.ALL}
+        self.actions = [by_delta[delta(*action.delta)] for action in Action.ALL]
+        self.inverse_actions = [None] * len(Action.ALL)
+        for action in Action.ALL: self.inverse_actions[self.actions[action.value].value] = action
+        gems = [position for position, _ in world.gems]
+        self.gem_bits = [1 << gems.index(transform(*position)) for position in gems]
+
+    def transform(self, packed: int) -> int:
+        """ Returns the image of the packed world state """
+        n_agents = packed & 0xFF
+        image = packed & 0xFFFF
+        for shift in range(16, 16 + 16 * n_agents, 16): image |= self.cells[packed >> shift & 0xFFFF] << shift
+        gem_shift = 16 + 16 * n_agents
+        collected = packed >> gem_shift
+        for bit in self.gem_bits:
+            if collected == 0: break
+            if collected & 1: image |= bit << gem_shift
+            collected >>= 1
+        return image
+
+    def action(self, action: Action) -> Action:
+        return self.actions[action.value]
+
+    def inverse_action(self, action: Action) -> Action:
+        return self.inverse_actions[action.value]
+
+    def __repr__(self):
+        return f"<Symmetry({self.name})>"
+
+
+class WorldSymmetries:
+    """
+    The reflections and rotations of the grid that leave the layout of the world unchanged (walls, exits, voids, gems and
+    laser sources with their agent and direction), found when the world is loaded. The canonical state of a state is the
+    image with the smallest packed world state, so that symmetric states share one key.
+    """
+
+    def __init__(self, world: World):
+        layout = _layout(world)
+        self.symmetries: list[Symmetry] = []
+        for name, (transform, square) in TRANSFORMATIONS.items():
+            if square and world.height != world.width: continue
+            transform_ij = (lambda t: lambda i, j: t(i, j, world.height, world.width))(transform)
+            # e.g. the vertical mirror of a world of one row
+            if all(transform_ij(i, j) == (i, j) for i in range(world.height) for j in range(world.width)): continue
+            image = {}
+            for (i, j), tile in layout.items():
+                if isinstance(tile, tuple):
+                    (di, dj), origin = transform_ij(*tile[2]), transform_ij(0, 0)
+                    tile = ("L", tile[1], (di - origin[0], dj - origin[1]))
+                image[transform_ij(i, j)] = tile
+            if image == layout: self.symmetries.append(Symmetry(name, world, transform_ij))
+
+    def __len__(self) -> int:
+        return len(self.symmetries)
+
+    def canonical(self, state: MyWorldState) -> tuple[MyWorldState, Optional[Symmetry]]:
+        """ Returns the canonical state of the state and the symmetry that maps the state onto it (None if it is the state itself) """
+        best, best_symmetry = state.packed, None
+        for symmetry in self.symmetries:
+            image = symmetry.transform(state.packed)
+            if image < best: best, best_symmetry = image, symmetry
+        if best_symmetry is None: return state, None
+        return MyWorldState.from_packed(state.value, state.current_agent, best), best_symmetry
+
+    def __repr__(self):
+        return f"<WorldSymmetries({[symmetry.name for symmetry in self.symmetries]})>"
+
+
+class SymmetricTranspositionTable(Generic[A, S]):
+    """
+    Transposition table (a `TranspositionTable` or a `SharedTranspositionTable`) whose entries are keyed by canonical
+    states, so that symmetric states share their entries. Actions are stored as seen from the canonical state and turned
+    back into actions of the probed state. A symmetric state has the same value but its actions are searched in another
+    order, so that its best action may be another one of the tied best actions.
+    """
+
+    def __init__(self, table: TranspositionTable[A, S], symmetries: WorldSymmetries):
+        self.table = table
+        self.symmetries = symmetries
+
+    def probe(self, state: S, depth: int) -> Optional[TTEntry[A, S]]:
+        canonical, symmetry = self.symmetries.canonical(state)
+        entry = self.table.probe(canonical, depth)
+        if entry is None or symmetry is None: return entry
+        return TTEntry(state, entry.depth, entry.value, symmetry.inverse_action(entry.action) if entry.action is not None else None, entry.bound)
+
+    def best_action(self, state: S) -> Optional[A]:
+        canonical, symmetry = self.symmetries.canonical(state)
+        action = self.table.best_action(canonical)
+        return symmetry.inverse_action(action) if action is not None and symmetry is not None else action
+
+    def store(self, state: S, depth: int, value: float, action: Optional[A], bound: Bound = Bound.EXACT):
+        canonical, symmetry = self.symmetries.canonical(state)
+        self.table.store(canonical, depth, value, symmetry.action(action) if action is not None and symmetry is not None else action, bound)
+
+    def clear(self):
+        self.table.clear()
+
+    @property
+    def hits(self) -> int:
+        return self.table.hits
+
+    @property
+    def misses(self) -> int:
+        return self.table.misses
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __repr__(self):
+        return f"<SymmetricTranspositionTable({self.table},{self.symmetries})>"
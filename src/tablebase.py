@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Solves every position reachable from the initial state of a small world by backward induction, and writes the values
+and best actions to a memory-mapped tablebase that the searches use as their transposition table.
+"""
+import argparse
+import json
+import struct
+import time
+from typing import Optional
+import numpy as np
+from lle import World, Action
+from world_mdp import MY_AGENT, MyWorldState, WorldMDP, BetterValueFunction
+from transposition_table import TranspositionTable, TTEntry, Bound
+
+FORMAT_VERSION = 1
+
+
+def _key_size(world: World) -> int:
+    """ Bytes of a key: the packed world state, the agent, the value and a last non-zero byte, since NumPy strips the trailing zeros of bytes """
+    return (16 + 16 * world.n_agents + world.n_gems + 7) // 8 + 1 + 8 + 1
+
+
+def _key(state: MyWorldState, size: int) -> bytes:
+    return state.packed.to_bytes(size - 10, 'big') + bytes((state.current_agent,)) + struct.pack('>d', state.value) + b'\x01'
+
+
+def _dtype(size: int, n_layers: int) -> np.dtype:
+    return np.dtype([("key", f"S{size}"), ("values", np.float32, (n_layers,)), ("actions", np.int8, (n_layers,))])
+
+
+def _enumerate(mdp: WorldMDP, root: MyWorldState) -> tuple[list[MyWorldState], list[list[tuple[int, int]]]]:
+    """ The states reachable from the root, and the (action value, state index) of the children of each, in the order of `available_actions` """
+    states, index = [root], {root: 0}
+    children: list[list[tuple[int, int]]] = []
+    for state in states:
+        edges = []
+        if not mdp.is_final(state):
+            for action in list(mdp.available_actions(state)):
+                child = mdp.transition(state, action)
+                if child not in index:
+                    index[child] = len(states)
+                    states.append(child)
+                edges.append((action.value, index[child]))
+        children.append(edges)
+    return states, children
+
+
+def _solve(states: list[MyWorldState], children: list[list[tuple[int, int]]], n_agents: int, max_depth: int) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Values and best actions of the states for every depth from 0 to `max_depth`, as the searches define them: the child
+    of a state at depth d is searched at depth d - 1 after a move of my agent or before one, and at depth d otherwise,
+    and the best action is the first one of `available_actions` with the best value. Stops at the first depth whose values
+    are those of the depth before, since all the deeper ones are then the same, in which case the table is `converged`.
+    """
+    n = len(states)
+    agents = np.array([state.current_agent for state in states], dtype=np.int64)
+    values = np.empty((n, max_depth + 1), dtype=np.float64)
+    values[:, :] = np.array([state.value for state in states], dtype=np.float64)[:, None]
+    actions = np.full((n, max_depth + 1), -1, dtype=np.int8)
+    # Edges of the non-final states of each agent, grouped by parent
+    groups = []
+    for agent in range(n_agents):
+        parents = [i for i in range(n) if agents[i] == agent and len(children[i]) > 0]
+        if len(parents) == 0: continue
+        counts = np.array([len(children[i]) for i in parents], dtype=np.int64)
+        codes = np.array([code for i in parents for code, _ in children[i]], dtype=np.int8)
+        targets = np.array([child for i in parents for _, child in children[i]], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        previous = (agent == MY_AGENT) | (agents[targets] == MY_AGENT)
+        groups.append((agent, np.array(parents, dtype=np.int64), counts, starts, codes, targets, previous))
+    # The children of the other agents at the same depth are the next agents, so they are solved first
+    groups.sort(key=lambda group: (group[0] == MY_AGENT, -group[0]))
+    for depth in range(1, max_depth + 1):
+        for agent, parents, counts, starts, codes, targets, previous in groups:
+            child_values = np.where(previous, values[targets, depth - 1], values[targets, depth])
+            reduce = np.maximum if agent == MY_AGENT else np.minimum
+            best = reduce.reduceat(child_values, starts)
+            positions = np.where(child_values == np.repeat(best, counts), np.arange(len(targets)), len(targets))
+            values[parents, depth] = best
+            actions[parents, depth] = codes[np.minimum.reduceat(positions, starts)]
+        if depth >= 2 and np.array_equal(values[:, depth], values[:, depth - 1]):
+            return values[:, :depth + 1], actions[:, :depth + 1], True
+    return values, actions, False
+
+
+class Tablebase:
+    """
+    Values and best actions of all the positions reachable from the initial state of a world, for every search depth up
+    to the number of layers of the table (for every depth if it is `converged`), as `MinimaxSearch` and `AlphaBetaSearch`
+    find them without evaluator. The rows are sorted by key, so that a position is found by binary search, and are read
+    from a memory-mapped file once the table is saved and loaded. A tablebase is a read-only transposition table: positions
+    that it does not cover are probed in and stored to `table`, if any.
+    """
+
+    def __init__(self, rows: np.ndarray, metadata: dict, table: Optional[TranspositionTable] = None):
+        self.rows = rows
+        self.metadata = metadata
+        self.table = table
+        self.key_size = metadata["key_size"]
+        self.n_layers = metadata["n_layers"]
+        self.converged = metadata["converged"]
+        self.keys, self.values, self.actions = rows["key"], rows["values"], rows["actions"]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def solve(mdp: WorldMDP, max_depth: int, table: Optional[TranspositionTable] = None) -> "Tablebase":
+        """ Solves the positions reachable from `mdp.reset()` up to `max_depth` """
+        states, children = _enumerate(mdp, mdp.reset())
+        values, actions, converged = _solve(states, children, mdp.world.n_agents, max_depth)
+        size = _key_size(mdp.world)
+        keys = np.array([_key(state, size) for state in states], dtype=f"S{size}")
+        order = np.argsort(keys, kind="stable")
+        rows = np.empty(len(states), dtype=_dtype(size, values.shape[1]))
+        rows["key"], rows["values"], rows["actions"] = keys[order], values[order], actions[order]
+        metadata = {"version": FORMAT_VERSION, "world": mdp.world.world_string, "mdp": type(mdp).__name__, "key_size": size,
+                    "n_layers": int(values.shape[1]), "converged": converged, "n_positions": len(states)}
+        return Tablebase(rows, metadata, table)
+
+    def save(self, filename: str):
+        """ Writes the rows to `filename` (a `.npy` file) and the metadata to `filename.json` """
+        np.save(filename, self.rows, allow_pickle=False)
+        with open(filename + ".json", 'w') as f: json.dump(self.metadata, f)
+
+    @staticmethod
+    def load(filename: str, mdp: WorldMDP, table: Optional[TranspositionTable] = None) -> "Tablebase":
+        """ Maps the table of the file in memory, and checks that it was solved for the world and the MDP class of `mdp` """
+        with open(filename + ".json") as f: metadata = json.load(f)
+        if metadata.get("version") != FORMAT_VERSION: raise ValueError(f"{filename} has version {metadata.get('version')}, not {FORMAT_VERSION}.")
+        if metadata["world"] != mdp.world.world_string or metadata["mdp"] != type(mdp).__name__:
+            raise ValueError(f"{filename} was solved for another world or another MDP than {mdp}.")
+        return Tablebase(np.load(filename, mmap_mode='r', allow_pickle=False), metadata, table)
+
+    def _row(self, state: MyWorldState) -> Optional[int]:
+        key = _key(state, self.key_size)
+        i = int(np.searchsorted(self.keys, key))
+        return i if i < len(self.keys) and self.keys[i] == key else None
+
+    def _layer(self, depth: int) -> Optional[int]:
+        if depth < self.n_layers: return depth
+        return self.n_layers - 1 if self.converged else None
+
+    def lookup(self, state: MyWorldState, depth: int) -> Optional[tuple[float, Optional[Action]]]:
+        """ Value and best action (None at depth 0 and in final states) of the state at the depth, if the table covers them """
+        layer = self._layer(depth)
+        row = self._row(state) if layer is not None else None
+        if row is None: return None
+        action = int(self.actions[row, layer])
+        return float(self.values[row, layer]), Action.ALL[action] if action >= 0 else None
+
+    def probe(self, state: MyWorldState, depth: int) -> Optional[TTEntry]:
+        result = self.lookup(state, depth)
+        if result is None:
+            self.misses += 1
+            return self.table.probe(state, depth) if self.table is not None else None
+        self.hits += 1
+        return TTEntry(state, depth, result[0], result[1], Bound.EXACT)
+
+    def best_action(self, state: MyWorldState) -> Optional[Action]:
+        result = self.lookup(state, self.n_layers - 1)
+        if result is not None and result[1] is not None: return result[1]
+        return self.table.best_action(state) if self.table is not None else None
+
+    def store(self, state: MyWorldState, depth: int, value: float, action: Optional[Action], bound: Bound = Bound.EXACT):
+        if self.table is None or self.lookup(state, depth) is not None: return
+        self.table.store(state, depth, value, action, bound)
+
+    def clear(self):
+        if self.table is not None: self.table.clear()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"<Tablebase({self.metadata['mdp']},{len(self)} positions,{self.n_layers} layers{',converged' if self.converged else ''})>"
+
+
+def main():
+    from generateGraphics import WORLDS
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--world", type=int, default=1, help="world of generateGraphics, from 1")
+    parser.add_argument("--mdp", choices=("WorldMDP", "BetterValueFunction"), default="WorldMDP")
+    parser.add_argument("--max-depth", type=int, default=15)
+    parser.add_argument("--output", default=None, help="default: tablebase_<world>_<mdp>.npy")
+    args = parser.parse_args()
+    mdp_class = WorldMDP if args.mdp == "WorldMDP" else BetterValueFunction
+    mdp = mdp_class(World(WORLDS[args.world - 1].world_string))
+    start = time.perf_counter()
+    tablebase = Tablebase.solve(mdp, args.max_depth)
+    output = args.output or f"tablebase_{args.world}_{args.mdp}.npy"
+    tablebase.save(output)
+    print(f"{tablebase} solved in {time.perf_counter() - start:.2f}s, written to {output}")
+
+
+if __name__ == "__main__":
+    main()
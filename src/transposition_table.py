@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Generic, Optional
+from mdp import S, A
+
+
+class Bound(IntEnum):
+    """ Kind of value stored in a transposition entry """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+@dataclass(slots=True)
+class TTEntry(Generic[A, S]):
+    state: S
+    depth: int
+    value: float
+    action: Optional[A]
+    bound: Bound
+
+    def cuts(self, alpha: float, beta: float) -> bool:
+        """ Whether the stored value is enough to answer a search with the (alpha, beta) window """
+        if self.bound == Bound.EXACT: return True
+        if self.bound == Bound.LOWER: return self.value >= beta
+        return self.value <= alpha
+
+
+class TranspositionTable(Generic[A, S]):
+    """
+    Bounded transposition table keyed by state hash.
+    Each bucket holds two entries: a depth-preferred one that is only replaced by an entry searched at least
+    as deep, and an always-replace one that receives everything else.
+    By default an entry only answers a search of the same depth, so the results are the same as without the table.
+    With `deeper_hits`, an entry searched deeper than requested is also used.
+    """
+
+    def __init__(self, max_entries: int = 1 << 20, deeper_hits: bool = False):
+        if max_entries < 2: raise ValueError("A transposition table needs room for at least 2 entries.")
+        self.n_buckets = max_entries // 2
+        self.deeper_hits = deeper_hits
+        self.clear()
+
+    def clear(self):
+        self.depth_preferred: list[Optional[TTEntry[A, S]]] = [None] * self.n_buckets
+        self.always_replace: list[Optional[TTEntry[A, S]]] = [None] * self.n_buckets
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entries(self, state: S) -> tuple[Optional[TTEntry[A, S]], Optional[TTEntry[A, S]]]:
+        bucket = hash(state) % self.n_buckets
+        return self.depth_preferred[bucket], self.always_replace[bucket]
+
+    def _usable(self, entry: Optional[TTEntry[A, S]], state: S, depth: int) -> bool:
+        if entry is None or entry.state != state: return False
+        return entry.depth >= depth if self.deeper_hits else entry.depth == depth
+
+    def probe(self, state: S, depth: int) -> Optional[TTEntry[A, S]]:
+        """ Returns the entry that can answer a search of `state` at `depth`, if any """
+        for entry in self._entries(state):
+            if self._usable(entry, state, depth):
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def best_action(self, state: S) -> Optional[A]:
+        """ Returns the best action stored for `state` at any depth, if any """
+        for entry in self._entries(state):
+            if entry is not None and entry.state == state and entry.action is not None: return entry.action
+        return None
+
+    def store(self, state: S, depth: int, value: float, action: Optional[A], bound: Bound = Bound.EXACT):
+        bucket = hash(state) % self.n_buckets
+        entry = TTEntry(state, depth, value, action, bound)
+        current = self.depth_preferred[bucket]
+        slots = self.depth_preferred if current is None or depth >= current.depth else self.always_replace
+        if slots[bucket] is not None and slots[bucket].state != state: self.evictions += 1
+        slots[bucket] = entry
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self.depth_preferred) + sum(entry is not None for entry in self.always_replace)
+
+    def __repr__(self):
+        return f"<TranspositionTable(entries={len(self)}/{2 * self.n_buckets},hits={self.hits},misses={self.misses})>"
@@ -1,10 +1,15 @@
-from dataclasses import dataclass
+from itertools import chain, compress
+from typing import Optional
 import lle
 from lle import World, Action, WorldState
-from mdp import MDP, State
+from mdp import MDP, ReversibleMDP, State
+from successor_cache import LRUCache
 
 
 MY_AGENT = 0
+WORLD_STATES_CACHE_SIZE = 1 << 12
+# (i, j) step of each direction of the grid, by the name of the direction
+DELTAS = {"North": (-1, 0), "South": (1, 0), "East": (0, 1), "West": (0, -1)}
 
 
 def override(abstract_class):
@@ -15,56 +20,306 @@ def override(abstract_class):
     return overrider
 
 
-@dataclass
+# Bit of each gem in the mask of the collected gems
+_GEM_BITS = [1 << i for i in range(256)]
+
+
+def pack_world_state(world_state: WorldState) -> int:
+    """
+    Packs a world state into one int whose bytes are, from the lowest: the number of agents, the number of gems,
+    the (i, j) position of each agent, then the bitmask of the collected gems.
+    These numbers and coordinates must fit in a byte, which is the case of any world that can be displayed.
+    """
+    positions = world_state.agents_positions
+    gems_collected = world_state.gems_collected
+    n_agents = len(positions)
+    return (int.from_bytes(bytes((n_agents, len(gems_collected), *chain.from_iterable(positions))), "little")
+            | sum(compress(_GEM_BITS, gems_collected)) << (16 + 16 * n_agents))
+
+
+def unpack_world_state(packed: int) -> WorldState:
+    """ Inverse of `pack_world_state` """
+    n_agents, n_gems = packed & 0xFF, packed >> 8 & 0xFF
+    positions = (packed >> 16 & (1 << 16 * n_agents) - 1).to_bytes(2 * n_agents, "little")
+    gems_mask = packed >> (16 + 16 * n_agents)
+    return WorldState(list(zip(positions[0::2], positions[1::2])), [gems_mask >> i & 1 == 1 for i in range(n_gems)])
+
+
 class MyWorldState(State):
+    """
+    Compact state: the world state is packed into one int (see `pack_world_state`) and the hash is computed once,
+    so that transposition tables and visited sets can hold many states and compare them quickly.
+    The hash must be the same in every process, which is the case of the hash of ints and floats.
+    """
+
+    __slots__ = ("packed", "_hash")
+
     def __init__(self, value: int, current_agent: int, world_state: WorldState):
         self.value = value
         self.current_agent = current_agent
-        self.world_state = world_state
+        self.packed = pack_world_state(world_state)
+        self._hash = None
+
+    @staticmethod
+    def from_packed(value: int, current_agent: int, packed: int) -> "MyWorldState":
+        state = MyWorldState.__new__(MyWorldState)
+        state.value = value
+        state.current_agent = current_agent
+        state.packed = packed
+        state._hash = None
+        return state
+
+    @property
+    def world_state(self) -> WorldState:
+        return unpack_world_state(self.packed)
+
+    @property
+    def n_agents(self) -> int:
+        return self.packed & 0xFF
+
+    def agent_position(self, agent: int) -> tuple[int, int]:
+        position = self.packed >> (16 + 16 * agent)
+        return position & 0xFF, position >> 8 & 0xFF
 
-    def _key(self):
-        return self.world_state, self.current_agent, self.value
+    @property
+    def n_gems_collected(self) -> int:
+        return (self.packed >> (16 + 16 * self.n_agents)).bit_count()
 
     def __eq__(self, other):
-        return self._key() == other._key()
+        return self.packed == other.packed and self.current_agent == other.current_agent and self.value == other.value
 
     def __hash__(self):
-        return hash(self._key())
+        # Computed on the first call only, since a search that does not store states never needs it
+        if self._hash is None: self._hash = hash((self.packed, self.current_agent, self.value))
+        return self._hash
 
     def __repr__(self):
         return f"<MyWorldState(value={self.value},current_agent={self.current_agent},world_state={self.world_state})>"
 
 
-class WorldMDP(MDP[Action, MyWorldState]):
-    def __init__(self, world: World):
+class WorldMDP(ReversibleMDP[Action, MyWorldState]):
+    """
+    The in-place interface keeps the current state in the world itself: `apply` steps the world from where it is,
+    and the state of a node is only built when the node is expanded, or when `current_state` is called.
+    With a `cache_size`, the successors of (world state, agent, action) triples and the final flag and available actions
+    of (world state, agent) pairs are kept in LRU caches, so that the search does not simulate the same step twice.
+    `n_expanded_states` still counts every transition, while `n_simulator_steps` only counts those that were simulated.
+    The lle world states of the recent states are kept, so that going back to a state rarely needs to unpack it.
+    """
+
+    def __init__(self, world: World, cache_size: Optional[int] = None):
+        super().__init__()
         self.world = world
+        self.n_simulator_steps = 0
+        # lle world states of the recent packed states, the oldest one being forgotten first
+        self.world_states: dict[int, WorldState] = {}
+        # Bit of the gem at each position in the mask of the collected gems
+        self.gem_bits = {position: 1 << (16 + 16 * world.n_agents + i) for i, (position, _) in enumerate(world.gems)}
+        # Packed state that the world was stepped into, if it is still there, so that its lle world state is read from the
+        # world instead of unpacked
+        self._stepped_packed: Optional[int] = None
+        self.successor_cache = LRUCache[tuple[int, float, bool]](cache_size) if cache_size is not None else None
+        self.node_cache = LRUCache[tuple[bool, list[Action]]](cache_size) if cache_size is not None else None
+        # State of the in-place interface: the states from the loaded one to the parent of the current one,
+        # the current state if it was built, its value, agent and packed world state, and whether the world was set in it
+        self._path: list[MyWorldState] = []
+        self._current: Optional[MyWorldState] = None
+        self._value, self._agent, self._packed = 0, 0, 0
+        self._synced = True
+        # Agents that can only stay where they are, because nothing they do can change the result of the search
+        # (see `relevance.irrelevant_opponents`)
+        self.stay_agents: frozenset[int] = frozenset()
 
     @override(MDP)
     def reset(self):
         self.n_expanded_states = 0
+        self.n_simulator_steps = 0
         self.world.reset()
-        return MyWorldState(0, 0, self.world.get_state())
+        return self._new_state(0, 0, self.world.get_state())
 
     @override(MDP)
     def available_actions(self, state: MyWorldState) -> list[Action]:
+        if state.current_agent in self.stay_agents: return [Action.STAY]
+        if self.node_cache is not None: return self._node_info(state)[1]
         return self.world.available_actions()[state.current_agent]
 
     @override(MDP)
     def is_final(self, state: MyWorldState) -> bool:
-        self.world.set_state(state.world_state)
+        if self.node_cache is not None: return self._node_info(state)[0]
+        self._set_world(state)
         return self.world.done
 
-    def _compute_value(self, state: MyWorldState, step_reward: float) -> float:
-        return (state.value + step_reward if not self.world.agents[state.current_agent].is_dead else lle.REWARD_AGENT_DIED) if state.current_agent == MY_AGENT else state.value
+    @override(MDP)
+    def move_key(self, state: MyWorldState, action: Action) -> tuple[int, int, tuple[int, int]]:
+        return state.current_agent, action.value, state.agent_position(state.current_agent)
 
     @override(MDP)
-    def transition(self, state: MyWorldState, action: Action) -> MyWorldState:
-        self.n_expanded_states += 1
-        self.world.set_state(state.world_state)
+    def encode_action(self, state: MyWorldState, action: Action) -> int:
+        return action.value
+
+    @override(MDP)
+    def decode_action(self, state: MyWorldState, code: int) -> Action:
+        return Action.ALL[code]
+
+    @override(MDP)
+    def value_bounds(self, state: MyWorldState, depth: int) -> tuple[float, float]:
+        # Only the moves of my agent change the value: it dies, or it scores at most once per move, per gem left and
+        # when it reaches an exit, which may also end the game
+        my_moves = sum(1 for ply in range(depth) if (state.current_agent + ply) % state.n_agents == MY_AGENT)
+        if my_moves == 0: return state.value, state.value
+        gems_left = self.world.n_gems - state.n_gems_collected
+        step_reward = max(lle.REWARD_GEM_COLLECTED, lle.REWARD_AGENT_JUST_ARRIVED)
+        return lle.REWARD_AGENT_DIED, state.value + min(my_moves, gems_left + 1) * step_reward + lle.REWARD_END_GAME
+
+    @override(MDP)
+    def with_agent(self, state: MyWorldState, agent: int) -> MyWorldState:
+        return MyWorldState.from_packed(state.value, agent, state.packed)
+
+    def _compute_value(self, state: MyWorldState, step_reward: float, agent_died: bool) -> float:
+        return (state.value + step_reward if not agent_died else lle.REWARD_AGENT_DIED) if state.current_agent == MY_AGENT else state.value
+
+    def _new_state(self, value: float, current_agent: int, world_state: WorldState) -> MyWorldState:
+        state = MyWorldState(value, current_agent, world_state)
+        self._remember(state.packed, world_state)
+        return state
+
+    def _remember(self, packed: int, world_state: WorldState):
+        self.world_states[packed] = world_state
+        if len(self.world_states) > WORLD_STATES_CACHE_SIZE: del self.world_states[next(iter(self.world_states))]
+
+    def _world_state(self, state: MyWorldState) -> WorldState:
+        """ Returns the lle world state of the state, which is only unpacked if it is not a recent one """
+        world_state = self.world_states.get(state.packed)
+        if world_state is None:
+            world_state = state.world_state
+            self._remember(state.packed, world_state)
+        return world_state
+
+    def _set_world(self, state: MyWorldState):
+        """
+        Puts the world in the given state. The state is always set, even if the world seems to be in it already: anything
+        else may have changed the world since (e.g. another MDP on the same world), and a world that was stepped into a
+        state is not quite in it, since lle only kills the agents left in a laser beam (e.g. by the agent that blocked it)
+        when the state is set, and the search has always seen states that way.
+        """
+        if state.packed == self._stepped_packed:
+            # Only the states that are set are kept: the leaves of a search never are
+            world_state = self.world.get_state()
+            self._remember(state.packed, world_state)
+        else:
+            world_state = self._world_state(state)
+        self.world.set_state(world_state)
+        self._stepped_packed = None
+
+    def _step(self, agent: int, action: Action) -> tuple[float, bool]:
+        """ Performs the action of the agent from the current state of the world, and returns the step reward and whether the agent died """
+        self.n_simulator_steps += 1
         actions = [Action.STAY] * self.world.n_agents
-        actions[state.current_agent] = action
+        actions[agent] = action
         step_reward = self.world.step(actions)
-        return MyWorldState(self._compute_value(state, step_reward), (state.current_agent + 1) % self.world.n_agents, self.world.get_state())
+        # Reading `agents` copies them, and an agent can only have died if the game is over
+        return step_reward, self.world.done and self.world.agents[agent].is_dead
+
+    def _next_packed(self, state: MyWorldState, action: Action) -> int:
+        """ Returns the packed world state after the action: an available action always moves the agent by its delta, and collects the gem it walks on """
+        shift = 16 + 16 * state.current_agent
+        di, dj = action.delta
+        position = ((state.packed >> shift & 0xFF) + di, (state.packed >> shift + 8 & 0xFF) + dj)
+        return state.packed & ~(0xFFFF << shift) | (position[0] | position[1] << 8) << shift | self.gem_bits.get(position, 0)
+
+    def _simulate(self, state: MyWorldState, action: Action) -> tuple[int, float, bool]:
+        """ Performs the action in the simulator and returns the next packed world state, the step reward and whether the agent died """
+        self._set_world(state)
+        step_reward, agent_died = self._step(state.current_agent, action)
+        next_packed = self._next_packed(state, action)
+        self._stepped_packed = next_packed
+        return next_packed, step_reward, agent_died
+
+    def _node_info(self, state: MyWorldState) -> tuple[bool, list[Action]]:
+        """ Returns whether the state is final and the actions available in it, from the cache if possible """
+        key = (state.packed, state.current_agent)
+        info = self.node_cache.get(key)
+        if info is None:
+            self._set_world(state)
+            info = (self.world.done, self.world.available_actions()[state.current_agent])
+            self.node_cache.put(key, info)
+        return info
+
+    @override(MDP)
+    def transition(self, state: MyWorldState, action: Action) -> MyWorldState:
+        self.n_expanded_states += 1
+        if self.successor_cache is None:
+            next_packed, step_reward, agent_died = self._simulate(state, action)
+        else:
+            key = (state.packed, state.current_agent, action.value)
+            successor = self.successor_cache.get(key)
+            if successor is None:
+                successor = self._simulate(state, action)
+                self.successor_cache.put(key, successor)
+            next_packed, step_reward, agent_died = successor
+        return MyWorldState.from_packed(self._compute_value(state, step_reward, agent_died), (state.current_agent + 1) % self.world.n_agents, next_packed)
+
+    @override(ReversibleMDP)
+    def load(self, state: MyWorldState):
+        self._set_world(state)
+        self._path = []
+        self._current, self._value, self._agent, self._packed = state, state.value, state.current_agent, state.packed
+        self._synced = True
+
+    def _sync(self):
+        """ Sets the world in the current state, after an `apply` or an `undo` """
+        if self._synced: return
+        if self._current is None:
+            self._remember(self._packed, self.world.get_state())
+            self._current = MyWorldState.from_packed(self._value, self._agent, self._packed)
+        self._set_world(self._current)
+        self._synced = True
+
+    @override(ReversibleMDP)
+    def apply(self, action: Action):
+        self.n_expanded_states += 1
+        self._sync()
+        parent = self._current
+        self._path.append(parent)
+        step_reward, agent_died = self._step(parent.current_agent, action)
+        self._stepped_packed = None
+        self._value = self._compute_value(parent, step_reward, agent_died)
+        self._agent = (parent.current_agent + 1) % self.world.n_agents
+        self._packed = self._next_packed(parent, action)
+        self._current = None
+        self._synced = False
+
+    @override(ReversibleMDP)
+    def undo(self):
+        # Restoring the world is delayed until it is needed, so that several undo in a row only restore it once
+        self._current = self._path.pop()
+        self._value, self._agent, self._packed = self._current.value, self._current.current_agent, self._current.packed
+        self._synced = False
+        if len(self._path) == 0: self._sync()
+
+    @override(ReversibleMDP)
+    def current_state(self) -> MyWorldState:
+        self._sync()
+        return self._current
+
+    @override(ReversibleMDP)
+    def current_value(self) -> float:
+        return self._value
+
+    @override(ReversibleMDP)
+    def current_agent(self) -> int:
+        return self._agent
+
+    @override(ReversibleMDP)
+    def current_is_final(self) -> bool:
+        self._sync()
+        return self.world.done
+
+    @override(ReversibleMDP)
+    def current_actions(self) -> list[Action]:
+        if self._agent in self.stay_agents: return [Action.STAY]
+        self._sync()
+        return self.world.available_actions()[self._agent]
 
     def __repr__(self):
         return f"<WorldMDP(world={self.world.world_string})>"
@@ -72,11 +327,19 @@ class WorldMDP(MDP[Action, MyWorldState]):
 class BetterValueFunction(WorldMDP):
 
     def _gems_remaining(self, state: MyWorldState) -> int:
-        return self.world.n_gems - sum(state.world_state.gems_collected)
+        return self.world.n_gems - state.n_gems_collected
+
+    @override(MDP)
+    def value_bounds(self, state: MyWorldState, depth: int) -> tuple[float, float]:
+        # Every move changes the value: an agent dies, or it scores at most max(n_gems, 2), once per gem left and
+        # once per agent when it reaches an exit
+        if depth == 0: return state.value, state.value
+        n_scores = min(depth, self._gems_remaining(state) + self.world.n_agents)
+        return lle.REWARD_AGENT_DIED, state.value + n_scores * max(self.world.n_gems, 2)
 
     @override(WorldMDP)
-    def _compute_value(self, state: MyWorldState, step_reward: float) -> float:
-        if self.world.agents[state.current_agent].is_dead: return lle.REWARD_AGENT_DIED
+    def _compute_value(self, state: MyWorldState, step_reward: float, agent_died: bool) -> float:
+        if agent_died: return lle.REWARD_AGENT_DIED
         if step_reward == 1: return state.value + self.world.n_gems - self._gems_remaining(state)
         if self.world.n_gems == self._gems_remaining(state): return state.value + step_reward
         return state.value
@@ -1,5 +1,5 @@
 from io import TextIOWrapper
-from mdp import MDP, State
+from mdp import ReversibleMDP, State
 
 
 GraphAction = str
@@ -72,7 +72,7 @@ def parse_end_states(line: str, states: dict[str, GraphState]) -> set[GraphState
     return end_states
 
 
-class GraphMDP(MDP[GraphAction, GraphState]):
+class GraphMDP(ReversibleMDP[GraphAction, GraphState]):
     def __init__(
         self,
         n_agents: int,
@@ -90,6 +90,7 @@ class GraphMDP(MDP[GraphAction, GraphState]):
         self.diagram = diagram
         self.end_states = end_states
         self.nodes_expanded = 0
+        self.path = [start_state]
 
     def transition(self, state: GraphState, action: GraphAction) -> GraphState:
         self.nodes_expanded += 1
@@ -105,6 +106,19 @@ class GraphMDP(MDP[GraphAction, GraphState]):
     def is_final(self, state: GraphState) -> bool:
         return state in self.end_states
 
+    def load(self, state: GraphState):
+        self.path = [state]
+
+    def apply(self, action: GraphAction):
+        self.nodes_expanded += 1
+        self.path.append(self.transitions[self.path[-1]][action])
+
+    def undo(self):
+        self.path.pop()
+
+    def current_state(self) -> GraphState:
+        return self.path[-1]
+
     @property
     def default_action(self) -> GraphAction:
         return ""
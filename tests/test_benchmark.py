@@ -0,0 +1,63 @@
+from lle import World
+from adversarial_search import minimax, alpha_beta
+from benchmark import Benchmark, BenchmarkGrid, BenchmarkCell, persistent_algorithms, write_csv, write_json, read_csv, read_json
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def grid() -> BenchmarkGrid:
+    return BenchmarkGrid(
+        worlds={"small": WORLD},
+        depths=[1, 3],
+        mdp_classes=[WorldMDP, BetterValueFunction],
+        algorithms={"minimax": minimax, "alpha_beta": alpha_beta},
+        skip=lambda cell: cell.algorithm == "minimax" and cell.mdp == "BetterValueFunction",
+    )
+
+
+def test_cells():
+    cells = list(grid().cells())
+    assert len(cells) == 6
+    assert BenchmarkCell("small", 3, "WorldMDP", "alpha_beta") in cells
+    assert BenchmarkCell("small", 1, "BetterValueFunction", "minimax") not in cells
+
+
+def test_run():
+    results = Benchmark(grid(), repeats=2, warmup=1).run()
+    assert [result.cell for result in results] == list(grid().cells())
+    for result in results:
+        assert result.repeats == 2
+        assert 0 < result.wall_time_min <= result.wall_time
+        assert result.cpu_time > 0 and result.nodes_per_second > 0
+        assert result.peak_rss > 0 and result.tracemalloc_peak > 0
+    mdp = WorldMDP(World(WORLD))
+    action = alpha_beta(mdp, mdp.reset(), 3)
+    result = next(r for r in results if r.cell == BenchmarkCell("small", 3, "WorldMDP", "alpha_beta"))
+    assert result.action == action.name and result.n_expanded_states == mdp.n_expanded_states
+
+
+def test_persistent_algorithms(tmp_path):
+    algorithms = persistent_algorithms(str(tmp_path))
+    grid = BenchmarkGrid(worlds={"small": WORLD}, depths=[3], mdp_classes=[WorldMDP], algorithms=algorithms)
+    results = {result.algorithm: result for result in Benchmark(grid, repeats=1, warmup=1, trace_memory=False).run()}
+    mdp = WorldMDP(World(WORLD))
+    action = alpha_beta(mdp, mdp.reset(), 3)
+    assert {result.action for result in results.values()} == {action.name}
+    # The cold runs search every time, the warm ones find the root in the table of the warmup
+    assert results["persistent_alpha_beta_cold"].n_expanded_states == mdp.n_expanded_states
+    assert results["persistent_alpha_beta_warm"].n_expanded_states == 0
+
+
+def test_write_and_read(tmp_path):
+    results = Benchmark(grid(), repeats=1, warmup=0, trace_memory=False).run()
+    write_csv(results, tmp_path / "results.csv")
+    assert read_csv(tmp_path / "results.csv") == results
+    write_json(results, tmp_path / "results.jsonl")
+    assert read_json(tmp_path / "results.jsonl") == results
@@ -0,0 +1,73 @@
+from lle import World, Action
+from adversarial_search import AlphaBetaSearch, BestReplySearch, best_reply, alpha_beta
+from instrumentation import profile
+from matiass import WORLDS
+from move_ordering import MoveOrdering
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+WORLD_3_AGENTS = """
+S0 . G . S2
+G  @ @ @ .
+.  . X X X
+S1 . . . G
+"""
+
+
+def test_two_agents_is_alpha_beta():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        for depth in (1, 2, 4):
+            results = []
+            for search_class in (AlphaBetaSearch, BestReplySearch):
+                mdp = mdp_class(World(WORLD))
+                results.append((search_class(mdp).search(mdp.reset(), depth), mdp.n_expanded_states))
+            assert results[0] == results[1]
+
+
+def test_with_agent():
+    mdp = WorldMDP(World(WORLD_3_AGENTS))
+    s0 = mdp.reset()
+    s = mdp.with_agent(mdp.transition(s0, Action.EAST), 2)
+    assert s.current_agent == 2 and s.packed == mdp.transition(s0, Action.EAST).packed
+    assert mdp.available_actions(s) == mdp.world.available_actions()[2]
+
+
+def test_opponents_reply_once_per_round():
+    mdp = WorldMDP(World(WORLD_3_AGENTS))
+    s0 = mdp.reset()
+    search = BestReplySearch(mdp)
+    successors = list(search._get_successors(mdp.transition(s0, Action.STAY), False, 1))
+    mdp.transition(s0, Action.STAY)
+    # The replies of agent 1 then of agent 2, each followed by my turn
+    replies = mdp.world.available_actions()[1] + mdp.world.available_actions()[2]
+    assert [action for _, action in successors] == replies
+    assert all(state.current_agent == 0 for state, _ in successors)
+
+
+def test_three_agents_smaller_tree():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        mdp = mdp_class(World(WORLD_3_AGENTS))
+        alpha_beta(mdp, mdp.reset(), 4)
+        paranoid = mdp.n_expanded_states
+        action = best_reply(mdp, mdp.reset(), 4)
+        assert mdp.n_expanded_states < paranoid
+        assert action in mdp.available_actions(mdp.reset())
+
+
+def test_cutoffs_of_the_opponent_that_replies():
+    mdp = BetterValueFunction(World(WORLDS[0].world_string))
+    ordering = MoveOrdering(mdp)
+    _, report = profile(BestReplySearch(mdp, move_ordering=ordering), mdp.reset(), 4)
+    # Agent 2 (at (0, 3)) cuts off the node after my first move by going south, and is credited for it from its square
+    assert (2, Action.SOUTH.value, (0, 3)) in ordering.killer_moves[(3, 2)]
+    assert all(key[0] == agent for (_, agent), keys in ordering.killer_moves.items() for key in keys)
+    # The cutoff moves are indices in the replies of all the opponents
+    assert report.plies[1].cutoff_moves == [0, 0, 0, 0, 0, 0, 1]
+    assert all(sum(ply.cutoff_moves) == ply.cutoffs for ply in report.plies)
@@ -0,0 +1,74 @@
+import numpy as np
+from lle import World, Action
+from adversarial_search import AlphaBetaSearch
+from distance_maps import UNREACHABLE, distance_maps
+from evaluator import PathDistanceEvaluator
+from benchmark import random_states
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+G  @ S0 . .
+.  @ .  . .
+.  . .  . X
+S1 . .  . X
+"""
+
+WORLD_LASER = """
+S0 . . .
+.  . . G
+L1E . . .
+X  . . S1
+X  . . .
+"""
+
+WORLD_DEAD_END = """
+.  @ @ @ .
+S0 @ G . .
+.  . . . X
+S1 . . . X
+"""
+
+
+def test_walls():
+    maps = distance_maps(World(WORLD))
+    # Around the wall, 2 tiles away in Manhattan distance
+    assert maps.gems[0][0, 2] == 6
+    assert maps.exits[0, 2] == 4
+    assert maps.gem_words[0][0 | 2 << 8] == 6
+    assert maps.max_distance == 8
+
+
+def test_laser_beams():
+    world = World(WORLD_LASER)
+    # The beam of agent 1 cuts agent 0 off the exits, but not agent 1
+    assert distance_maps(world, 0).exits[0, 0] == UNREACHABLE
+    assert distance_maps(world, 0).gems[0][0, 0] == 4
+    assert distance_maps(world, 1).exits[0, 0] == 5
+
+
+def test_cached():
+    assert distance_maps(World(WORLD)) is distance_maps(World(WORLD))
+
+
+def test_batch_equals_scalar():
+    for world in (WORLD, WORLD_LASER):
+        mdp = BetterValueFunction(World(world))
+        evaluator = PathDistanceEvaluator(mdp.world)
+        states = random_states(mdp, 200)
+        assert np.allclose(evaluator.evaluate_batch(states), [evaluator.evaluate(state) for state in states])
+
+
+def test_goes_around_the_wall():
+    mdp = WorldMDP(World(WORLD))
+    evaluator = PathDistanceEvaluator(mdp.world)
+    assert AlphaBetaSearch(mdp, evaluator=evaluator).search(mdp.reset(), 1)[1] == Action.SOUTH
+
+
+def test_shallow_search_as_deep_search():
+    # The gem is behind the wall, where NORTH is a dead end: a plain search stays until depth 7
+    mdp = WorldMDP(World(WORLD_DEAD_END))
+    evaluator = PathDistanceEvaluator(mdp.world)
+    deep = AlphaBetaSearch(mdp).search(mdp.reset(), 7)[1]
+    assert AlphaBetaSearch(mdp).search(mdp.reset(), 2)[1] != deep
+    assert AlphaBetaSearch(mdp, evaluator=evaluator).search(mdp.reset(), 2)[1] == deep == Action.SOUTH
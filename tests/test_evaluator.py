@@ -0,0 +1,55 @@
+import numpy as np
+from lle import World
+from adversarial_search import MinimaxSearch, ExpectimaxSearch, InPlaceMinimaxSearch, BatchedSearch, batched_minimax, minimax
+from evaluator import ValueEvaluator, DistanceEvaluator
+from benchmark import random_states
+from world_mdp import WorldMDP, BetterValueFunction
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+.  . . . G G S0
+.  . . @ @ @ G
+S2 . . X X X G
+.  . . . G G S1
+"""
+
+
+def test_batch_equals_scalar():
+    mdp = BetterValueFunction(World(WORLD))
+    states = random_states(mdp, 200)
+    for evaluator in (ValueEvaluator(), DistanceEvaluator(mdp.world)):
+        assert np.allclose(evaluator.evaluate_batch(states), [evaluator.evaluate(state) for state in states])
+
+
+def test_distance_evaluator():
+    mdp = WorldMDP(World(WORLD))
+    s0 = mdp.reset()
+    evaluator = DistanceEvaluator(mdp.world, exit_weight=1.0, gem_weight=1.0)
+    # My agent is at (0, 6): 3 tiles from the nearest exit (2, 5), 1 from the nearest gem (0, 5), in a 4 + 7 world
+    assert evaluator.evaluate(s0) == s0.value - 3 / 11 - 1 / 11
+
+
+def test_batched_search_is_the_same():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        for evaluator in (None, ValueEvaluator(), DistanceEvaluator(World(WORLD))):
+            for search_class, chance, depth in ((MinimaxSearch, False, 3), (ExpectimaxSearch, True, 2)):
+                mdp = mdp_class(World(WORLD))
+                expected = search_class(mdp, evaluator=evaluator).search(mdp.reset(), depth)
+                n_expanded = mdp.n_expanded_states
+                for batch_size in (1, 5, 1024):
+                    mdp = mdp_class(World(WORLD))
+                    assert BatchedSearch(mdp, evaluator, batch_size, chance).search(mdp.reset(), depth) == expected
+                    assert mdp.n_expanded_states == n_expanded
+
+
+def test_in_place_search_with_evaluator():
+    mdp = WorldMDP(World(WORLD))
+    evaluator = DistanceEvaluator(mdp.world)
+    expected = MinimaxSearch(mdp, evaluator=evaluator).search(mdp.reset(), 3)
+    assert InPlaceMinimaxSearch(mdp, evaluator=evaluator).search(mdp.reset(), 3) == expected
+
+
+def test_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    assert batched_minimax(mdp, mdp.reset(), 3, batch_size=2) == minimax(mdp, mdp.reset(), 3)
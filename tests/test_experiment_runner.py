@@ -0,0 +1,73 @@
+import os
+from adversarial_search import minimax, alpha_beta
+from benchmark import Benchmark, BenchmarkGrid, read_csv
+from experiment_runner import ExperimentRunner
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def benchmark() -> Benchmark:
+    grid = BenchmarkGrid(
+        worlds={"small": WORLD},
+        # The first cells are the slowest, so that they finish after the next ones
+        depths=[6, 1, 2, 3],
+        mdp_classes=[WorldMDP, BetterValueFunction],
+        algorithms={"minimax": minimax, "alpha_beta": alpha_beta},
+        skip=lambda cell: cell.algorithm == "minimax" and cell.mdp == "BetterValueFunction",
+    )
+    return Benchmark(grid, repeats=1, warmup=0, trace_memory=False)
+
+
+def test_deterministic_order(tmp_path):
+    filename = tmp_path / "results.csv"
+    runner = ExperimentRunner(benchmark(), filename, n_workers=2)
+    results = runner.run()
+    assert [result.cell for result in results] == list(benchmark().grid.cells())
+    assert runner.n_run == len(results) == 12
+    assert not os.path.exists(str(filename) + ".journal")
+    expected = benchmark().run()
+    assert [(r.action, r.n_expanded_states) for r in results] == [(r.action, r.n_expanded_states) for r in expected]
+
+
+def test_resume(tmp_path):
+    filename = tmp_path / "results.csv"
+    results = ExperimentRunner(benchmark(), filename, n_workers=2).run()
+    # Crash: only 3 rows were written, the 6th result was in the journal and the next row was being written
+    lines = open(filename).read().splitlines(keepends=True)
+    with open(filename, "w") as f:
+        f.writelines(lines[:4])
+        f.write(lines[4][:10])
+    with open(str(filename) + ".journal", "w") as f:
+        f.write('{"world": "small", "depth": 1, "mdp": "BetterValueFunction", "algorithm": "alpha_beta", "action": "East", '
+                '"n_expanded_states": 1, "repeats": 1, "wall_time": 1.0, "wall_time_min": 1.0, "cpu_time": 1.0, '
+                '"nodes_per_second": 1.0, "peak_rss": 1, "tracemalloc_peak": 0}\n{"world": "sm')
+    runner = ExperimentRunner(benchmark(), filename, n_workers=2)
+    resumed = runner.run()
+    assert runner.n_run == len(results) - 4
+    assert [result.cell for result in resumed] == [result.cell for result in results]
+    assert resumed[:3] == results[:3]
+    # The journal result was not run again
+    assert resumed[5].n_expanded_states == 1
+    assert read_csv(filename) == resumed
+    # Nothing left to run
+    runner.run()
+    assert runner.n_run == 0
+
+
+def test_other_grid(tmp_path):
+    filename = tmp_path / "results.csv"
+    ExperimentRunner(benchmark(), filename, n_workers=1).run()
+    other = benchmark()
+    other.grid.depths = [1, 2]
+    try:
+        ExperimentRunner(other, filename).run()
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
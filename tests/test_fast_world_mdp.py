@@ -0,0 +1,71 @@
+import random
+from lle import World
+from adversarial_search import minimax, alpha_beta, expectimax, in_place_alpha_beta
+from fast_world_mdp import FastWorldMDP, FastBetterValueFunction
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLDS = [
+"""
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+""",
+"""
+.  . . . G G S0
+.  . . @ @ @ G
+S2 . . X X X G
+.  . . . G G S1
+""",
+"""
+S0  .  G  .  .
+.   V  .  .  L1W
+S1  .  .  G  X
+L0E .  .  .  X
+""",
+"""
+. . . S2 S0 S1 .
+G . . . . . G
+L0E . . . . . .
+. . @ G . . .
+G . . . . . G
+. . . . @ G .
+. . X . . @ G
+G X X . . . .
+""",
+]
+
+
+def test_beams():
+    for world_string in WORLDS:
+        mdp = FastWorldMDP(World(world_string))
+        beams = {(int(i), int(j)) for i, j in zip(*(mdp.beam_indices >= 0).any(axis=0).nonzero())}
+        assert beams == {position for position, _ in mdp.world.lasers}
+
+
+def test_random_walks():
+    """ Differential test: random action sequences give the same states, values and actions as the lle simulator """
+    rng = random.Random(0)
+    for world_string in WORLDS:
+        for slow_class, fast_class in ((WorldMDP, FastWorldMDP), (BetterValueFunction, FastBetterValueFunction)):
+            slow, fast = slow_class(World(world_string)), fast_class(World(world_string))
+            for _ in range(30):
+                slow_state, fast_state = slow.reset(), fast.reset()
+                for _ in range(30):
+                    assert fast_state == slow_state and fast_state.value == slow_state.value
+                    assert fast.is_final(fast_state) == slow.is_final(slow_state)
+                    if slow.is_final(slow_state): break
+                    actions = slow.available_actions(slow_state)
+                    assert fast.available_actions(fast_state) == actions
+                    action = rng.choice(actions)
+                    slow_state, fast_state = slow.transition(slow_state, action), fast.transition(fast_state, action)
+
+
+def test_same_search_as_lle():
+    for world_string in WORLDS:
+        for slow_class, fast_class in ((WorldMDP, FastWorldMDP), (BetterValueFunction, FastBetterValueFunction)):
+            for algorithm, depth in ((minimax, 3), (alpha_beta, 5), (expectimax, 2), (in_place_alpha_beta, 5)):
+                slow, fast = slow_class(World(world_string)), fast_class(World(world_string))
+                assert algorithm(fast, fast.reset(), depth) == algorithm(slow, slow.reset(), depth)
+                assert fast.n_expanded_states == slow.n_expanded_states
@@ -0,0 +1,64 @@
+from lle import World, Action
+from adversarial_search import minimax, alpha_beta, expectimax, in_place_minimax, in_place_alpha_beta, in_place_expectimax
+from move_ordering import MoveOrdering
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP, BetterValueFunction
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_apply_undo():
+    world = WorldMDP(World(WORLD))
+    s0 = world.reset()
+    s = world.transition(world.transition(s0, Action.EAST), Action.STAY)
+    world.load(s0)
+    world.apply(Action.EAST)
+    world.apply(Action.STAY)
+    assert world.current_state() == s
+    assert world.current_value() == s.value and world.current_agent() == s.current_agent
+    assert world.current_actions() == world.available_actions(s)
+    world.undo()
+    world.undo()
+    assert world.current_state() == s0
+    assert world.world.get_state() == s0.world_state
+    assert world.current_actions() == world.available_actions(s0)
+
+
+def test_in_place_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    for depth in (1, 2, 3):
+        assert in_place_minimax(mdp, mdp.reset(), depth) == minimax(mdp, mdp.reset(), depth)
+        assert in_place_alpha_beta(mdp, mdp.reset(), depth) == alpha_beta(mdp, mdp.reset(), depth)
+        assert in_place_expectimax(mdp, mdp.reset(), depth) == expectimax(mdp, mdp.reset(), depth)
+
+    mdp = GraphMDP.parse("tests/graphs/7-2a-check-depth-two-ghosts.test")
+    for depth in (1, 2, 3):
+        assert in_place_alpha_beta(mdp, mdp.reset(), depth) == alpha_beta(mdp, mdp.reset(), depth)
+
+
+def test_same_actions_and_states():
+    for sequential, in_place, depth in ((minimax, in_place_minimax, 4), (alpha_beta, in_place_alpha_beta, 8), (expectimax, in_place_expectimax, 3)):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            world = mdp_class(World(WORLD))
+            expected = sequential(world, world.reset(), depth)
+            n_expanded = world.n_expanded_states
+            world = mdp_class(World(WORLD))
+            assert in_place(world, world.reset(), depth) == expected
+            assert world.n_expanded_states == n_expanded
+
+
+def test_with_transposition_table_and_move_ordering():
+    for sequential, in_place, depth in ((minimax, in_place_minimax, 4), (alpha_beta, in_place_alpha_beta, 8), (expectimax, in_place_expectimax, 3)):
+        world = WorldMDP(World(WORLD))
+        expected = sequential(world, world.reset(), depth, TranspositionTable(), MoveOrdering(world))
+        n_expanded = world.n_expanded_states
+        world = WorldMDP(World(WORLD))
+        assert in_place(world, world.reset(), depth, TranspositionTable(), MoveOrdering(world)) == expected
+        assert world.n_expanded_states == n_expanded
@@ -0,0 +1,78 @@
+from lle import World
+from adversarial_search import MinimaxSearch, AlphaBetaSearch, InPlaceAlphaBetaSearch, IterativeDeepeningSearch
+from evaluator import DistanceEvaluator
+from instrumentation import profile
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_minimax_counters():
+    mdp = WorldMDP(World(WORLD))
+    search = MinimaxSearch(mdp)
+    (value, action), report = profile(search, mdp.reset(), 3)
+    reference = WorldMDP(World(WORLD))
+    assert (value, action) == MinimaxSearch(reference).search(reference.reset(), 3)
+    assert report.n_expanded_states == reference.n_expanded_states
+    plies = report.plies
+    assert plies[0].nodes == 1
+    # Without pruning, every move of a node is searched
+    assert all(plies[ply + 1].nodes == plies[ply].moves for ply in range(len(plies) - 1))
+    assert sum(stats.nodes for stats in plies[1:]) == report.n_expanded_states
+    assert sum(stats.cutoffs for stats in plies) == 0
+    assert plies[-1].leaves == plies[-1].nodes > 0
+    # The search is left as it was
+    assert search.stats is None and search.mdp is mdp and isinstance(mdp.world, World)
+
+
+def test_alpha_beta_cutoffs_and_tt():
+    mdp = WorldMDP(World(WORLD))
+    (_, action), report = profile(AlphaBetaSearch(mdp, TranspositionTable()), mdp.reset(), 4)
+    assert action == AlphaBetaSearch(mdp, TranspositionTable()).search(mdp.reset(), 4)[1]
+    assert sum(stats.cutoffs for stats in report.plies) > 0
+    assert all(sum(stats.cutoff_moves) == stats.cutoffs == stats.beta_cutoffs + stats.alpha_cutoffs for stats in report.plies)
+    # My agent plays at the even plies (MAX nodes fail high) and the opponent at the odd ones (MIN nodes fail low)
+    assert all(stats.alpha_cutoffs == 0 for stats in report.plies[::2]) and sum(stats.beta_cutoffs for stats in report.plies) > 0
+    assert all(stats.beta_cutoffs == 0 for stats in report.plies[1::2]) and sum(stats.alpha_cutoffs for stats in report.plies) > 0
+    assert sum(stats.tt_hits for stats in report.plies) > 0
+    assert all(stats.tt_hits <= stats.tt_probes <= stats.nodes for stats in report.plies)
+    row = report.to_dict()["plies"][0]
+    assert row["branching_factor"] == report.plies[0].moves
+    assert 0 <= row["cutoff_rate"] <= 1
+
+
+def test_times_and_evaluations():
+    mdp = WorldMDP(World(WORLD), cache_size=1024)
+    _, report = profile(InPlaceAlphaBetaSearch(mdp, evaluator=DistanceEvaluator(mdp.world)), mdp.reset(), 3)
+    assert report.simulator_calls > 0
+    assert 0 < report.simulator_time <= report.mdp_time < report.total_time
+    assert report.evaluator_time > 0
+    assert report.search_time > 0
+    assert report.successor_cache_hits is not None
+    assert sum(stats.evaluations for stats in report.plies) > 0
+    assert "InPlaceAlphaBetaSearch depth 3" in str(report)
+    assert report.to_json().startswith('{"algorithm": "InPlaceAlphaBetaSearch"')
+
+
+def test_iterative_deepening():
+    mdp = WorldMDP(World(WORLD))
+    (_, action), report = profile(IterativeDeepeningSearch(mdp), mdp.reset(), 3)
+    assert report.algorithm == "IterativeDeepeningSearch"
+    assert report.n_expanded_states == mdp.n_expanded_states
+    assert report.plies[0].nodes > 1
+
+
+def test_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    (_, action), report = profile(AlphaBetaSearch(mdp), mdp.reset(), 3)
+    assert action == "Right"
+    assert report.simulator_time is None and report.successor_cache_hits is None
+    assert sum(stats.nodes for stats in report.plies[1:]) == mdp.nodes_expanded == 9
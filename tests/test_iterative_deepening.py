@@ -0,0 +1,81 @@
+from lle import World, Action
+from adversarial_search import alpha_beta, iterative_deepening, IterativeDeepeningSearch
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+def make_world():
+    return WorldMDP(
+        World(
+            """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+        )
+    )
+
+
+def test_raise_value_error():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    s = mdp.transition(s0, "Right")
+    try:
+        iterative_deepening(mdp, s, 2)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        assert True
+
+
+def test_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    assert iterative_deepening(mdp, mdp.reset(), 1) == "Right"
+    assert iterative_deepening(mdp, mdp.reset(), 2) == "Left"
+    assert iterative_deepening(mdp, mdp.reset(), 3) == "Right"
+
+
+def test_same_action_as_alpha_beta():
+    for depth in range(1, 8):
+        world = make_world()
+        expected = alpha_beta(world, world.reset(), depth)
+        world = make_world()
+        assert iterative_deepening(world, world.reset(), depth) == expected
+
+
+def test_reports():
+    world = make_world()
+    search = IterativeDeepeningSearch(world)
+    value, action = search.run(world.reset(), 10)
+    assert action == Action.SOUTH
+    assert [report.depth for report in search.reports] == list(range(1, 11))
+    assert all(report.completed for report in search.reports)
+    assert sum(report.n_expanded_states for report in search.reports) == world.n_expanded_states
+    assert search.reports[-1].value == value
+
+
+def test_node_budget():
+    world = make_world()
+    search = IterativeDeepeningSearch(world, node_budget=500)
+    _, action = search.run(world.reset(), 20)
+    assert action is not None
+    assert not search.reports[-1].completed
+    assert world.n_expanded_states <= 500
+    assert all(report.completed for report in search.reports[:-1])
+
+
+def test_tiny_budget_still_has_an_action():
+    world = make_world()
+    s0 = world.reset()
+    search = IterativeDeepeningSearch(world, node_budget=1)
+    _, action = search.run(s0, 20)
+    assert action in world.available_actions(s0)
+
+
+def test_time_budget():
+    world = make_world()
+    search = IterativeDeepeningSearch(world, time_budget=0.2)
+    _, action = search.run(world.reset(), 100)
+    assert action is not None
+    assert len(search.reports) < 100
+    assert sum(report.elapsed for report in search.reports) < 1.0
@@ -0,0 +1,77 @@
+import multiprocessing
+import pickle
+from lle import World, Action
+from adversarial_search import minimax, alpha_beta, expectimax, MinimaxSearch, AlphaBetaSearch, ExpectimaxSearch
+from lazy_smp import lazy_smp_minimax, lazy_smp_alpha_beta, lazy_smp_expectimax, _init_helper, _help
+from shared_transposition_table import SharedTranspositionTable
+from transposition_table import Bound
+from world_mdp import WorldMDP, BetterValueFunction
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_store_and_probe():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    with SharedTranspositionTable(mdp, 16) as table:
+        assert table.probe(s0, 2) is None
+        table.store(s0, 2, -4.01, "Right", Bound.LOWER)
+        entry = table.probe(s0, 2)
+        assert entry.value == -4.01 and entry.action == "Right" and entry.bound == Bound.LOWER
+        assert table.probe(s0, 3) is None
+        assert table.best_action(s0) == "Right"
+        table.store(s0, 2, 1.0, None)
+        assert table.probe(s0, 2).action is None
+        assert len(table) == 1
+
+
+def test_attach():
+    world = WorldMDP(World(WORLD))
+    s0 = world.reset()
+    with SharedTranspositionTable(world, 16) as table:
+        other = pickle.loads(pickle.dumps(table))
+        other.mdp = world
+        other.store(s0, 3, 2.0, Action.EAST)
+        entry = table.probe(s0, 3)
+        assert entry.value == 2.0 and entry.action == Action.EAST
+        other.close()
+
+
+def test_torn_entry_is_a_miss():
+    world = WorldMDP(World(WORLD))
+    s0 = world.reset()
+    with SharedTranspositionTable(world, 16) as table:
+        table.store(s0, 3, 2.0, Action.EAST)
+        table.slots[table.slots[:, 1] != 0, 2] += 1
+        assert table.probe(s0, 3) is None
+
+
+def test_same_actions_as_sequential():
+    for sequential, parallel, depth in ((minimax, lazy_smp_minimax, 4), (alpha_beta, lazy_smp_alpha_beta, 8), (expectimax, lazy_smp_expectimax, 3)):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            world = mdp_class(World(WORLD))
+            expected = sequential(world, world.reset(), depth)
+            world = mdp_class(World(WORLD))
+            assert parallel(world, world.reset(), depth, 2) == expected
+
+
+def test_main_search_after_helper():
+    # A helper that searched the whole tree first, with another move order, does not change the action of the main search
+    for search_class, depth in ((MinimaxSearch, 4), (AlphaBetaSearch, 4), (ExpectimaxSearch, 3)):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            world = mdp_class(World(WORLD))
+            s0 = world.reset()
+            expected = search_class(world).search(s0, depth)
+            _init_helper(mdp_class, WORLD, multiprocessing.Value('b', False))
+            for seed in range(1, 5):
+                with SharedTranspositionTable(world, 1 << 12) as table:
+                    _help(search_class, s0, depth, table, seed)
+                    assert len(table) > 0
+                    assert search_class(world, table).search(s0, depth) == expected
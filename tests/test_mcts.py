@@ -0,0 +1,84 @@
+import time
+from lle import World, Action
+from mcts import mcts, MCTSSearch
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_raise_value_error():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s = mdp.transition(mdp.reset(), "Right")
+    try:
+        mcts(mdp, s, 10)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+    try:
+        mcts(mdp, mdp.reset(), 0)
+        assert False, "Should raise ValueError"
+    except ValueError as e:
+        assert "budget" in str(e)
+    try:
+        MCTSSearch(mdp, opponents="max")
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+
+
+def test_obvious_move():
+    """ Agent 1 takes the gem if agent 0 does not """
+    for opponents in ("min", "random"):
+        world = WorldMDP(World("""
+        S0 G S1
+        X  . X"""))
+        assert mcts(world, world.reset(), 300, opponents=opponents, seed=0) == Action.EAST
+
+
+def test_budgets():
+    world = WorldMDP(World(WORLD))
+    search = MCTSSearch(world, seed=0)
+    search.search(world.reset(), 100)
+    assert search.n_iterations == 100 and search.root.visits == 100
+
+    world = WorldMDP(World(WORLD))
+    search = MCTSSearch(world, node_budget=500, rollout_depth=10, seed=0)
+    s0 = world.reset()
+    actions = world.available_actions(s0)
+    _, action = search.search(s0, 10 ** 6)
+    assert action in actions
+    # The budget is checked between iterations, which make at most rollout_depth + 1 transitions
+    assert 500 <= world.n_expanded_states <= 500 + 11
+
+    world = WorldMDP(World(WORLD))
+    start = time.perf_counter()
+    MCTSSearch(world, time_budget=0.1, seed=0).search(world.reset(), 10 ** 6)
+    assert time.perf_counter() - start < 1
+
+
+def test_tree_reuse():
+    world = WorldMDP(World(WORLD))
+    search = MCTSSearch(world, seed=0)
+    s0 = world.reset()
+    _, action = search.search(s0, 200)
+    s1 = world.transition(s0, action)
+    s2 = world.transition(s1, world.available_actions(s1)[0])
+    search.search(s2, 50)
+    assert search.root.state == s2 and search.root.parent is None
+    assert search.root.visits > 50
+    # A state that is not in the tree starts a new one
+    search.search(s0, 50)
+    assert search.root.visits == 50
+
+
+def test_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    assert mcts(mdp, s0, 100, seed=0) in mdp.available_actions(s0)
@@ -0,0 +1,62 @@
+from lle import World, Action
+from adversarial_search import alpha_beta
+from move_ordering import MoveOrdering
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+def make_world():
+    return WorldMDP(
+        World(
+            """
+        .  . . . G G S0
+        .  . . @ @ @ G
+        S2 . . X X X G
+        .  . . . G G S1
+"""
+        )
+    )
+
+
+def test_tt_move_first():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    table = TranspositionTable(16)
+    table.store(s0, 1, 0.0, "Right")
+    ordering = MoveOrdering(mdp)
+    assert ordering.order(s0, 2, ["Left", "Right"], table) == ["Right", "Left"]
+    assert ordering.order(s0, 2, ["Left", "Right"]) == ["Left", "Right"]
+    assert MoveOrdering(mdp, tt_move=False).order(s0, 2, ["Left", "Right"], table) == ["Left", "Right"]
+
+
+def test_killers():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    ordering = MoveOrdering(mdp, history=False, n_killers=1)
+    ordering.cutoff(s0, 2, "Right")
+    assert ordering.order(s0, 2, ["Left", "Right"]) == ["Right", "Left"]
+    assert ordering.order(s0, 1, ["Left", "Right"]) == ["Left", "Right"], "Killers are stored per ply."
+    ordering.cutoff(s0, 2, "Left")
+    assert ordering.killer_moves[(2, 0)] == [(0, "Left")]
+
+
+def test_history():
+    world = make_world()
+    s0 = world.reset()
+    ordering = MoveOrdering(world, killers=False)
+    ordering.cutoff(s0, 1, Action.WEST)
+    ordering.cutoff(s0, 3, Action.SOUTH)
+    actions = ordering.order(s0, 2, world.available_actions(s0))
+    assert actions[:2] == [Action.SOUTH, Action.WEST]
+
+
+def test_same_actions_fewer_states():
+    for depth in (1, 3, 5):
+        world = make_world()
+        expected = alpha_beta(world, world.reset(), depth)
+        n_expanded = world.n_expanded_states
+        world = make_world()
+        action = alpha_beta(world, world.reset(), depth, TranspositionTable(), MoveOrdering(world))
+        assert action == expected
+        assert world.n_expanded_states <= n_expanded
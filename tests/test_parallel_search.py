@@ -0,0 +1,54 @@
+from lle import World, Action
+from adversarial_search import minimax, alpha_beta, expectimax
+from parallel_search import parallel_minimax, parallel_alpha_beta, parallel_expectimax
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_raise_value_error():
+    world = WorldMDP(World(WORLD))
+    s = world.transition(world.reset(), Action.STAY)
+    try:
+        parallel_alpha_beta(world, s, 2)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        assert True
+
+
+def test_same_actions_as_sequential():
+    for sequential, parallel, depth in ((minimax, parallel_minimax, 4), (alpha_beta, parallel_alpha_beta, 6), (expectimax, parallel_expectimax, 3)):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            world = mdp_class(World(WORLD))
+            expected = sequential(world, world.reset(), depth)
+            n_expanded = world.n_expanded_states
+            world = mdp_class(World(WORLD))
+            assert parallel(world, world.reset(), depth, 2) == expected
+            if sequential is not alpha_beta:
+                assert world.n_expanded_states == n_expanded
+
+
+def test_alpha_beta_greedy_5steps():
+    world = WorldMDP(World(WORLD))
+    assert parallel_alpha_beta(world, world.reset(), 10, 2) == Action.SOUTH
+    assert world.n_expanded_states > 0
+
+
+def test_three_agents():
+    world = WorldMDP(
+        World(
+            """
+        .  . . . G G S0
+        .  . . @ @ @ G
+        S2 . . X X X G
+        .  . . . G G S1
+"""
+        )
+    )
+    assert parallel_alpha_beta(world, world.reset(), 3, 2) == Action.WEST
@@ -0,0 +1,79 @@
+import pickle
+from lle import World
+from adversarial_search import AlphaBetaSearch, alpha_beta
+from world_mdp import WorldMDP, BetterValueFunction
+import persistent_transposition_table
+from persistent_transposition_table import PersistentTranspositionTable, persistent_alpha_beta, cold_persistent_alpha_beta
+
+
+WORLD = """
+.  . . . G G S0
+.  . . @ @ @ G
+S2 . . X X X G
+.  . . . G G S1
+"""
+
+
+def test_same_result(tmp_path):
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        mdp = mdp_class(World(WORLD))
+        expected = alpha_beta(mdp, mdp.reset(), 3)
+        assert persistent_alpha_beta(mdp, mdp.reset(), 3, str(tmp_path)) == expected
+        assert persistent_alpha_beta(mdp, mdp.reset(), 3, str(tmp_path)) == expected
+
+
+def test_cold_start():
+    # Every run starts with an empty table, as in the benchmark
+    mdp = WorldMDP(World(WORLD))
+    expected = alpha_beta(mdp, mdp.reset(), 3)
+    n_expanded = mdp.n_expanded_states
+    for _ in range(2):
+        assert cold_persistent_alpha_beta(mdp, mdp.reset(), 3) == expected
+        assert mdp.n_expanded_states == n_expanded
+
+
+def test_lle_version():
+    assert persistent_transposition_table._lle_version() != ""
+
+
+def test_warm_start(tmp_path):
+    mdp = WorldMDP(World(WORLD))
+    with PersistentTranspositionTable(mdp, tmp_path, 1 << 12) as table:
+        assert table.invalidated and len(table) == 0
+        expected = AlphaBetaSearch(mdp, table).search(mdp.reset(), 3)
+        n_entries = len(table)
+    with PersistentTranspositionTable(mdp, tmp_path, 1 << 12) as table:
+        assert not table.invalidated and len(table) == n_entries
+        assert AlphaBetaSearch(mdp, table).search(mdp.reset(), 3) == expected
+        assert mdp.n_expanded_states == 0
+    # Another MDP class has its own file
+    with PersistentTranspositionTable(BetterValueFunction(World(WORLD)), tmp_path, 1 << 12) as table:
+        assert len(table) == 0
+
+
+def test_invalidation(tmp_path, monkeypatch):
+    source = tmp_path / "world_mdp.py"
+    source.write_text("value = 1")
+    monkeypatch.setattr(persistent_transposition_table, "SOURCES", persistent_transposition_table.SOURCES + (str(source),))
+    mdp = WorldMDP(World(WORLD))
+    with PersistentTranspositionTable(mdp, tmp_path / "tt", 1 << 12) as table:
+        AlphaBetaSearch(mdp, table).search(mdp.reset(), 2)
+    with PersistentTranspositionTable(mdp, tmp_path / "tt", 1 << 12) as table:
+        assert not table.invalidated and len(table) > 0
+    source.write_text("value = 2")
+    with PersistentTranspositionTable(mdp, tmp_path / "tt", 1 << 12) as table:
+        assert table.invalidated and len(table) == 0
+    # A table of another size does not use the file either
+    with PersistentTranspositionTable(mdp, tmp_path / "tt", 1 << 10) as table:
+        assert table.invalidated
+
+
+def test_pickle(tmp_path):
+    mdp = WorldMDP(World(WORLD))
+    with PersistentTranspositionTable(mdp, tmp_path, 1 << 12) as table:
+        s0 = mdp.reset()
+        AlphaBetaSearch(mdp, table).search(s0, 2)
+        copy = pickle.loads(pickle.dumps(table))
+        copy.mdp = mdp
+        assert copy.probe(s0, 2).value == table.probe(s0, 2).value
+        copy.close()
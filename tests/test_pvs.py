@@ -0,0 +1,67 @@
+from lle import World, Action
+from adversarial_search import alpha_beta, pvs
+from move_ordering import MoveOrdering
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+def test_raise_value_error():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    s = mdp.transition(s0, "Right")
+    try:
+        pvs(mdp, s, 2)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        assert True
+
+
+def test_pvs_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    assert pvs(mdp, mdp.reset(), 1) == "Right"
+    assert pvs(mdp, mdp.reset(), 2) == "Left"
+    assert pvs(mdp, mdp.reset(), 3) == "Right"
+
+    mdp = GraphMDP.parse("tests/graphs/2-one-ghost-3level.graph")
+    assert pvs(mdp, mdp.reset(), 3) == alpha_beta(mdp, mdp.reset(), 3)
+
+
+def test_consecutive_min_plies():
+    mdp = GraphMDP.parse("tests/graphs/7-2a-check-depth-two-ghosts.test")
+    for depth in (1, 2, 3):
+        assert pvs(mdp, mdp.reset(), depth) == alpha_beta(mdp, mdp.reset(), depth)
+
+
+def test_same_actions_as_alpha_beta():
+    world = WorldMDP(
+        World(
+            """
+        .  . . . G G S0
+        .  . . @ @ @ G
+        S2 . . X X X G
+        .  . . . G G S1
+"""
+        )
+    )
+    assert pvs(world, world.reset(), 1) == Action.SOUTH
+    assert pvs(world, world.reset(), 3) == Action.WEST
+    assert pvs(world, world.reset(), 7) == Action.SOUTH
+
+
+def test_fewer_states_with_ordering():
+    world = WorldMDP(
+        World(
+            """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+        )
+    )
+    alpha_beta(world, world.reset(), 10)
+    n_alpha_beta = world.n_expanded_states
+    action = pvs(world, world.reset(), 10, TranspositionTable(), MoveOrdering(world))
+    assert action == Action.SOUTH
+    assert world.n_expanded_states < n_alpha_beta
@@ -0,0 +1,71 @@
+from lle import World, Action
+from adversarial_search import alpha_beta, in_place_alpha_beta, AlphaBetaSearch
+from world_mdp import WorldMDP, BetterValueFunction
+from fast_world_mdp import FastWorldMDP
+from relevance import irrelevant_opponents, relevance_pruning
+
+
+# Agents 1 and 2 are walled off from my agent, and far from the gems, the exits and from each other
+WORLD = """
+S0 . G . . @ . . . . . . . S1
+.  . . . . @ . . . . . . . S2
+.  G . . . @ . . . . . . . .
+@  @ @ @ @ @ . . . . . . . .
+X  X X . . . . . . . . . . .
+"""
+
+WORLD_LASER = """
+S0 . . . @ . S1
+.  . . . @ . .
+X  X . . @ . .
+L0E . . . . . .
+"""
+
+
+def test_irrelevant_opponents():
+    mdp = WorldMDP(World(WORLD))
+    s0 = mdp.reset()
+    assert irrelevant_opponents(mdp, s0, 4) == {1, 2}
+    # Agent 1 and 2 reach the exits in 14 moves
+    assert irrelevant_opponents(mdp, s0, 14) == set()
+
+
+def test_beams_are_relevant():
+    mdp = WorldMDP(World(WORLD_LASER))
+    s0 = mdp.reset()
+    assert irrelevant_opponents(mdp, s0, 1) == {1}
+    # Agent 1 reaches the beam of agent 0 in 3 moves
+    assert irrelevant_opponents(mdp, s0, 3) == set()
+
+
+def test_stay_agents():
+    mdp = FastWorldMDP(World(WORLD))
+    s0 = mdp.reset()
+    s1 = mdp.transition(s0, Action.EAST)
+    assert len(mdp.available_actions(s1)) > 1
+    mdp.stay_agents = frozenset({1})
+    assert mdp.available_actions(s1) == [Action.STAY]
+    assert len(mdp.available_actions(s0)) > 1
+
+
+def test_same_result_smaller_tree():
+    for mdp_class in (WorldMDP, BetterValueFunction, FastWorldMDP):
+        for algorithm in (alpha_beta, in_place_alpha_beta):
+            for depth in (2, 4, 6):
+                mdp = mdp_class(World(WORLD))
+                action = algorithm(mdp, mdp.reset(), depth)
+                n_expanded_states = mdp.n_expanded_states
+                assert relevance_pruning(algorithm)(mdp, mdp.reset(), depth) == action
+                assert mdp.n_expanded_states < n_expanded_states
+                assert mdp.stay_agents == frozenset()
+
+
+def test_same_value():
+    for world in (WORLD, WORLD_LASER):
+        mdp = BetterValueFunction(World(world))
+        s0 = mdp.reset()
+        for depth in (1, 2, 3, 4, 5):
+            value = AlphaBetaSearch(mdp).search(s0, depth)[0]
+            mdp.stay_agents = irrelevant_opponents(mdp, s0, depth)
+            assert AlphaBetaSearch(mdp).search(s0, depth)[0] == value
+            mdp.stay_agents = frozenset()
@@ -0,0 +1,81 @@
+import ast
+import inspect
+import os
+from lle import World
+from adversarial_search import alpha_beta, minimax
+from result_cache import ResultCache, SOURCES
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+N_CALLS = 0
+
+
+def counting_alpha_beta(mdp, state, depth):
+    global N_CALLS
+    N_CALLS += 1
+    return alpha_beta(mdp, state, depth)
+
+
+def test_hit(tmp_path):
+    global N_CALLS
+    N_CALLS = 0
+    cache = ResultCache(tmp_path)
+    result = cache.run(WORLD, 3, WorldMDP, counting_alpha_beta)
+    mdp = WorldMDP(World(WORLD))
+    action = alpha_beta(mdp, mdp.reset(), 3)
+    assert result == {"action": action.name, "n_expanded_states": mdp.n_expanded_states}
+    # Another cache on the same directory, e.g. the next run of the script
+    cache = ResultCache(tmp_path)
+    assert cache.run(WORLD, 3, WorldMDP, counting_alpha_beta) == result
+    assert N_CALLS == 1
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_different_cells(tmp_path):
+    cache = ResultCache(tmp_path)
+    keys = {cache.key(WORLD, 3, WorldMDP, alpha_beta), cache.key(WORLD, 4, WorldMDP, alpha_beta),
+            cache.key(WORLD, 3, BetterValueFunction, alpha_beta), cache.key(WORLD, 3, WorldMDP, minimax),
+            cache.key(WORLD.replace("S1 . . .", "S1 . . G"), 3, WorldMDP, alpha_beta)}
+    assert len(keys) == 5
+    assert cache.key(WORLD, 3, WorldMDP, alpha_beta) == ResultCache(tmp_path).key(WORLD, 3, WorldMDP, alpha_beta)
+
+
+def test_code_change_invalidates(tmp_path):
+    source = tmp_path / "search.py"
+    source.write_text("# version 1\n")
+    cache = ResultCache(tmp_path / "cache", sources=(str(source),))
+    cache.run(WORLD, 2, WorldMDP, alpha_beta)
+    source.write_text("# version 2\n")
+    cache = ResultCache(tmp_path / "cache", sources=(str(source),))
+    cache.run(WORLD, 2, WorldMDP, alpha_beta)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_corrupted_entry(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = cache.key(WORLD, 2, WorldMDP, alpha_beta)
+    result = cache.run(WORLD, 2, WorldMDP, alpha_beta)
+    with open(cache._path(key), "w") as f: f.write('{"act')
+    assert cache.get(key) is None
+    assert cache.run(WORLD, 2, WorldMDP, alpha_beta) == result
+    assert cache.get(key) == result
+
+
+def test_sources_cover_the_searches():
+    # The local modules that the searches import, directly or not, are part of the fingerprint
+    here = os.path.dirname(inspect.getsourcefile(ResultCache))
+    sources, todo = set(), ["adversarial_search.py"]
+    while len(todo) > 0:
+        source = todo.pop()
+        sources.add(source)
+        with open(os.path.join(here, source)) as f: tree = ast.parse(f.read())
+        modules = {node.module + ".py" for node in ast.walk(tree) if isinstance(node, ast.ImportFrom) and node.module is not None}
+        todo.extend(module for module in modules if os.path.exists(os.path.join(here, module)) and module not in sources)
+    assert sources <= set(SOURCES)
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+from benchmark import BenchmarkResult, write_csv
+from results_store import ResultsStore
+
+
+LEGACY = """0,2,WorldMDP,minimax,,10
+0,1,WorldMDP,minimax,,4
+0,1,WorldMDP,alpha_beta,,4
+1,1,WorldMDP,alpha_beta,,7
+0,2,WorldMDP,alpha_beta,,8
+"""
+
+
+def test_legacy_csv(tmp_path):
+    filename = tmp_path / "temp.csv"
+    filename.write_text(LEGACY)
+    store = ResultsStore.from_csv(filename)
+    assert len(store) == 5
+    assert len(store.groups) == 3
+    depths, states = store.series("0", "WorldMDP", "minimax")
+    assert depths.tolist() == [1, 2]
+    assert states.tolist() == [4, 10]
+    assert store.series("1", "WorldMDP", "alpha_beta")[1].tolist() == [7]
+    assert len(store.series("2", "WorldMDP", "alpha_beta")[0]) == 0
+
+
+def test_benchmark_csv_with_repeats(tmp_path):
+    filename = tmp_path / "benchmark.csv"
+    results = [BenchmarkResult("1", depth, "WorldMDP", "pvs", "Stay", 10 * depth, 1, wall_time, wall_time, wall_time, 1.0, 0, 0)
+               for depth, wall_time in [(2, 0.5), (1, 0.1), (1, 0.3), (1, 0.2), (2, 0.7)]]
+    write_csv(results, filename)
+    store = ResultsStore.from_csv(filename)
+    depths, times = store.series("1", "WorldMDP", "pvs", "wall_time")
+    assert depths.tolist() == [1, 2]
+    assert np.allclose(times, [0.2, 0.6])
+    assert store.series("1", "WorldMDP", "pvs", "wall_time", reduce=None)[1].shape == (5,)
+    assert store.columns["action"].dtype.kind == "U"
+
+
+def test_npz(tmp_path):
+    filename = tmp_path / "temp.csv"
+    filename.write_text(LEGACY)
+    npz = tmp_path / "temp.npz"
+    ResultsStore.load(filename)
+    assert not os.path.exists(npz)
+    store = ResultsStore.load(filename, cache=True)
+    assert os.path.exists(npz)
+    loaded = ResultsStore.from_npz(npz)
+    assert loaded.groups == store.groups
+    assert all(np.array_equal(loaded.columns[name], store.columns[name]) for name in store.columns)
+    assert ResultsStore.load(filename, cache=True).columns.keys() == store.columns.keys()
+    # A CSV file rewritten with the same modification time is read again
+    mtime = os.path.getmtime(filename)
+    filename.write_text(LEGACY + "1,2,WorldMDP,alpha_beta,,9\n")
+    os.utime(filename, (mtime, mtime))
+    assert ResultsStore.load(filename, cache=True).series("1", "WorldMDP", "alpha_beta")[1].tolist() == [7, 9]
+    assert ResultsStore.from_npz(npz).series("1", "WorldMDP", "alpha_beta")[1].tolist() == [7, 9]
@@ -0,0 +1,114 @@
+from lle import World
+from adversarial_search import MinimaxSearch, AlphaBetaSearch, StackSearch, minimax, alpha_beta, stack_minimax, stack_alpha_beta
+from evaluator import DistanceEvaluator
+from mdp import MDP, State
+from move_ordering import MoveOrdering
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP, BetterValueFunction
+from .graph_mdp import GraphMDP
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+WORLD_3_AGENTS = """
+S0 . G . S2
+G  @ @ @ .
+.  . X X X
+S1 . . . G
+"""
+
+
+class ChainState(State):
+    __slots__ = ("position",)
+
+    def __init__(self, value: float, current_agent: int, position: int):
+        super().__init__(value, current_agent)
+        self.position = position
+
+
+class ChainMDP(MDP[str, ChainState]):
+    """ Two agents that walk one step each in turn along a chain of `length` states, the last of which is final """
+
+    def __init__(self, length: int):
+        super().__init__()
+        self.length = length
+
+    def reset(self) -> ChainState:
+        return ChainState(0, 0, 0)
+
+    def available_actions(self, state: ChainState) -> list[str]:
+        return ["Step"]
+
+    def transition(self, state: ChainState, action: str) -> ChainState:
+        self.n_expanded_states += 1
+        return ChainState(state.position + 1, 1 - state.current_agent, state.position + 1)
+
+    def is_final(self, state: ChainState) -> bool:
+        return state.position == self.length
+
+
+def search_both(mdp_factory, recursive, depth, kwargs_factory=dict):
+    results = []
+    for stack in (False, True):
+        mdp = mdp_factory()
+        kwargs = kwargs_factory()
+        search = StackSearch(mdp, pruning=recursive is AlphaBetaSearch, **kwargs) if stack else recursive(mdp, **kwargs)
+        results.append((search.search(mdp.reset(), depth), mdp.n_expanded_states))
+    return results
+
+
+def test_same_as_recursive():
+    for world in (WORLD, WORLD_3_AGENTS):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            for depth in (1, 2, 3):
+                for recursive in (MinimaxSearch, AlphaBetaSearch):
+                    recursive_result, stack_result = search_both(lambda: mdp_class(World(world)), recursive, depth)
+                    assert recursive_result == stack_result
+
+
+def test_same_as_recursive_with_tt_and_evaluator():
+    for recursive in (MinimaxSearch, AlphaBetaSearch):
+        for depth in (2, 4):
+            recursive_result, stack_result = search_both(lambda: WorldMDP(World(WORLD)), recursive, depth,
+                                                         lambda: {"transposition_table": TranspositionTable()})
+            assert recursive_result == stack_result
+            recursive_result, stack_result = search_both(lambda: WorldMDP(World(WORLD)), recursive, depth,
+                                                         lambda: {"evaluator": DistanceEvaluator(World(WORLD))})
+            assert recursive_result == stack_result
+    results = []
+    for search in (alpha_beta, stack_alpha_beta):
+        mdp = WorldMDP(World(WORLD))
+        results.append((search(mdp, mdp.reset(), 4, TranspositionTable(), MoveOrdering(mdp)), mdp.n_expanded_states))
+    assert results[0] == results[1]
+
+
+def test_graph_mdp():
+    for depth in (1, 2, 3):
+        mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+        action = alpha_beta(mdp, mdp.reset(), depth)
+        n_expanded = mdp.nodes_expanded
+        assert stack_alpha_beta(mdp, mdp.reset(), depth) == action
+        assert mdp.nodes_expanded == n_expanded
+        mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+        assert stack_minimax(mdp, mdp.reset(), depth) == minimax(mdp, mdp.reset(), depth)
+
+
+def test_no_recursion_limit():
+    mdp = ChainMDP(5000)
+    try:
+        MinimaxSearch(mdp).search(mdp.reset(), 5000)
+        assert False, "Should raise RecursionError"
+    except RecursionError:
+        pass
+    mdp = ChainMDP(5000)
+    search = StackSearch(mdp)
+    assert search.search(mdp.reset(), 5000) == (5000, "Step")
+    assert mdp.n_expanded_states == 5000
+    # One frame per ply above the final state, which no longer holds its state
+    assert len(search.stack) == 5000
+    assert all(frame.state is None for frame in search.stack)
@@ -0,0 +1,83 @@
+from lle import World
+from adversarial_search import ExpectimaxSearch, StarExpectimaxSearch, expectimax, star1_expectimax, star2_expectimax
+from world_mdp import WorldMDP, BetterValueFunction
+from .graph_mdp import GraphMDP
+
+
+WORLDS = [
+"""
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+""",
+"""
+S0 G  .  X
+.  .  .  .
+X L1N S1 .
+""",
+"""
+S0 . G G .
+G  @ @ @ .
+.  . X X X
+S1 . . . S2
+""",
+]
+
+
+def test_same_actions_as_expectimax():
+    for world_string in WORLDS:
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            for depth in (1, 3, 5):
+                mdp = mdp_class(World(world_string))
+                expected = expectimax(mdp, mdp.reset(), depth)
+                assert star1_expectimax(mdp, mdp.reset(), depth) == expected
+                assert star2_expectimax(mdp, mdp.reset(), depth) == expected
+
+
+def test_fewer_expanded_states():
+    mdp = WorldMDP(World(WORLDS[0]))
+    expected = ExpectimaxSearch(mdp).search(mdp.reset(), 7)
+    n_expanded = mdp.n_expanded_states
+    mdp = WorldMDP(World(WORLDS[0]))
+    assert StarExpectimaxSearch(mdp).search(mdp.reset(), 7) == expected
+    assert mdp.n_expanded_states < n_expanded
+
+
+def test_value_bounds():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        mdp = mdp_class(World(WORLDS[0]))
+
+        def check(state, depth, lower, upper):
+            assert lower <= state.value <= upper
+            if depth == 0 or mdp.is_final(state): return
+            for action in mdp.available_actions(state): check(mdp.transition(state, action), depth - 1, lower, upper)
+
+        s0 = mdp.reset()
+        for depth in range(5):
+            check(s0, depth, *mdp.value_bounds(s0, depth))
+
+
+def test_explicit_bounds():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    values = [state.value for state in mdp.states.values()]
+    expected = ExpectimaxSearch(mdp).search(s0, 3)
+    assert StarExpectimaxSearch(mdp, (min(values), max(values))).search(s0, 3) == expected
+    try:
+        StarExpectimaxSearch(mdp, (1, 0))
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+
+
+def test_probing_with_a_window():
+    """ Without min nodes, beta is only finite if the root is searched with a window """
+    for depth in (2, 4):
+        mdp = WorldMDP(World(WORLDS[0]))
+        value, _ = ExpectimaxSearch(mdp).search(mdp.reset(), depth)
+        for probing in (False, True):
+            mdp = WorldMDP(World(WORLDS[0]))
+            assert StarExpectimaxSearch(mdp, probing=probing).search(mdp.reset(), depth, value - 1, value + 1)[0] == value
+            assert StarExpectimaxSearch(mdp, probing=probing).search(mdp.reset(), depth, value - 1, value - 0.5)[0] >= value - 0.5
+            assert StarExpectimaxSearch(mdp, probing=probing).search(mdp.reset(), depth, value + 0.5, value + 1)[0] <= value + 0.5
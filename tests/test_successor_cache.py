@@ -0,0 +1,57 @@
+from lle import World, Action
+from adversarial_search import minimax, alpha_beta, expectimax
+from successor_cache import LRUCache
+from world_mdp import WorldMDP, BetterValueFunction
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_lru_eviction():
+    cache = LRUCache[int](2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.hits == 3 and cache.misses == 1
+    assert cache.hit_rate == 0.75
+
+
+def test_same_transitions():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        world = mdp_class(World(WORLD))
+        cached = mdp_class(World(WORLD), cache_size=16)
+        s, c = world.reset(), cached.reset()
+        for action in (Action.EAST, Action.STAY, Action.EAST, Action.NORTH, Action.WEST, Action.EAST):
+            assert cached.available_actions(c) == world.available_actions(s)
+            s, c = world.transition(s, action), cached.transition(c, action)
+            assert c == s
+            assert cached.is_final(c) == world.is_final(s)
+
+
+def test_same_actions_fewer_steps():
+    for algo, depth in ((minimax, 4), (alpha_beta, 8), (expectimax, 3)):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            world = mdp_class(World(WORLD))
+            expected = algo(world, world.reset(), depth)
+            cached = mdp_class(World(WORLD), cache_size=1 << 16)
+            assert algo(cached, cached.reset(), depth) == expected
+            assert cached.n_expanded_states == world.n_expanded_states
+            assert cached.n_simulator_steps < world.n_simulator_steps
+            assert cached.successor_cache.hits > 0
+
+
+def test_small_cache():
+    world = WorldMDP(World(WORLD))
+    expected = alpha_beta(world, world.reset(), 8)
+    cached = WorldMDP(World(WORLD), cache_size=8)
+    assert alpha_beta(cached, cached.reset(), 8) == expected
+    assert len(cached.successor_cache) == 8
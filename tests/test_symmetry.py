@@ -0,0 +1,89 @@
+import random
+from lle import World, Action
+from adversarial_search import MinimaxSearch, AlphaBetaSearch
+from symmetry import WorldSymmetries, SymmetricTranspositionTable
+from transposition_table import TranspositionTable
+from world_mdp import WorldMDP, BetterValueFunction, MyWorldState
+from generateGraphics import WORLD3
+
+
+# Mirror-symmetric, with both agents on the axis
+AXIS = """
+.  . S0 . .
+.  @ .  @ .
+G  . S1 . G
+.  @ .  @ .
+X  . .  . X
+"""
+
+# The lasers point the same way on both sides, so that only the left-right mirror is a symmetry
+LASERS = """
+S0  . . . S1
+L0S @ . @ L0S
+.   . G . .
+X   . . . X
+"""
+
+
+def names(world: World) -> list[str]:
+    return [symmetry.name for symmetry in WorldSymmetries(world).symmetries]
+
+
+def test_detection():
+    assert names(World(AXIS)) == ["horizontal"]
+    assert names(World(LASERS)) == ["horizontal"]
+    assert names(World("S0 . .\n. G .\n. . X")) == ["transpose"]
+    assert names(World("S0 . G . X")) == []
+    assert names(World(WORLD3.world_string)) == []
+
+
+def test_actions():
+    symmetry = WorldSymmetries(World(AXIS)).symmetries[0]
+    assert symmetry.action(Action.EAST) == Action.WEST
+    assert symmetry.action(Action.NORTH) == Action.NORTH
+    assert all(symmetry.inverse_action(symmetry.action(action)) == action for action in Action.ALL)
+
+
+def test_transitions_commute():
+    for world in (AXIS, LASERS):
+        for mdp_class in (WorldMDP, BetterValueFunction):
+            mdp = mdp_class(World(world))
+            symmetry = WorldSymmetries(mdp.world).symmetries[0]
+            rng = random.Random(0)
+            state = mdp.reset()
+            for _ in range(300):
+                if mdp.is_final(state): state = mdp.reset()
+                actions = mdp.available_actions(state)
+                image = MyWorldState.from_packed(state.value, state.current_agent, symmetry.transform(state.packed))
+                mdp.is_final(image)
+                assert sorted(action.value for action in mdp.available_actions(image)) == sorted(symmetry.action(action).value for action in actions)
+                for action in actions:
+                    next_state = mdp.transition(state, action)
+                    next_image = mdp.transition(image, symmetry.action(action))
+                    assert next_image == MyWorldState.from_packed(next_state.value, next_state.current_agent, symmetry.transform(next_state.packed))
+                state = mdp.transition(state, rng.choice(actions))
+
+
+def test_canonical():
+    mdp = WorldMDP(World(AXIS))
+    symmetries = WorldSymmetries(mdp.world)
+    s0 = mdp.reset()
+    east, west = mdp.transition(s0, Action.EAST), mdp.transition(s0, Action.WEST)
+    assert east != west
+    assert symmetries.canonical(east)[0] == symmetries.canonical(west)[0]
+    assert symmetries.canonical(s0) == (s0, None)
+
+
+def test_symmetric_transposition_table():
+    for search_class, depth in ((MinimaxSearch, 4), (AlphaBetaSearch, 7)):
+        results = []
+        for symmetric in (False, True):
+            mdp = WorldMDP(World(AXIS))
+            table = TranspositionTable()
+            if symmetric: table = SymmetricTranspositionTable(table, WorldSymmetries(mdp.world))
+            results.append((search_class(mdp, table).search(mdp.reset(), depth), mdp.n_expanded_states, len(table)))
+        (plain, plain_states, plain_entries), (symmetric, symmetric_states, symmetric_entries) = results
+        mdp = WorldMDP(World(AXIS))
+        assert plain[0] == symmetric[0] == search_class(mdp).search(mdp.reset(), depth)[0]
+        assert symmetric_states < plain_states
+        assert symmetric_entries < plain_entries
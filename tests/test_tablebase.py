@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from lle import World
+from adversarial_search import MinimaxSearch, AlphaBetaSearch, alpha_beta
+from benchmark import random_states
+from world_mdp import WorldMDP, BetterValueFunction
+from transposition_table import TranspositionTable
+from tablebase import Tablebase
+
+
+# WORLD1 of generateGraphics
+WORLD = """
+S1 G S0 G . X
+. . . . . X
+"""
+
+OTHER_WORLD = """
+S0 . G
+. @ X
+S1 . X
+"""
+
+
+def test_same_as_minimax():
+    for mdp_class in (WorldMDP, BetterValueFunction):
+        mdp = mdp_class(World(WORLD))
+        tablebase = Tablebase.solve(mdp, 6)
+        assert len(tablebase) == tablebase.metadata["n_positions"]
+        for state in random_states(mdp, 20):
+            for depth in range(1, 7):
+                value, action = MinimaxSearch(mdp).search(state, depth)
+                assert tablebase.lookup(state, depth) == (value, action if not mdp.is_final(state) else None)
+
+
+def test_converged():
+    mdp = BetterValueFunction(World(WORLD))
+    tablebase = Tablebase.solve(mdp, 20)
+    assert tablebase.converged
+    s0 = mdp.reset()
+    assert tablebase.lookup(s0, 100) == tablebase.lookup(s0, tablebase.n_layers - 1)
+    assert tablebase.lookup(s0, 17) == AlphaBetaSearch(mdp).search(s0, 17)
+
+
+def test_not_converged():
+    mdp = WorldMDP(World(WORLD))
+    tablebase = Tablebase.solve(mdp, 2)
+    assert not tablebase.converged
+    assert tablebase.lookup(mdp.reset(), 3) is None
+
+
+def test_save_load(tmp_path):
+    mdp = WorldMDP(World(WORLD))
+    tablebase = Tablebase.solve(mdp, 6)
+    filename = str(tmp_path / "tablebase.npy")
+    tablebase.save(filename)
+    loaded = Tablebase.load(filename, mdp)
+    assert isinstance(loaded.rows, np.memmap)
+    for state in random_states(mdp, 20):
+        assert loaded.lookup(state, 6) == tablebase.lookup(state, 6)
+    with pytest.raises(ValueError):
+        Tablebase.load(filename, BetterValueFunction(World(WORLD)))
+    with pytest.raises(ValueError):
+        Tablebase.load(filename, WorldMDP(World(OTHER_WORLD)))
+
+
+def test_search_uses_tablebase():
+    mdp = WorldMDP(World(WORLD))
+    tablebase = Tablebase.solve(mdp, 8)
+    expected = alpha_beta(mdp, mdp.reset(), 8)
+    assert alpha_beta(mdp, mdp.reset(), 8, tablebase) == expected
+    assert mdp.n_expanded_states == 0 and tablebase.hits == 1
+
+
+def test_fallback_table():
+    mdp = WorldMDP(World(WORLD))
+    table = TranspositionTable()
+    tablebase = Tablebase.solve(mdp, 2, table)
+    s0 = mdp.reset()
+    # Depth 3 is not covered, depth 2 is
+    assert AlphaBetaSearch(mdp, tablebase).search(s0, 3) == AlphaBetaSearch(mdp).search(s0, 3)
+    assert table.probe(s0, 3) is not None
+    assert table.probe(mdp.transition(s0, mdp.available_actions(s0)[0]), 2) is None
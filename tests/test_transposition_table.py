@@ -0,0 +1,94 @@
+from lle import World
+from adversarial_search import minimax, alpha_beta, expectimax
+from transposition_table import TranspositionTable, Bound
+from world_mdp import WorldMDP
+from .graph_mdp import GraphMDP
+
+
+def make_world():
+    return WorldMDP(
+        World(
+            """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+        )
+    )
+
+
+def test_store_and_probe():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    table = TranspositionTable(16)
+    assert table.probe(s0, 2) is None
+    table.store(s0, 2, 5.0, "Left", Bound.EXACT)
+    entry = table.probe(s0, 2)
+    assert entry is not None and entry.value == 5.0 and entry.action == "Left"
+    assert table.probe(s0, 3) is None
+    assert table.probe(s0, 1) is None
+    assert table.best_action(s0) == "Left"
+    assert table.hits == 1 and table.misses == 3
+
+
+def test_deeper_hits():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    table = TranspositionTable(16, deeper_hits=True)
+    table.store(s0, 3, 5.0, "Left")
+    assert table.probe(s0, 2) is not None
+    assert table.probe(s0, 4) is None
+
+
+def test_bounds():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    table = TranspositionTable(16)
+    table.store(s0, 1, 5.0, "Left", Bound.LOWER)
+    entry = table.probe(s0, 1)
+    assert entry.cuts(0.0, 4.0)
+    assert not entry.cuts(0.0, 6.0)
+    table.store(s0, 1, 5.0, "Left", Bound.UPPER)
+    entry = table.probe(s0, 1)
+    assert entry.cuts(6.0, 10.0)
+    assert not entry.cuts(4.0, 10.0)
+
+
+def test_replacement_policy():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    s0 = mdp.reset()
+    b1, b2 = mdp.transition(s0, "Left"), mdp.transition(s0, "Right")
+    # A single bucket: every state collides
+    table = TranspositionTable(2)
+    table.store(s0, 3, 1.0, "Left")
+    table.store(b1, 1, 2.0, "Left")
+    assert table.probe(s0, 3) is not None, "The deeper entry must be kept."
+    assert table.probe(b1, 1) is not None
+    table.store(b2, 2, 3.0, "Down")
+    assert table.probe(s0, 3) is not None
+    assert table.probe(b1, 1) is None, "The always-replace entry must be overwritten."
+    assert table.probe(b2, 2) is not None
+    table.store(b1, 4, 4.0, "Right")
+    assert table.probe(b1, 4) is not None
+    assert table.probe(s0, 3) is None
+    assert len(table) == 2
+    assert table.evictions == 2
+
+
+def test_same_actions_fewer_states():
+    for algo, depth in ((minimax, 5), (alpha_beta, 6), (expectimax, 5)):
+        world = make_world()
+        expected = algo(world, world.reset(), depth)
+        n_expanded = world.n_expanded_states
+        world = make_world()
+        action = algo(world, world.reset(), depth, TranspositionTable())
+        assert action == expected
+        assert world.n_expanded_states < n_expanded
+
+
+def test_graph_mdp():
+    mdp = GraphMDP.parse("tests/graphs/vary-depth.graph")
+    assert alpha_beta(mdp, mdp.reset(), 1, TranspositionTable()) == "Right"
+    assert alpha_beta(mdp, mdp.reset(), 2, TranspositionTable()) == "Left"
+    assert alpha_beta(mdp, mdp.reset(), 3, TranspositionTable()) == "Right"
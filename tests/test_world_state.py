@@ -0,0 +1,59 @@
+import pickle
+from lle import World, WorldState, Action
+from world_mdp import WorldMDP, MyWorldState, pack_world_state, unpack_world_state
+
+
+WORLD = """
+S0 . G G
+G  @ @ @
+.  . X X
+S1 . . .
+"""
+
+
+def test_pack_unpack():
+    world_state = WorldState([(0, 1), (3, 2)], [True, False, True])
+    packed = pack_world_state(world_state)
+    assert unpack_world_state(packed) == world_state
+    assert pack_world_state(WorldState([(0, 1), (3, 2)], [True, False, False])) != packed
+    assert pack_world_state(WorldState([(1, 0), (3, 2)], [True, False, True])) != packed
+
+
+def test_compact_state():
+    world_state = WorldState([(0, 1), (3, 2)], [True, False, True])
+    state = MyWorldState(2, 1, world_state)
+    assert not hasattr(state, "__dict__")
+    assert state.world_state == world_state
+    assert state.agent_position(0) == (0, 1) and state.agent_position(1) == (3, 2)
+    assert state.n_gems_collected == 2
+    assert state == MyWorldState.from_packed(2, 1, state.packed)
+    assert hash(state) == hash(MyWorldState(2, 1, world_state))
+    assert state != MyWorldState(2, 0, world_state) and state != MyWorldState(1, 1, world_state)
+    assert pickle.loads(pickle.dumps(state)) == state
+
+
+def test_transitions_match_the_world():
+    world = WorldMDP(World(WORLD))
+    s = world.reset()
+    for action in (Action.EAST, Action.STAY, Action.EAST, Action.NORTH, Action.EAST, Action.NORTH, Action.WEST, Action.STAY):
+        assert action in world.available_actions(s)
+        s = world.transition(s, action)
+        assert s.world_state == world.world.get_state()
+        assert not world.is_final(s)
+    assert s.n_gems_collected == 3
+
+
+def test_world_changed_by_something_else():
+    world = World("S0 . X")
+    mdp = WorldMDP(world)
+    s0 = mdp.reset()
+    assert not mdp.is_final(s0)
+    world.step([Action.EAST])
+    world.step([Action.EAST])
+    assert world.done and not mdp.is_final(s0)
+    world.step([Action.STAY])
+    assert mdp.transition(s0, Action.EAST).agent_position(0) == (0, 1)
+    # Another MDP on the same world
+    other = WorldMDP(world)
+    other.transition(other.transition(other.reset(), Action.EAST), Action.EAST)
+    assert not mdp.is_final(s0)